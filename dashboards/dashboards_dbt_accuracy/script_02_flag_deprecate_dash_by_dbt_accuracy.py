@@ -16,8 +16,14 @@ Matching:
     - 'match': 'Y' if matched, else 'N'
 """
 
+import os
+import sys
+
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "explores_views_repo"))
+from join_keys import add_key_codes
+
 # File paths
 flagged_dash_csv = r"script_01_unique_dashboards_dbt_not_accurate.csv"
 main_dash_csv = r"raw\dashboards_audit.csv"
@@ -27,25 +33,25 @@ output_csv = r"script_02_unique_dash_dbt_not_accurate.csv"
 df_flagged = pd.read_csv(flagged_dash_csv)
 df_main = pd.read_csv(main_dash_csv)
 
-# Normalize for matching
-df_flagged['dashboard_name_clean'] = df_flagged['dashboard_name'].astype(str).str.strip().str.lower()
-df_main['dashboard_clean'] = df_main['dashboard'].astype(str).str.strip().str.lower()
+# Normalize for matching (shared rule and integer key codes; see join_keys.py)
+[main_key] = add_key_codes(df_main, ['dashboard'])
+[flagged_key] = add_key_codes(df_flagged, ['dashboard_name'])
 
 # Merge to flag dashboards
 merged_df = df_main.merge(
-    df_flagged[['dashboard_name_clean']],
+    df_flagged[[flagged_key]],
     how='left',
-    left_on='dashboard_clean',
-    right_on='dashboard_name_clean',
+    left_on=main_key,
+    right_on=flagged_key,
     indicator=True
 )
 
 # Assign match and deprecate flags
-merged_df['match'] = merged_df['_merge'].apply(lambda x: 'Y' if x == 'both' else 'N')
-merged_df['deprecate'] = merged_df['match'].apply(lambda x: 'Y' if x == 'Y' else 'N')
+merged_df['match'] = (merged_df['_merge'] == 'both').map({True: 'Y', False: 'N'})
+merged_df['deprecate'] = merged_df['match']
 
 # Drop helper columns
-merged_df.drop(columns=['dashboard_clean', 'dashboard_name_clean', '_merge'], inplace=True)
+merged_df.drop(columns=[main_key, flagged_key, '_merge'], inplace=True)
 
 # Save output
 merged_df.to_csv(output_csv, index=False)
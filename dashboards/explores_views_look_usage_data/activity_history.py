@@ -0,0 +1,229 @@
+"""
+Description:
+    Streaming, multi-core reader for Looker System Activity history exports
+    (`system__activity_history_*.csv`).
+
+    - Reads the CSV in chunks of CHUNK_ROWS rows, keeping only the columns it needs,
+      so memory stays flat on a 90-day export.
+    - `Query Fields Used` cells (Python list literals such as "['orders.id', 'users.name']")
+      are parsed with a dedicated regex parser instead of `ast.literal_eval`, once per
+      distinct cell per chunk; anything that is not a list literal is reported as a parse
+      failure, like before.
+    - `Query Created Date` values are parsed once per distinct day (a 90-day export has
+      90 of them, however many rows); last-used dates are compared as dates.
+    - Chunks fan out over a process pool (`workers > 1`) and each returns a small
+      `ActivityUsage` partial; partials are reduced in chunk order, so results and the
+      order of reported failures match a serial run.
+
+Usage:
+    usage = scan_activity_history(SYSTEM_ACTIVITY_CSV, workers=0)   # 0 = one per CPU
+    usage.views                 # {view names seen in Query Fields Used}
+    usage.view_last_used        # {view: datetime of the latest query}
+    usage.failures              # [(raw cell, error)]
+"""
+
+import os
+import re
+import csv
+import sys
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "explores_views_repo"))
+from lookml_parser import resolve_workers
+
+# === CONFIGURATION ===
+CHUNK_ROWS = 50000
+FIELDS_COLUMN = "Query Fields Used"
+CREATED_COLUMN = "Query Created Date"
+
+_LIST_RE = re.compile(r"\s*\[(.*)\]\s*", re.DOTALL)
+_ITEM_RE = re.compile(r"""\s*(?:'((?:[^'\\]|\\.)*)'|"((?:[^"\\]|\\.)*)")\s*(?:,|$)""", re.DOTALL)
+_ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+_SIMPLE_ITEM = r"""\s*(?:'[^'\\]*'|"[^"\\]*")\s*"""
+_SIMPLE_LIST_RE = re.compile(rf"""\s*\[(?:{_SIMPLE_ITEM}(?:,{_SIMPLE_ITEM})*,?)?\s*\]\s*""")
+_SIMPLE_VALUE_RE = re.compile(r"'([^']*)'|\"([^\"]*)\"")
+
+
+# === FIELD LIST + DATE PARSING ===
+def parse_fields_used(raw):
+    """
+    "['orders.id', \"users.name\"]" → ['orders.id', 'users.name'].
+
+    Accepts the list-of-strings literals System Activity writes; raises ValueError for
+    anything else (blank cells included), matching what `ast.literal_eval` rejected.
+    """
+    if _SIMPLE_LIST_RE.fullmatch(raw):
+        # Common case: no escapes, so every quoted run is one item
+        return [a or b for a, b in _SIMPLE_VALUE_RE.findall(raw)]
+    match = _LIST_RE.fullmatch(raw or "")
+    if match is None:
+        raise ValueError("not a list literal")
+    body = match.group(1)
+    items = []
+    pos = 0
+    while pos < len(body):
+        item = _ITEM_RE.match(body, pos)
+        if item is None or item.end() == pos:
+            if body[pos:].strip():
+                raise ValueError(f"unexpected input at {body[pos:pos + 20]!r}")
+            break
+        value = item.group(1) if item.group(1) is not None else item.group(2)
+        items.append(_ESCAPE_RE.sub(r"\1", value) if "\\" in value else value)
+        pos = item.end()
+    return items
+
+
+class DateCache:
+    """`Query Created Date` string → day as datetime (or None), parsed once per distinct day."""
+
+    def __init__(self):
+        self._cache = {}
+
+    def __call__(self, raw):
+        day = raw[:10]
+        try:
+            return self._cache[day]
+        except KeyError:
+            value = datetime.strptime(day, "%Y-%m-%d") if day else None
+            self._cache[day] = value
+            return value
+
+
+# === AGGREGATES ===
+class ActivityUsage:
+    """The `system_activity_views` / `last_used` aggregates for one chunk or a whole export."""
+
+    def __init__(self):
+        self.rows = 0
+        self.views = set()
+        self.view_last_used = {}
+        self.failures = []
+
+    def add_views(self, views, query_date):
+        self.views.update(views)
+        if query_date is None:
+            return
+        for view in views:
+            current = self.view_last_used.get(view)
+            if current is None or query_date > current:
+                self.view_last_used[view] = query_date
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.views.update(other.views)
+        for view, query_date in other.view_last_used.items():
+            current = self.view_last_used.get(view)
+            if current is None or query_date > current:
+                self.view_last_used[view] = query_date
+        self.failures.extend(other.failures)
+        return self
+
+
+def field_views(fields):
+    """Distinct view prefixes of `view.field` entries, in first-seen order."""
+    return tuple(dict.fromkeys(field.split(".")[0].strip() for field in fields if "." in field))
+
+
+_NO_DATE = datetime.min
+
+
+def aggregate_chunk(rows):
+    """
+    Worker entry point: [(fields_raw, created_raw)] → ActivityUsage.
+
+    The same field list shows up on many rows (dashboards re-run the same queries), so
+    each distinct cell is parsed once and only its latest date is carried to the views.
+    """
+    usage = ActivityUsage()
+    parse_date = DateCache()
+    parsed = {}  # fields_raw → views tuple, or the parse error
+    latest = {}  # fields_raw → latest query date (_NO_DATE when no row had one)
+
+    for fields_raw, created_raw in rows:
+        views = parsed.get(fields_raw)
+        if views is None:
+            try:
+                views = field_views(parse_fields_used(fields_raw))
+            except ValueError as e:
+                views = e
+            parsed[fields_raw] = views
+        if isinstance(views, ValueError):
+            usage.failures.append((fields_raw, str(views)))
+            continue
+        try:
+            query_date = parse_date(created_raw) or _NO_DATE
+        except ValueError as e:
+            usage.failures.append((fields_raw, str(e)))
+            continue
+        if fields_raw not in latest or query_date > latest[fields_raw]:
+            latest[fields_raw] = query_date
+
+    usage.rows = len(rows)
+    for fields_raw, query_date in latest.items():
+        usage.add_views(parsed[fields_raw], None if query_date is _NO_DATE else query_date)
+    return usage
+
+
+# === STREAMING READER ===
+def iter_activity_chunks(path, chunk_rows=CHUNK_ROWS, columns=(FIELDS_COLUMN, CREATED_COLUMN)):
+    """
+    Yield lists of tuples with the stripped values of `columns` ("" for a column the
+    export does not have), `chunk_rows` rows at a time.
+    """
+    with open(path, mode="r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        positions = {name: idx for idx, name in enumerate(header)}
+        missing = len(header)  # index of the "" padding appended to short records
+        indexes = [positions.get(column, missing) for column in columns]
+        pad = [""] * (len(header) + 1)
+
+        chunk = []
+        for record in reader:
+            if len(record) <= missing:
+                record = record + pad[len(record):]
+            chunk.append(tuple(record[idx].strip() for idx in indexes))
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def imap_chunks(func, chunks, workers=1):
+    """
+    Apply `func` to each chunk, over a process pool when `workers > 1` (0/None = one per
+    CPU), yielding results in chunk order. Only a few chunks are in flight at a time, so
+    the next ones are read while earlier ones are parsed without loading the whole export.
+    """
+    workers = resolve_workers(workers)
+    if workers > 1:
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError) as e:
+            print(f"⚠️  Process pool unavailable ({e}); falling back to serial parsing")
+        else:
+            with executor:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(executor.submit(func, chunk))
+                    if len(pending) >= workers * 2:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            return
+
+    for chunk in chunks:
+        yield func(chunk)
+
+
+def scan_activity_history(path, workers=1, chunk_rows=CHUNK_ROWS):
+    """Aggregate one System Activity export, optionally over a process pool."""
+    usage = ActivityUsage()
+    for partial in imap_chunks(aggregate_chunk, iter_activity_chunks(path, chunk_rows), workers):
+        usage.merge(partial)
+    return usage
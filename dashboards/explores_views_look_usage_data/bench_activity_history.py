@@ -0,0 +1,129 @@
+"""
+Description:
+    Rows/sec benchmark: `activity_history.scan_activity_history` vs. the row-by-row loop
+    script_03 used before (csv.DictReader + ast.literal_eval + datetime.strptime per row).
+
+    Runs on a real export when a path is given, otherwise on a synthetic 90-day history
+    (seeded, written once under the temp dir). Every variant must produce the same views,
+    last-used dates and failure count as the legacy loop, or the script exits with status 1.
+
+Usage:
+    python bench_activity_history.py                                  # 500,000 synthetic rows
+    python bench_activity_history.py 2000000                          # custom synthetic size
+    python bench_activity_history.py raw/system__activity_history_2025-07-03T1726.csv
+"""
+
+import os
+import sys
+import csv
+import ast
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+from activity_history import ActivityUsage, scan_activity_history
+
+# === CONFIGURATION ===
+DEFAULT_ROWS = 500000
+WORKER_COUNTS = (1, 4, 0)  # 0 = one per CPU
+SEED = 0
+N_VIEWS = 400
+N_DAYS = 90
+
+
+# === BASELINE: the loop script_03 used to run ===
+def legacy_scan(path):
+    usage = ActivityUsage()
+    with open(path, mode="r", encoding="utf-8") as usagefile:
+        reader = csv.DictReader(usagefile)
+        for row in reader:
+            usage.rows += 1
+            fields_raw = row.get("Query Fields Used", "")
+            created_raw = row.get("Query Created Date", "").strip()
+            try:
+                fields_list = ast.literal_eval(fields_raw)
+                query_date = datetime.strptime(created_raw[:10], "%Y-%m-%d") if created_raw else None
+
+                for field in fields_list:
+                    if "." in field:
+                        view_prefix = field.split(".")[0].strip()
+                        usage.views.add(view_prefix)
+
+                        if query_date:
+                            current_last = usage.view_last_used.get(view_prefix)
+                            if not current_last or query_date > current_last:
+                                usage.view_last_used[view_prefix] = query_date
+            except Exception as e:
+                usage.failures.append((fields_raw, str(e)))
+    return usage
+
+
+# === SYNTHETIC EXPORT ===
+def write_synthetic_history(path, n_rows, seed=SEED):
+    rng = random.Random(seed)
+    views = [f"view_{i:04d}" for i in range(N_VIEWS)]
+    start = datetime(2025, 4, 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Query Created Date", "Query Fields Used", "History Source", "User Name"])
+        for i in range(n_rows):
+            created = start + timedelta(days=rng.randrange(N_DAYS), seconds=rng.randrange(86400))
+            fields = [
+                f"{rng.choice(views)}.field_{rng.randrange(40)}" for _ in range(rng.randint(1, 8))
+            ]
+            # A few of the oddities real exports contain
+            if i % 997 == 0:
+                fields_raw = ""
+            elif i % 503 == 0:
+                fields_raw = str(fields + ["count"])
+            else:
+                fields_raw = str(fields)
+            writer.writerow([created.strftime("%Y-%m-%d %H:%M:%S"), fields_raw, "Dashboard", f"user{i % 50}"])
+
+
+def ensure_history(n_rows):
+    path = os.path.join(tempfile.gettempdir(), f"system_activity_history_n{n_rows}_seed{SEED}.csv")
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        write_synthetic_history(path + ".tmp", n_rows)
+        os.replace(path + ".tmp", path)
+        print(f"🧪 Generated {n_rows} rows in {time.perf_counter() - start:.1f}s: {path}")
+    return path
+
+
+def same_result(a, b):
+    return a.views == b.views and a.view_last_used == b.view_last_used and len(a.failures) == len(b.failures)
+
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    usage = func(*args, **kwargs)
+    seconds = time.perf_counter() - start
+    rows_per_sec = usage.rows / seconds if seconds else 0.0
+    print(f"{label:<22}{usage.rows:>10}{seconds:>10.2f}{rows_per_sec:>14,.0f}")
+    return usage, seconds
+
+
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else None
+    path = arg if arg and not arg.isdigit() else ensure_history(int(arg) if arg else DEFAULT_ROWS)
+
+    print(f"\n{'variant':<22}{'rows':>10}{'seconds':>10}{'rows/sec':>14}")
+    baseline, baseline_seconds = timed("legacy (ast/strptime)", legacy_scan, path)
+    mismatches = []
+    for workers in WORKER_COUNTS:
+        label = f"streaming w={workers or os.cpu_count()}"
+        usage, seconds = timed(label, scan_activity_history, path, workers=workers)
+        print(f"{'':<22}{'':>10}{'':>10}{baseline_seconds / seconds if seconds else 0:>13.1f}x")
+        if not same_result(baseline, usage):
+            mismatches.append(label)
+
+    if mismatches:
+        print(f"\n🚨 Results differ from the legacy loop: {', '.join(mismatches)}")
+        sys.exit(1)
+    print("\n✅ All variants match the legacy loop")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Description:
+    Compact per-field usage counters for `view.field` references in System Activity.
+
+    Field names are interned to integer ids once; usage lives in two NumPy arrays indexed
+    by id: query counts (int64) and last-used day (int32 proleptic ordinal, 0 = never).
+    Rows are folded in batches with `np.add.at` / `np.maximum.at`, so a whole history of
+    (day, field, queries) aggregates costs one dict lookup per row and no per-field objects.
+
+    `match_defined_fields` joins the counters against the fields each view declares in
+    LookML, following query aliases (explore `from:` / join `from:`) and extends, and
+    expanding dimension groups to the fields Looker generates for them: one per declared
+    timeframe (`created` → `created_date`, `created_month`, ...) or, for durations, per
+    interval (`days_created`, ...); Looker's default set when none is declared.
+
+Usage:
+    with UsageStore(USAGE_STORE) as store:
+        usage = FieldUsage.from_rows(store.iter_field_days(since))
+    usage.get("orders.total_revenue")      # (queries, datetime of the last query or None)
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+
+import numpy as np
+
+BATCH_ROWS = 100000
+
+# What Looker generates for a dimension_group without `timeframes:` / `intervals:`
+DEFAULT_TIMEFRAMES = ("raw", "time", "date", "week", "month", "quarter", "year")
+DEFAULT_INTERVALS = ("day", "hour", "minute", "month", "quarter", "second", "week", "year")
+
+
+class FieldUsage:
+    def __init__(self, capacity=1024):
+        self.ids = {}
+        self.names = []
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.last_used = np.zeros(capacity, dtype=np.int32)
+        self._day_ordinals = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, name):
+        field_id = self.ids.get(name)
+        if field_id is None:
+            field_id = len(self.names)
+            self.ids[name] = field_id
+            self.names.append(name)
+        return field_id
+
+    def _ordinal(self, day):
+        ordinal = self._day_ordinals.get(day)
+        if ordinal is None:
+            ordinal = datetime.strptime(day[:10], "%Y-%m-%d").toordinal()
+            self._day_ordinals[day] = ordinal
+        return ordinal
+
+    def _reserve(self, size):
+        if size <= len(self.counts):
+            return
+        capacity = max(size, 2 * len(self.counts))
+        self.counts = np.concatenate([self.counts, np.zeros(capacity - len(self.counts), dtype=np.int64)])
+        self.last_used = np.concatenate([self.last_used, np.zeros(capacity - len(self.last_used), dtype=np.int32)])
+
+    def add_batch(self, rows):
+        """Fold a batch of (day 'YYYY-MM-DD', "view.field", queries) rows into the counters."""
+        if not rows:
+            return
+        ids = np.fromiter((self.intern(field) for _, field, _ in rows), dtype=np.int64, count=len(rows))
+        days = np.fromiter((self._ordinal(day) for day, _, _ in rows), dtype=np.int32, count=len(rows))
+        queries = np.fromiter((n for _, _, n in rows), dtype=np.int64, count=len(rows))
+        self._reserve(len(self.names))
+        np.add.at(self.counts, ids, queries)
+        np.maximum.at(self.last_used, ids, days)
+
+    @classmethod
+    def from_rows(cls, rows, batch_rows=BATCH_ROWS):
+        usage = cls()
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, batch_rows))
+            if not batch:
+                return usage
+            usage.add_batch(batch)
+
+    def get(self, name):
+        """(queries, datetime of the last query or None); (0, None) for unknown fields."""
+        field_id = self.ids.get(name)
+        if field_id is None:
+            return 0, None
+        ordinal = int(self.last_used[field_id])
+        return int(self.counts[field_id]), datetime.fromordinal(ordinal) if ordinal else None
+
+    def fields_by_view(self):
+        """{view or alias: {field: id}} over every interned `view.field` name."""
+        by_view = defaultdict(dict)
+        for field_id, name in enumerate(self.names):
+            if "." in name:
+                view, field = name.split(".", 1)
+                by_view[view.strip()][field.strip()] = field_id
+        return by_view
+
+
+# === JOIN AGAINST LOOKML DEFINITIONS ===
+def query_aliases(parsed_files):
+    """
+    {view: names its fields are queried under}: the view itself, explore / join aliases
+    that point at it with `from:`, and (transitively) every view that extends it.
+    """
+    aliases = defaultdict(set)
+    children = defaultdict(set)
+    for parsed in parsed_files:
+        for view in parsed.views:
+            aliases[view.name].add(view.name)
+            for parent in view.extends:
+                children[parent].add(view.name)
+        for explore in parsed.explores:
+            if explore.from_view:
+                aliases[explore.from_view].add(explore.name)
+            for join in explore.joins:
+                if join.from_view:
+                    aliases[join.from_view].add(join.alias)
+
+    closed = {}
+    for view in list(aliases):
+        names = set()
+        seen = {view}
+        stack = [view]
+        while stack:
+            current = stack.pop()
+            names.update(aliases.get(current, (current,)))
+            for child in children.get(current, ()):
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        closed[view] = names
+    return closed
+
+
+def generated_fields(group, spec=None):
+    """Field names Looker generates for dimension_group `group` (`spec` as parsed: type, timeframes, intervals)."""
+    spec = spec or {}
+    if str(spec.get("type", "time")).lower() == "duration":
+        return [f"{interval}s_{group}" for interval in spec.get("intervals") or DEFAULT_INTERVALS]
+    return [f"{group}_{timeframe}" for timeframe in spec.get("timeframes") or DEFAULT_TIMEFRAMES]
+
+
+def match_defined_fields(parsed_files, usage):
+    """
+    Yield one dict per declared field: view_name, lkml_file, field_kind, field_name,
+    queries, last_used (datetime or None).
+    """
+    aliases = query_aliases(parsed_files)
+    by_view = usage.fields_by_view()
+
+    for parsed in parsed_files:
+        for view in parsed.views:
+            names = aliases.get(view.name, {view.name})
+            for kind, name in view.fields:
+                ids = set()
+                for alias in names:
+                    used = by_view.get(alias)
+                    if not used:
+                        continue
+                    if name in used:
+                        ids.add(used[name])
+                    if kind == "dimension_group":
+                        generated = generated_fields(name, view.dimension_groups.get(name))
+                        ids.update(used[field] for field in generated if field in used)
+                id_list = sorted(ids)
+                queries = int(usage.counts[id_list].sum()) if id_list else 0
+                ordinal = int(usage.last_used[id_list].max()) if id_list else 0
+                yield {
+                    "view_name": view.name,
+                    "lkml_file": view.lkml_file,
+                    "field_kind": kind,
+                    "field_name": name,
+                    "queries": queries,
+                    "last_used": datetime.fromordinal(ordinal) if ordinal else None,
+                }
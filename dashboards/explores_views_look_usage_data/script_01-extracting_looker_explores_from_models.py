@@ -18,9 +18,14 @@ Description:
             - derived_table_sources
 """
 
+import os
+import sys
 import csv
 from collections import Counter
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "explores_views_repo"))
+from frame_io import read_frame
+
 INPUT_CSV = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_repo\script_01-extracting_looker_tables_from_views_and_models.csv"
 OUTPUT_CSV = "script_01-extracting_looker_explores_from_models.csv"
 
@@ -37,18 +42,18 @@ fieldnames = [
 explore_rows = []
 
 # === READ & FILTER ===
-with open(INPUT_CSV, mode="r", encoding="utf-8") as infile:
-    reader = csv.DictReader(infile)
-    for row in reader:
-        if row.get("view_or_model_type", "").lower() == "explore":
-            explore_rows.append({
-                "lkml_file": row["lkml_file"],
-                "model_name": row["model_name"],
-                "explore_name": row["view_or_model_name"],
-                "base_view_name": row.get("base_view_name", ""),
-                "sql_table_names": row["sql_table_name"],
-                "derived_table_sources": row["derived_table_sources"]
-            })
+# (script_01 may have written CSV, Parquet or Arrow; values are read back as plain strings)
+lookml_rows = read_frame(INPUT_CSV, keep_categories=False, dtype=str, keep_default_na=False).fillna("")
+for row in lookml_rows.to_dict("records"):
+    if row.get("view_or_model_type", "").lower() == "explore":
+        explore_rows.append({
+            "lkml_file": row["lkml_file"],
+            "model_name": row["model_name"],
+            "explore_name": row["view_or_model_name"],
+            "base_view_name": row.get("base_view_name", ""),
+            "sql_table_names": row["sql_table_name"],
+            "derived_table_sources": row["derived_table_sources"]
+        })
 
 # === WRITE OUTPUT ===
 with open(OUTPUT_CSV, mode="w", newline="", encoding="utf-8") as outfile:
@@ -1,79 +1,111 @@
 """
 Description:
-    This script merges three datasets to identify Looker explores that are defined
-    in the LookML repo but are not used in any dashboard or saved Look.
-
-    Enhancements:
-        - Uses explore metadata from script_01 (includes base_view_name)
-        - Flags each explore with:
-            - Whether it is referenced by any dashboard tile
-            - Whether it is referenced by any saved Look
-            - Whether it is unused and can be considered for deprecation
+    This script flags Looker explores that are defined in the LookML repo but were not
+    queried from a dashboard or a saved Look within the lookback window.
+
+    What "used" means (changed from the earlier tile-definition version):
+        - Usage comes from *executed queries* in System Activity history, not from the
+          dashboard-tile / Look definitions. An explore counts as used by a dashboard
+          (or Look) only if a query against it ran with that `History Source` within
+          LOOKBACK_DAYS of the latest ingested query.
+        - A dashboard tile or Look built on an explore that nobody opened during the
+          window therefore does NOT make the explore used. Before deprecating an explore
+          flagged here, check for dashboards / Looks that are still defined on it but
+          viewed rarely (e.g. quarterly reports), or widen lookback_days.
+
+    Steps:
+        - Reads the defined explores from script_01 (includes base_view_name)
+        - Ingests new System Activity exports into the incremental usage store
+          (`usage_store.py`) and reads per-explore, per-source usage from it
+        - Flags each explore per source with the shared usage-flag engine
+          (`usage_flags.py`); more sources (scheduled plans, alerts) are one line in
+          `usage_source_config`
+        - Ranks explores by recent usage across the configured sources from per-day
+          histograms (`usage_histogram.py`); output is sorted by deprecation_rank
 
 Inputs:
     - script_01-extracting_looker_explores_from_models.csv
-    - raw/dashboard_explore_look_01_system__activity_dashboard_YYYY-MM-DD.csv
-    - raw/dashboard_explore_look_02_system__activity_look_YYYY-MM-DD.csv
+    - raw/system__activity_history_YYYY-MM-DD.csv (new exports only; see usage_store.py)
+    - usage_store.sqlite (shared with script_03)
 
 Output:
     - script_02-flag_unused_explores.csv
+        Columns:
+            - lkml_file, model_name, explore_name, base_view_name,
+              sql_table_names, derived_table_sources   (from script_01)
+            - used_in_<source>          True if a query with that History Source ran on the
+                                        explore in the window (dashboard, look, ...)
+            - is_used_in_either         True if used_in_<source> is True for any source
+            - safe_to_deprecate_explore True if no counted source queried the explore in the
+                                        window (not: "no dashboard / Look references it")
+            - last_used_in_<source>     day of the latest such query, empty if none
+            - queries_30d, queries_90d  queries in the last 30 / 90 days, counted sources only
+            - decayed_usage             queries weighted by recency (30-day half-life)
+            - deprecation_score         1 / (1 + decayed_usage); 1.0 = no recent usage
+            - deprecation_rank          1 = strongest deprecation candidate
 """
 
+import os
+import sys
+
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "explores_views_repo"))
+from usage_flags import UsageSource, flag_usage
+from usage_store import UsageStore
+from usage_histogram import HALF_LIFE_DAYS, WINDOWS, UsageHistogram
+
 # === File paths ===
 defined_explores_csv = "script_01-extracting_looker_explores_from_models.csv"
-dashboard_usage_csv = r"raw\dashboard_explore_look_01_system__activity_dashboard_2025-06-25T1122.csv"
-look_usage_csv = r"raw\dashboard_explore_look_02_system__activity look 2025-06-25T1131.csv"
+system_activity_csv = r"raw\system__activity_history_*.csv"
+usage_store_db = "usage_store.sqlite"
 output_csv = "script_02-flag_unused_explores.csv"
+lookback_days = None  # days of usage counted back from the latest query; None = all ingested history
+usage_source_config = {  # used_in_<name> flag → lower-cased `History Source` values counted for it
+    "dashboard": ["dashboard"],
+    "look": ["look"],
+    # "scheduled_plan": ["scheduled task"],
+    # "alert": ["alert"],
+}
 
 # === Load datasets ===
 explores_df = pd.read_csv(defined_explores_csv)
-dash_df = pd.read_csv(dashboard_usage_csv)
-look_df = pd.read_csv(look_usage_csv)
-
-# === Normalize column names ===
-dash_df.rename(columns={"Query Explore": "explore_name", "Query Model": "model_name"}, inplace=True)
-look_df.rename(columns={"Query Explore": "explore_name", "Query Model": "model_name"}, inplace=True)
-
-dash_df["source"] = "dashboard"
-look_df["source"] = "look"
-
-# === Combine usage data ===
-usage_df = pd.concat([
-    dash_df[["model_name", "explore_name", "source"]],
-    look_df[["model_name", "explore_name", "source"]]
-], ignore_index=True).drop_duplicates()
-
-# === Compute usage flags ===
-usage_flags = (
-    usage_df
-    .assign(
-        used_in_dashboard=lambda df: df["source"] == "dashboard",
-        used_in_look=lambda df: df["source"] == "look"
+
+with UsageStore(usage_store_db) as store:
+    for path, ingested in store.ingest_all(system_activity_csv).items():
+        if ingested is None:
+            continue
+        if ingested.rejected:
+            print(f"⚠️ Skipped {os.path.basename(path)}: {ingested.rejected}")
+        else:
+            print(f"📥 Ingested {ingested.ingested} of {ingested.rows} rows from {os.path.basename(path)}")
+    since = store.window_start(lookback_days)
+    usage_rows = store.explore_usage(since)
+    counted_sources = {source for sources in usage_source_config.values() for source in sources}
+    histogram = UsageHistogram.from_rows(
+        ((day, (model, explore), n) for day, model, explore, source, n in store.iter_explore_days(since)
+         if source in counted_sources),
+        end_day=store.watermark
     )
-    .groupby(["model_name", "explore_name"])
-    .agg({
-        "used_in_dashboard": "any",
-        "used_in_look": "any"
-    })
-    .reset_index()
+
+# === Usage sources: flag name → History Source values ===
+usage_df = pd.DataFrame(usage_rows, columns=["model_name", "explore_name", "source", "last_used"])
+usage_sources = {
+    name: UsageSource(usage_df[usage_df["source"].isin(history_sources)], "last_used")
+    for name, history_sources in usage_source_config.items()
+}
+
+# === Flag explores in one pass over all sources ===
+final_df = flag_usage(
+    explores_df, ["model_name", "explore_name"], usage_sources,
+    any_column="is_used_in_either", unused_column="safe_to_deprecate_explore"
 )
 
-usage_flags["is_used_in_either"] = usage_flags["used_in_dashboard"] | usage_flags["used_in_look"]
-usage_flags["safe_to_deprecate_explore"] = ~usage_flags["is_used_in_either"]
-
-# === Merge with explore definitions ===
-final_df = explores_df.merge(
-    usage_flags,
-    on=["model_name", "explore_name"],
-    how="left"
-).fillna({
-    "used_in_dashboard": False,
-    "used_in_look": False,
-    "is_used_in_either": False,
-    "safe_to_deprecate_explore": True
-})
+# === Usage scores per explore, in one array pass ===
+scores = histogram.usage_scores(
+    list(zip(final_df["model_name"], final_df["explore_name"])), windows=WINDOWS, half_life_days=HALF_LIFE_DAYS
+)
+final_df = pd.concat([final_df.reset_index(drop=True), scores], axis=1)
 
 # === Reorder output columns ===
 final_cols = [
@@ -83,13 +115,14 @@ final_cols = [
     "base_view_name",
     "sql_table_names",
     "derived_table_sources",
-    "used_in_dashboard",
-    "used_in_look",
+    *[f"used_in_{name}" for name in usage_source_config],
     "is_used_in_either",
-    "safe_to_deprecate_explore"
+    "safe_to_deprecate_explore",
+    *[f"last_used_in_{name}" for name in usage_source_config],
+    *scores.columns,
 ]
 
-final_df = final_df[final_cols]
+final_df = final_df[final_cols].sort_values("deprecation_rank")
 
 # === Save to CSV ===
 final_df.to_csv(output_csv, index=False)
@@ -16,13 +16,27 @@ Key Features:
     - Captures all possible reference types to a view from LookML content
     - Tracks live usage based on the “Query Fields Used” from System Activity
     - Adds `safe_to_deprecate_view` flag for views unused in both LookML and queries
-    - Uses deduplicated results from upstream `script_01` output
+    - Reads LookML relationships from the lineage graph persisted by upstream `script_01`
+      (explores_views_repo/lineage_graph.py) instead of rebuilding them from the CSV
+    - Reads live usage from the incremental usage store (`usage_store.py`): new System
+      Activity exports are ingested once (chunked through `activity_history.py`; WORKERS > 1
+      spreads chunks over a process pool, None = one per CPU) and usage is kept across
+      exports, so LOOKBACK_DAYS can reach further back than the latest export
+    - Ranks views by recent usage from per-day histograms (`usage_histogram.py`):
+      query counts over the last 30 / 90 days and a usage score decayed with a
+      HALF_LIFE_DAYS half-life, so a view used once months ago is ranked as a stronger
+      deprecation candidate than one hit daily (output sorted by deprecation_rank)
 
 Inputs:
-    - script_01-extracting_looker_tables_from_views_and_models.csv
+    - script_01-lookml_lineage.graph
         (Generated from the full LookML scan)
     - system__activity_history_*.csv
-        (System Activity export from Looker, including “Query Fields Used”)
+        (System Activity exports from Looker, including “Query Fields Used”; only new
+        exports, from the store's watermark day on, are read. Rows without a
+        `Query Created Date` still mark their views as used, with an empty
+        last_used_in_system_activity)
+    - usage_store.sqlite
+        (Created on first run; keeps per-day usage from every export ingested so far)
 
 Output:
     - script_03-flag_unused_views.csv
@@ -35,6 +49,10 @@ Output:
             - used_in_system_activity
             - last_used_in_system_activity
             - safe_to_deprecate_view
+            - queries_30d / queries_90d
+            - decayed_usage
+            - deprecation_score      (1 / (1 + decayed_usage); 1.0 = no recent queries)
+            - deprecation_rank       (1 = strongest deprecation candidate)
 
 Usage:
     - Ensure both input files are available and correctly referenced
@@ -42,114 +60,117 @@ Usage:
     - Review `safe_to_deprecate_view` column for cleanup decisions
 """
 
+import os
+import sys
 import csv
-import ast
-from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "explores_views_repo"))
+from lineage_graph import LineageGraph
+from usage_store import UsageStore
+from usage_histogram import HALF_LIFE_DAYS, WINDOWS, UsageHistogram
 
 # === File paths ===
-INPUT_CSV = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_repo\script_01-extracting_looker_tables_from_views_and_models.csv"
-SYSTEM_ACTIVITY_CSV = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_look_usage_data\raw\system__activity_history_2025-07-03T1726.csv"
+LINEAGE_GRAPH = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_repo\script_01-lookml_lineage.graph"
+SYSTEM_ACTIVITY_CSV = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_look_usage_data\raw\system__activity_history_*.csv"
+USAGE_STORE = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_look_usage_data\usage_store.sqlite"
 OUTPUT_CSV = "script_03-flag_unused_views.csv"
+LOOKBACK_DAYS = None  # days of usage counted back from the latest query; None = all ingested history
+WORKERS = 1           # process-pool size for ingesting exports; None = one per CPU, 1 = serial
+
+
+def main():
+    # === Containers ===
+    defined_views = []                   # All defined views from .view.lkml files
+    referenced_views = set()             # Views referenced via explore, join_view, view_reference, or derived_table_sources
+
+    # === Load LookML relationships from the script_01 lineage graph ===
+    graph = LineageGraph.load(LINEAGE_GRAPH)
+
+    for view_name in graph.nodes("view"):
+        attrs = graph.attrs("view", view_name)
 
-# === Containers ===
-defined_views = []                    # All defined views from .view.lkml files
-referenced_views = set()             # Views referenced via explore, join_view, view_reference, or derived_table_sources
-system_activity_views = set()        # Views seen in real Looker queries
-system_activity_last_used = {}       # View name -> most recent usage date
-
-# === Parse script_01 output CSV ===
-with open(INPUT_CSV, mode="r", encoding="utf-8") as infile:
-    reader = csv.DictReader(infile)
-    for row in reader:
-        item_type = row.get("view_or_model_type", "").strip().lower()
-        view_name = row["view_or_model_name"].strip()
-        base_view = row.get("base_view_name", "").strip()
-        derived_sources = row.get("derived_table_sources", "")
-        file_path = row["lkml_file"]
-        sql_table = row.get("sql_table_name", "")
-
-        # Track defined views
-        if item_type == "view":
+        # Track defined views (referenced-only view nodes have no lkml_file)
+        if attrs.get("lkml_file"):
             defined_views.append({
                 "view_name": view_name,
-                "lkml_file": file_path,
-                "sql_table_names": sql_table,
-                "derived_table_sources": derived_sources
+                "lkml_file": attrs["lkml_file"],
+                "sql_table_names": attrs.get("sql_table_name") or "",
+                "derived_table_sources": attrs.get("derived_table_sources") or ""
             })
 
-        # Track referenced views from explores, joins, and view references
-        if item_type in ("explore", "join_view", "view_reference"):
-            if base_view:
-                referenced_views.add(base_view)
-            if view_name:
-                referenced_views.add(view_name)
-
-        # Track views referenced in derived_table_sources (corrected)
-        if derived_sources:
-            for source in derived_sources.split(","):
-                source = source.strip()
-                if "." in source:
-                    try:
-                        _, view_ref = source.split(".", 1)
-                        referenced_views.add(view_ref.strip())
-                    except ValueError:
-                        continue
-
-# === Parse System Activity CSV ===
-with open(SYSTEM_ACTIVITY_CSV, mode="r", encoding="utf-8") as usagefile:
-    reader = csv.DictReader(usagefile)
-    for row in reader:
-        fields_raw = row.get("Query Fields Used", "")
-        created_raw = row.get("Query Created Date", "").strip()
-        try:
-            fields_list = ast.literal_eval(fields_raw)
-            query_date = datetime.strptime(created_raw[:10], "%Y-%m-%d") if created_raw else None
-
-            for field in fields_list:
-                if "." in field:
-                    view_prefix = field.split(".")[0].strip()
-                    system_activity_views.add(view_prefix)
-
-                    if query_date:
-                        current_last = system_activity_last_used.get(view_prefix)
-                        if not current_last or query_date > current_last:
-                            system_activity_last_used[view_prefix] = query_date
-        except Exception as e:
-            print(f"⚠️  Warning: Failed to parse field usage: {fields_raw} — {e}")
-
-# === Flag usage status ===
-results = []
-for view in defined_views:
-    name = view["view_name"]
-    used_in_explore = name in referenced_views
-    used_in_system = name in system_activity_views
-    last_used = system_activity_last_used.get(name, "")
-    results.append({
-        **view,
-        "used_in_explore": used_in_explore,
-        "used_in_system_activity": used_in_system,
-        "last_used_in_system_activity": last_used.strftime("%Y-%m-%d") if last_used else "",
-        "safe_to_deprecate_view": not (used_in_explore or used_in_system)
-    })
-
-# === Write output CSV ===
-with open(OUTPUT_CSV, mode="w", newline="", encoding="utf-8") as outfile:
-    writer = csv.DictWriter(outfile, fieldnames=[
-        "view_name",
-        "lkml_file",
-        "sql_table_names",
-        "derived_table_sources",
-        "used_in_explore",
-        "used_in_system_activity",
-        "last_used_in_system_activity",
-        "safe_to_deprecate_view"
-    ])
-    writer.writeheader()
-    writer.writerows(results)
-
-# === Summary ===
-print(f"\n✅ View usage audit saved to: {OUTPUT_CSV}")
-print(f"📄 Total views analyzed: {len(results)}")
-print(f"📊 Views used in explores/joins/view-refs: {len(referenced_views)}")
-print(f"📊 Views used in system activity: {len(system_activity_views)}")
-print(f"🚫 Unused views: {sum(1 for r in results if not r['used_in_explore'] and not r['used_in_system_activity'])}")
+        # Track referenced views: base views, joins, extends, ${view.field} and ${view.SQL_TABLE_NAME}
+        if graph.downstream("view", view_name):
+            referenced_views.add(view_name)
+
+    # Track views referenced in derived_table_sources (e.g. postgres_agg.viewname)
+    for table in graph.nodes("table"):
+        if "." in table and graph.downstream("table", table, edge_kind="derived_table"):
+            _, view_ref = table.split(".", 1)
+            referenced_views.add(view_ref.strip())
+
+    # === Ingest new System Activity exports, then read usage from the store ===
+    with UsageStore(USAGE_STORE) as store:
+        for path, ingested in store.ingest_all(SYSTEM_ACTIVITY_CSV, workers=WORKERS).items():
+            if ingested is None:
+                continue
+            if ingested.rejected:
+                print(f"⚠️ Skipped {os.path.basename(path)}: {ingested.rejected}")
+                continue
+            for fields_raw, error in ingested.failures:
+                print(f"⚠️  Warning: Failed to parse field usage: {fields_raw} — {error}")
+            print(f"📥 Ingested {ingested.ingested} of {ingested.rows} rows from {os.path.basename(path)}")
+        since = store.window_start(LOOKBACK_DAYS)
+        system_activity_last_used = store.view_last_used(since)
+        histogram = UsageHistogram.from_rows(store.iter_view_days(since), end_day=store.watermark)
+    system_activity_views = set(system_activity_last_used)
+
+    # === Usage scores for every defined view, in one array pass ===
+    scores = histogram.usage_scores(
+        [view["view_name"] for view in defined_views], windows=WINDOWS, half_life_days=HALF_LIFE_DAYS
+    )
+    score_columns = list(scores.columns)
+
+    # === Flag usage status ===
+    results = []
+    for view, view_scores in zip(defined_views, scores.to_dict("records")):
+        name = view["view_name"]
+        used_in_explore = name in referenced_views
+        used_in_system = name in system_activity_views
+        last_used = system_activity_last_used.get(name, "")
+        results.append({
+            **view,
+            "used_in_explore": used_in_explore,
+            "used_in_system_activity": used_in_system,
+            "last_used_in_system_activity": last_used.strftime("%Y-%m-%d") if last_used else "",
+            "safe_to_deprecate_view": not (used_in_explore or used_in_system),
+            **view_scores
+        })
+    results.sort(key=lambda r: r["deprecation_rank"])
+
+    # === Write output CSV ===
+    with open(OUTPUT_CSV, mode="w", newline="", encoding="utf-8") as outfile:
+        writer = csv.DictWriter(outfile, fieldnames=[
+            "view_name",
+            "lkml_file",
+            "sql_table_names",
+            "derived_table_sources",
+            "used_in_explore",
+            "used_in_system_activity",
+            "last_used_in_system_activity",
+            "safe_to_deprecate_view",
+            *score_columns
+        ])
+        writer.writeheader()
+        writer.writerows(results)
+
+    # === Summary ===
+    print(f"\n✅ View usage audit saved to: {OUTPUT_CSV}")
+    print(f"📄 Total views analyzed: {len(results)}")
+    print(f"📊 Views used in explores/joins/view-refs: {len(referenced_views)}")
+    print(f"📊 Views used in system activity: {len(system_activity_views)}")
+    print(f"🚫 Unused views: {sum(1 for r in results if not r['used_in_explore'] and not r['used_in_system_activity'])}")
+    print(f"📉 Views with no queries in the last {WINDOWS[0]} days: {sum(1 for r in results if r[f'queries_{WINDOWS[0]}d'] == 0)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,14 @@ Description:
         - Drops rows with missing model/explore/view names
         - Adds debug diagnostics for join mismatches
         - Provides both OR and AND logic for safe_to_deprecate_dashboard
+        - Matches model / explore / view names under the shared key rule
+          (`join_keys.py`: stripped, lower-cased, merged on interned integer codes)
+        - Rolls explore / view flags up per dashboard with the shared usage-flag
+          engine (`usage_flags.rollup_flags`)
 
 Inputs:
-    - script_02-dashboards_to_views_to_redshift.csv
+    - script_02-dashboards_to_views_to_redshift.csv (or its .parquet / .arrow twin,
+      whichever script_02 wrote last)
     - script_02-flag_unused_explores.csv
     - script_03-flag_unused_views.csv
 
@@ -20,8 +25,16 @@ Output:
     - script_04-dashboards_explores_views_usage.csv
 """
 
+import os
+import sys
+
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "explores_views_repo"))
+from frame_io import read_frame
+from usage_flags import rollup_flags
+from join_keys import add_key_codes, normalize_columns
+
 # === FILE PATHS ===
 DASHBOARDS_PATH = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_repo\script_02-dashboards_to_views_to_redshift.csv"
 EXPLORES_FLAGS_PATH = "script_02-flag_unused_explores.csv"
@@ -29,7 +42,7 @@ VIEWS_FLAGS_PATH = "script_03-flag_unused_views.csv"
 OUTPUT_PATH = "script_04-dashboards_explores_views_usage.csv"
 
 # === LOAD DATA ===
-dash_df = pd.read_csv(DASHBOARDS_PATH)
+dash_df = read_frame(DASHBOARDS_PATH, keep_categories=False)  # script_02 output: CSV, Parquet or Arrow
 explore_flags = pd.read_csv(EXPLORES_FLAGS_PATH)
 view_flags = pd.read_csv(VIEWS_FLAGS_PATH)
 
@@ -59,28 +72,28 @@ dash_df.dropna(subset=required_cols, inplace=True)
 for col in required_cols:
     dash_df = dash_df[dash_df[col].astype(str).str.strip() != ""]
 
-# === NORMALIZE JOIN FIELDS ===
-for df in [dash_df, explore_flags]:
-    df["explore_name"] = df["explore_name"].astype(str).str.strip().str.lower()
-    df["model_name"] = df["model_name"].astype(str).str.strip().str.lower()
-dash_df["view_name"] = dash_df["view_name"].astype(str).str.strip().str.lower()
-view_flags["view_name"] = view_flags["view_name"].astype(str).str.strip().str.lower()
-
-# === JOIN EXPLORE FLAGS ===
+# === JOIN EXPLORE FLAGS (on shared normalized key codes) ===
+explore_keys = ["model_name", "explore_name"]
+explore_codes = add_key_codes(dash_df, explore_keys)
+add_key_codes(explore_flags, explore_keys)
 dash_df = dash_df.merge(
-    explore_flags[["model_name", "explore_name", "safe_to_deprecate_explore"]],
-    on=["model_name", "explore_name"],
+    explore_flags[explore_codes + ["safe_to_deprecate_explore"]],
+    on=explore_codes,
     how="left"
 )
 print("🔍 Missing explore flag matches:", dash_df["safe_to_deprecate_explore"].isna().sum())
 
 # === JOIN VIEW FLAGS ===
+view_codes = add_key_codes(dash_df, ["view_name"])
+add_key_codes(view_flags, ["view_name"])
 dash_df = dash_df.merge(
-    view_flags[["view_name", "safe_to_deprecate_view"]],
-    on="view_name",
+    view_flags[view_codes + ["safe_to_deprecate_view"]],
+    on=view_codes,
     how="left"
 )
 print("🔍 Missing view flag matches:", dash_df["safe_to_deprecate_view"].isna().sum())
+dash_df.drop(columns=explore_codes + view_codes, inplace=True)
+normalize_columns(dash_df, explore_keys + ["view_name"])
 
 # === OPTIONAL: Show top unmatched items
 unmatched_explores = dash_df[dash_df["safe_to_deprecate_explore"].isna()][["model_name", "explore_name"]].drop_duplicates()
@@ -90,10 +103,10 @@ unmatched_views = dash_df[dash_df["safe_to_deprecate_view"].isna()][["view_name"
 print("🚫 Top unmatched views:\n", unmatched_views.head())
 
 # === AGGREGATE FLAGS PER DASHBOARD ===
-agg = dash_df.groupby(["dashboard_id", "dashboard_title"]).agg({
-    "safe_to_deprecate_explore": lambda x: all(x.fillna(False)),
-    "safe_to_deprecate_view": lambda x: all(x.fillna(False))
-}).reset_index()
+# A dashboard's flag holds only if it holds for every explore / view row (unmatched = False)
+agg = rollup_flags(
+    dash_df, ["dashboard_id", "dashboard_title"], ["safe_to_deprecate_explore", "safe_to_deprecate_view"]
+)
 
 # === Dashboard deprecation logic (OR vs AND)
 agg["safe_to_deprecate_dashboard_or"] = (
@@ -17,20 +17,25 @@ Description:
     non-LookML dashboard tiles (e.g., text tiles, broken links, or legacy content).
 
 Input:
-    - script_02-dashboards_to_views_to_redshift.csv
+    - script_02-dashboards_to_views_to_redshift.csv (or its .parquet / .arrow twin,
+      whichever script_02 wrote last)
 
 Output:
     - script_05-dashboard_explore_view_mapping.csv
 """
 
-import pandas as pd
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "explores_views_repo"))
+from frame_io import read_frame
 
 # === FILE PATHS ===
 DASHBOARDS_PATH = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_repo\script_02-dashboards_to_views_to_redshift.csv"
 OUTPUT_MAPPING = "script_05-dashboard_explore_view_mapping.csv"
 
 # === LOAD DATA ===
-dash_df = pd.read_csv(DASHBOARDS_PATH)
+dash_df = read_frame(DASHBOARDS_PATH, keep_categories=False)  # script_02 output: CSV, Parquet or Arrow
 
 # === CLEAN COLUMN NAMES ===
 dash_df.columns = (
@@ -1,64 +1,221 @@
+"""
+Description:
+    This script archives the LookML view files flagged as unused by script_03, so a
+    quarterly cleanup is one command instead of a hand-pasted list of paths.
+
+    Steps:
+        - Reads `script_03-flag_unused_views.csv` and keeps the view files whose views are
+          all flagged `safe_to_deprecate_view` (a file that also defines a used view is
+          reported and left alone)
+        - Plans one `old_<file name>` target per file in ARCHIVE_FOLDER (files sharing a
+          name get their folder path folded into the target name)
+        - Copies (or with --move, moves) the files on a thread pool, hashing each one
+          (SHA-256) as it goes
+        - Writes one compressed bundle (.tar.gz, original relative paths) and a checksum
+          manifest next to ARCHIVE_FOLDER
+        - With --dry-run, prints the plan and touches nothing
+
+Inputs:
+    - script_03-flag_unused_views.csv
+    - looker-master (LookML project)
+
+Output:
+    - ARCHIVE_FOLDER/old_<view file>.view.lkml
+    - deprecated_views_<YYYY-MM-DD>.tar.gz
+    - deprecated_views_<YYYY-MM-DD>.manifest.csv
+        Columns:
+            - lkml_file
+            - archived_as
+            - size_bytes
+            - sha256
+            - views
+
+Usage:
+    python script_06_deprecating_views_and_creting_old_files.py --dry-run
+    python script_06_deprecating_views_and_creting_old_files.py
+    python script_06_deprecating_views_and_creting_old_files.py --move --workers 16
+"""
+
 import os
+import sys
+import csv
 import shutil
+import hashlib
+import tarfile
+import argparse
+from datetime import date
+from collections import Counter, defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "explores_views_repo"))
+from frame_io import atomic_output
 
 # === CONFIGURATION ===
 LOOKML_ROOT = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_repo\looker-master"
 ARCHIVE_FOLDER = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_look_usage_data\deprecated_views"
+UNUSED_VIEWS_CSV = "script_03-flag_unused_views.csv"
+WORKERS = 8           # copy threads; file copies are I/O bound, so threads (not processes) suffice
+HASH_BLOCK = 1 << 20  # bytes read per hash / copy step
+
+MANIFEST_FIELDS = ["lkml_file", "archived_as", "size_bytes", "sha256", "views"]
+
+ArchiveItem = namedtuple("ArchiveItem", ["lkml_file", "source", "target", "views"])
+
+
+# === PLAN ===
+def read_deprecation_candidates(report_csv):
+    """{lkml_file: [views]} for files whose every view is safe to deprecate, plus {lkml_file: [used views]} for mixed files."""
+    safe, used = defaultdict(list), defaultdict(list)
+    with open(report_csv, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            lkml_file = (row.get("lkml_file") or "").strip()
+            if not lkml_file:
+                continue
+            flag = str(row.get("safe_to_deprecate_view", "")).strip().lower() in ("true", "1", "y", "yes")
+            (safe if flag else used)[lkml_file].append(row["view_name"])
+    candidates = {f: views for f, views in safe.items() if f not in used}
+    mixed = {f: used[f] for f in safe if f in used}
+    return candidates, mixed
+
+
+def _target_name(lkml_file, clashes):
+    name = os.path.basename(lkml_file)
+    if name in clashes:
+        # Same file name in two folders: keep both, e.g. old_views__orders.view.lkml
+        # (folders inside the project; the leading project folder is the same for every file)
+        folders = os.path.dirname(lkml_file).replace("\\", "/").strip("/").split("/")[1:]
+        name = "__".join(folders + [name])
+    return f"old_{name}"
+
+
+def plan_archive(candidates, lookml_root, archive_folder):
+    """(items to archive, lkml_files missing under `lookml_root`)."""
+    # script_03's lkml_file is relative to the folder holding the project
+    # (e.g. looker-master/views/a.view.lkml; see lookml_parser.scan_repo)
+    base_dir = os.path.dirname(os.path.abspath(lookml_root))
+    clashes = {n for n, c in Counter(os.path.basename(f) for f in candidates).items() if c > 1}
+    items, missing = [], []
+    for lkml_file in sorted(candidates):
+        source = os.path.join(base_dir, lkml_file)
+        if not os.path.isfile(source):
+            missing.append(lkml_file)
+            continue
+        target = os.path.join(archive_folder, _target_name(lkml_file, clashes))
+        items.append(ArchiveItem(lkml_file, source, target, sorted(candidates[lkml_file])))
+    return items, missing
+
+
+# === EXECUTION ===
+def archive_file(item, move=False):
+    """Copy (or move) one file, hashing it on the way; returns its manifest row."""
+    digest = hashlib.sha256()
+    with open(item.source, "rb") as src, open(item.target, "wb") as dst:
+        for block in iter(lambda: src.read(HASH_BLOCK), b""):
+            digest.update(block)
+            dst.write(block)
+    shutil.copystat(item.source, item.target)
+    if move:
+        os.remove(item.source)
+    return {
+        "lkml_file": item.lkml_file,
+        "archived_as": os.path.basename(item.target),
+        "size_bytes": os.path.getsize(item.target),
+        "sha256": digest.hexdigest(),
+        "views": ", ".join(item.views),
+    }
 
-# === List of Views to Archive (relative to LOOKML_ROOT) ===
-view_paths = [
-    r"ForecastViews\tentpole_piece_sku_forecast.view.lkml",
-    r"DerivedTables\vday_2021_refunded_orders.view.lkml",
-    r"mode_email_migrations\care_buffer_report.view.lkml",
-    r"views\snapshot_comparison.view.lkml",
-    r"ForecastViews\tentpole_parent_sku_forecast.view.lkml",
-    r"KPIViews\kpi_quality.view.lkml",
-    r"DerivedTables\364_day_repeat_customers.view.lkml",
-    r"interim_map_forecast.view.lkml",
-    r"DerivedTables\potential_new_local_fc_derived_table.view.lkml",
-    r"views\churn_prediction.view.lkml",
-    r"views\local_capacity_adjustments.view.lkml",
-    r"ToplineSalesViews\holiday_window_capacities_custom_query.view.lkml",
-    r"views\allocation_import.view.lkml",
-    r"ToplineSalesViews\usercredits.view.lkml",
-    r"DerivedTables\clean_msa_derived_table.view.lkml",
-    r"KPIViews\kpi_credits_issued.view.lkml",
-    r"KPIViews\fc_daily.view.lkml",
-    r"InventoryViews\inventory_used_derived.view.lkml",
-    r"views\formatted_data.view.lkml",
-    r"InventoryViews\inventory_allocation_derived.view.lkml",
-    r"DerivedTables\oms_transactions.view.lkml",
-    r"FinanceViews\order_to_lineitem_discrepancy_derived_table.view.lkml",
-    r"InventoryViews\inventory_on_hand_derived.view.lkml",
-    r"ForecastViews\weekly_forecast.view.lkml",
-    r"DerivedTables\TEMP_orders_per_customer.view.lkml",
-]
-
-# === Create archive folder if it doesn't exist ===
-os.makedirs(ARCHIVE_FOLDER, exist_ok=True)
-
-# === Process Files ===
-archived = []
-missing = []
-
-for rel_path in view_paths:
-    source_path = os.path.join(LOOKML_ROOT, rel_path)
-    if os.path.isfile(source_path):
-        filename = os.path.basename(source_path)
-        target_path = os.path.join(ARCHIVE_FOLDER, f"old_{filename}")
-        shutil.copy2(source_path, target_path)
-        archived.append(rel_path)
+
+def archive_files(items, move=False, workers=WORKERS):
+    """Run `archive_file` over a thread pool; returns (manifest rows, [(lkml_file, error)])."""
+    rows, failures = [], []
+
+    def run(item):
+        try:
+            return archive_file(item, move), None
+        except OSError as e:
+            return None, (item.lkml_file, str(e))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for row, failure in pool.map(run, items):
+            if row is not None:
+                rows.append(row)
+            else:
+                failures.append(failure)
+    return rows, failures
+
+
+def write_bundle(bundle_path, items, rows):
+    """One .tar.gz of the archived copies, stored under their original LookML paths."""
+    archived = {row["lkml_file"] for row in rows}
+    with atomic_output(bundle_path) as tmp_path:
+        with tarfile.open(tmp_path, "w:gz", compresslevel=6) as tar:
+            for item in items:
+                if item.lkml_file in archived:
+                    tar.add(item.target, arcname=item.lkml_file.replace("\\", "/"))
+
+
+def write_manifest(manifest_path, rows):
+    with atomic_output(manifest_path) as tmp_path:
+        with open(tmp_path, mode="w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+            writer.writeheader()
+            writer.writerows(sorted(rows, key=lambda r: r["lkml_file"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive the LookML view files script_03 flags as safe to deprecate.")
+    parser.add_argument("--report", default=UNUSED_VIEWS_CSV, help="script_03 output to read the flags from")
+    parser.add_argument("--lookml-root", default=LOOKML_ROOT)
+    parser.add_argument("--archive-folder", default=ARCHIVE_FOLDER)
+    parser.add_argument("--move", action="store_true", help="remove the files from the LookML project after archiving")
+    parser.add_argument("--dry-run", action="store_true", help="print the plan without copying anything")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args(argv)
+
+    candidates, mixed = read_deprecation_candidates(args.report)
+    items, missing = plan_archive(candidates, args.lookml_root, args.archive_folder)
+    if candidates and not items:
+        print(f"❌ None of the {len(candidates)} flagged view files exist under {os.path.dirname(os.path.abspath(args.lookml_root))}")
+        print(f"   e.g. {next(iter(sorted(candidates)))}; check --lookml-root against the report's lkml_file paths")
+        return 1
+
+    stem = os.path.join(os.path.dirname(os.path.abspath(args.archive_folder)), f"deprecated_views_{date.today():%Y-%m-%d}")
+    bundle_path, manifest_path = stem + ".tar.gz", stem + ".manifest.csv"
+
+    if args.dry_run:
+        action = "move" if args.move else "copy"
+        print(f"📝 Plan ({action}, {len(items)} files → {args.archive_folder}):")
+        for item in items:
+            print(f"  - {item.lkml_file} → {os.path.basename(item.target)}  [{', '.join(item.views)}]")
+        print(f"\n📦 Bundle: {bundle_path}")
+        print(f"🧾 Manifest: {manifest_path}")
     else:
-        missing.append(rel_path)
-
-# === Summary ===
-print("✅ Archived Views:")
-for path in archived:
-    print(f"  - {path}")
-
-if missing:
-    print("\n⚠️ Missing Views (not found at expected path):")
-    for path in missing:
-        print(f"  - {path}")
-else:
-    print("\n🚀 All views successfully archived.")
+        os.makedirs(args.archive_folder, exist_ok=True)
+        rows, failures = archive_files(items, move=args.move, workers=args.workers)
+        if rows:
+            write_bundle(bundle_path, items, rows)
+            write_manifest(manifest_path, rows)
+
+        print(f"✅ Archived {len(rows)} view files into: {args.archive_folder}")
+        if rows:
+            print(f"📦 Bundle: {bundle_path}")
+            print(f"🧾 Manifest: {manifest_path}")
+        if failures:
+            print("\n❌ Failed to archive:")
+            for lkml_file, error in failures:
+                print(f"  - {lkml_file}: {error}")
+
+    # === Summary ===
+    if mixed:
+        print("\n⚠️ Skipped (file also defines views still in use):")
+        for lkml_file, views in sorted(mixed.items()):
+            print(f"  - {lkml_file} (used: {', '.join(sorted(views))})")
+    if missing:
+        print("\n⚠️ Missing Views (not found at expected path):")
+        for path in missing:
+            print(f"  - {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
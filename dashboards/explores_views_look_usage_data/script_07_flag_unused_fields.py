@@ -0,0 +1,104 @@
+"""
+Description:
+    This script flags dimensions and measures that were never queried, so bloated
+    views can be slimmed down field by field (script_03 only answers per view).
+
+    Steps:
+        - Parses every .view.lkml / .model.lkml file once (explores_views_repo/lookml_parser.py)
+          to list the fields each view declares: dimension, dimension_group, measure,
+          filter, parameter
+        - Ingests any new System Activity exports into the usage store and counts usage
+          per `view.field` from the store's per-day field aggregates (`field_usage.py`:
+          interned field ids + NumPy count / last-used arrays)
+        - Joins the two: a field counts as used when it was queried under its own view,
+          an explore / join alias of that view (`from:`), or a view extending it;
+          dimension groups match the fields Looker generates for them
+
+Inputs:
+    - looker-master (LookML project)
+    - system__activity_history_*.csv (only new exports are read; see usage_store.py)
+    - usage_store.sqlite (shared with script_02 / script_03)
+
+Output:
+    - script_07-flag_unused_fields.csv
+        Columns:
+            - view_name
+            - lkml_file
+            - field_kind
+            - field_name
+            - queries
+            - last_used_in_system_activity
+            - never_queried
+"""
+
+import os
+import sys
+import csv
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "explores_views_repo"))
+from lookml_parser import scan_repo
+from usage_store import UsageStore
+from field_usage import FieldUsage, match_defined_fields
+
+# === File paths ===
+LOOKML_ROOT = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_repo\looker-master"
+SYSTEM_ACTIVITY_CSV = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_look_usage_data\raw\system__activity_history_*.csv"
+USAGE_STORE = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_look_usage_data\usage_store.sqlite"
+OUTPUT_CSV = "script_07-flag_unused_fields.csv"
+LOOKBACK_DAYS = None  # days of usage counted back from the latest query; None = all ingested history
+WORKERS = 1           # process-pool size for parsing / ingesting; None = one per CPU, 1 = serial
+
+OUTPUT_FIELDS = [
+    "view_name",
+    "lkml_file",
+    "field_kind",
+    "field_name",
+    "queries",
+    "last_used_in_system_activity",
+    "never_queried"
+]
+
+
+def main():
+    # === Fields declared in LookML ===
+    parsed_files = scan_repo(LOOKML_ROOT, workers=WORKERS)
+
+    # === Per-field usage from the store ===
+    with UsageStore(USAGE_STORE) as store:
+        for path, ingested in store.ingest_all(SYSTEM_ACTIVITY_CSV, workers=WORKERS).items():
+            if ingested is None:
+                continue
+            if ingested.rejected:
+                print(f"⚠️ Skipped {os.path.basename(path)}: {ingested.rejected}")
+            else:
+                print(f"📥 Ingested {ingested.ingested} of {ingested.rows} rows from {os.path.basename(path)}")
+        usage = FieldUsage.from_rows(store.iter_field_days(store.window_start(LOOKBACK_DAYS)))
+
+    # === Join usage onto declared fields ===
+    results = []
+    for row in match_defined_fields(parsed_files, usage):
+        last_used = row.pop("last_used")
+        results.append({
+            **row,
+            "last_used_in_system_activity": last_used.strftime("%Y-%m-%d") if last_used else "",
+            "never_queried": row["queries"] == 0
+        })
+    results.sort(key=lambda r: (r["view_name"], r["field_kind"], r["field_name"]))
+
+    # === Write output CSV ===
+    with open(OUTPUT_CSV, mode="w", newline="", encoding="utf-8") as outfile:
+        writer = csv.DictWriter(outfile, fieldnames=OUTPUT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+    # === Summary ===
+    never = [r for r in results if r["never_queried"]]
+    print(f"\n✅ Field usage audit saved to: {OUTPUT_CSV}")
+    print(f"📄 Total fields analyzed: {len(results)}")
+    print(f"📊 Distinct view.field names seen in system activity: {len(usage)}")
+    print(f"🚫 Never-queried dimensions: {sum(1 for r in never if r['field_kind'].startswith('dimension'))}")
+    print(f"🚫 Never-queried measures: {sum(1 for r in never if r['field_kind'] == 'measure')}")
+
+
+if __name__ == "__main__":
+    main()
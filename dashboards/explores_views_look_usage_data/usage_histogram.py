@@ -0,0 +1,110 @@
+"""
+Description:
+    Per-entity daily usage histograms (views, explores, ...) for ranking deprecation
+    candidates by how much and how recently they are used, not only whether they were.
+
+    The usage store's per-day aggregates are folded into one dense NumPy matrix:
+    one row per entity, one column per day, ending on `end_day` (the store's watermark
+    day, so reruns give the same answer). From it, in one vectorized pass over the
+    defined entities (never-queried ones are all-zero rows):
+        - queries_<N>d       queries in the last N days (one reversed cumulative sum
+                             serves every window)
+        - decayed_usage      queries weighted by 0.5 ** (age / half-life), so a view
+                             hit daily scores far above one used once 80 days ago
+        - deprecation_score  1 / (1 + decayed_usage): 1.0 = no recent usage at all
+        - deprecation_rank   1 = best candidate (lowest decayed usage, then oldest last use)
+
+Usage:
+    with UsageStore(USAGE_STORE) as store:
+        since = store.window_start(LOOKBACK_DAYS)
+        hist = UsageHistogram.from_rows(store.iter_view_days(since), end_day=store.watermark)
+    scores = hist.usage_scores(view_names)   # DataFrame aligned with view_names
+"""
+
+import numpy as np
+import pandas as pd
+
+WINDOWS = (30, 90)
+HALF_LIFE_DAYS = 30
+
+
+def _day_numbers(days):
+    """'YYYY-MM-DD...' strings → int64 days since the epoch (vectorized)."""
+    return np.array([day[:10] for day in days], dtype="datetime64[D]").astype(np.int64)
+
+
+class UsageHistogram:
+    def __init__(self, ids, counts, first_day):
+        self.ids = ids              # entity → row
+        self.counts = counts        # (entities, days) int64 queries per day
+        self.first_day = first_day  # day number of column 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_days(self):
+        return self.counts.shape[1]
+
+    @classmethod
+    def from_rows(cls, rows, end_day=None):
+        """Build from (day 'YYYY-MM-DD', entity, queries) rows; `entity` is any hashable key."""
+        ids = {}
+        days, rows_idx, queries = [], [], []
+        for day, entity, n in rows:
+            days.append(day)
+            rows_idx.append(ids.setdefault(entity, len(ids)))
+            queries.append(n)
+
+        day_numbers = _day_numbers(days) if days else np.empty(0, dtype=np.int64)
+        last_day = int(_day_numbers([end_day])[0]) if end_day else (int(day_numbers.max()) if days else 0)
+        first_day = int(day_numbers.min()) if days else last_day
+        n_days = max(last_day - first_day + 1, 0) if days else 0
+
+        counts = np.zeros((len(ids), n_days), dtype=np.int64)
+        in_range = day_numbers <= last_day
+        np.add.at(
+            counts,
+            (np.asarray(rows_idx, dtype=np.int64)[in_range], day_numbers[in_range] - first_day),
+            np.asarray(queries, dtype=np.int64)[in_range]
+        )
+        return cls(ids, counts, first_day)
+
+    def rows_for(self, keys):
+        """Dense (len(keys), days) histogram for `keys`; unknown keys get zero rows."""
+        index = np.fromiter((self.ids.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+        known = index >= 0
+        counts = np.zeros((len(keys), self.n_days), dtype=np.int64)
+        counts[known] = self.counts[index[known]]
+        return counts
+
+    def usage_scores(self, keys, windows=WINDOWS, half_life_days=HALF_LIFE_DAYS):
+        """DataFrame aligned with `keys`: queries_<N>d per window, decayed_usage, deprecation_score, deprecation_rank."""
+        counts = self.rows_for(keys)
+        if not counts.shape[1]:
+            counts = np.zeros((len(keys), 1), dtype=np.int64)  # no usage in the window at all
+        n_keys, n_days = counts.shape
+        result = {}
+
+        # Newest day first, so column d - 1 of the running sum is "queries in the last d days"
+        newest_first = counts[:, ::-1]
+        cumulative = np.cumsum(newest_first, axis=1)
+        for days in windows:
+            result[f"queries_{days}d"] = cumulative[:, min(days, n_days) - 1]
+
+        weights = 0.5 ** (np.arange(n_days) / half_life_days)
+        decayed = newest_first @ weights
+
+        # Days since the last query (n_days = never, inside the histogram)
+        used = newest_first > 0
+        idle_days = np.where(used.any(axis=1), used.argmax(axis=1), n_days)
+
+        # Rank: lowest decayed usage first, longest idle first among ties
+        order = np.lexsort((-idle_days, decayed))
+        rank = np.empty(n_keys, dtype=np.int64)
+        rank[order] = np.arange(1, n_keys + 1)
+
+        result["decayed_usage"] = decayed.round(3)
+        result["deprecation_score"] = (1.0 / (1.0 + decayed)).round(4)
+        result["deprecation_rank"] = rank
+        return pd.DataFrame(result)
@@ -0,0 +1,408 @@
+"""
+Description:
+    Incremental, on-disk store of Looker System Activity usage (SQLite).
+
+    System Activity history exports only cover a fixed window, so usage older than the
+    latest export used to be lost between audits. The store keeps compact per-day
+    aggregates across every export ingested so far:
+        - view_day     (day, view)                          → queries
+        - explore_day  (day, model, explore, source)        → queries
+                       (source = lower-cased `History Source`: dashboard, look, explore, ...)
+        - field_day    (day, field)                         → queries
+        - view_undated (export, view)                       → queries without a date
+
+    Ingestion:
+        - An export whose path, size and mtime are already recorded is not opened again.
+        - Otherwise it is streamed through `activity_history` (chunked, optional process
+          pool). Days before the stored watermark's day are skipped, so overlapping
+          exports never double-count. On the watermark's own day:
+            - if the export starts at or before the start of that day (its earliest
+              `Query Created Date`), it holds the whole day, and its rows replace that
+              day's aggregates (`Query Created Date` often carries only a date, so
+              "later than the watermark" alone cannot tell new queries from counted ones)
+            - otherwise only rows after the exact watermark timestamp are added, so an
+              export starting partway through the day keeps the day's earlier queries
+        - Each export's earliest and latest `Query Created Date` are recorded in
+          `exports`. An export ending before the newest one already ingested (an older
+          export picked up late, since `ingest_all` orders by file name) is rejected:
+          nothing is written and `DailyUsage.rejected` says why.
+        - The counts, the new watermark and the export record are committed in one
+          transaction.
+        - Rows without a `Query Created Date` cannot be placed on a day; their views are
+          kept per export in view_undated, and `view_last_used` still reports those
+          views as used (with no date).
+
+    Queries take an optional [since, until] day window, so the audits can use any
+    lookback without reparsing raw CSVs. `window_start(days)` counts back from the
+    watermark's day rather than today, so re-running an audit gives the same answer.
+
+Usage:
+    with UsageStore("usage_store.sqlite") as store:
+        store.ingest_all(r"raw\\system__activity_history_*.csv")
+        since = store.window_start(90)
+        store.view_last_used(since)        # {view: datetime of the last query, or None if only undated}
+        store.explore_usage(since)         # [(model, explore, source, last day queried)]
+        store.field_usage(since)           # {field: (queries, datetime of the last query)}
+        store.iter_view_days(since)        # raw (day, view, queries) rows (usage_histogram.py)
+"""
+
+import os
+import glob
+import sqlite3
+from collections import Counter
+from functools import partial
+from datetime import datetime, timedelta
+
+from activity_history import (
+    CHUNK_ROWS, CREATED_COLUMN, FIELDS_COLUMN, DateCache, field_views, imap_chunks,
+    iter_activity_chunks, parse_fields_used
+)
+
+MODEL_COLUMN = "Query Model"
+EXPLORE_COLUMN = "Query Explore"
+SOURCE_COLUMN = "History Source"
+STORE_COLUMNS = (FIELDS_COLUMN, CREATED_COLUMN, MODEL_COLUMN, EXPLORE_COLUMN, SOURCE_COLUMN)
+
+SCHEMA_VERSION = 2
+
+
+def _starts_by(created, day):
+    """Whether a `Query Created Date` is at or before the start of `day` ('YYYY-MM-DD')."""
+    return created[:10] < day or (created[:10] == day and not created[10:].strip("T 0:."))
+
+
+# === CHUNK AGGREGATION (runs in pool workers) ===
+class DayCounts:
+    """(day, view) / (day, model, explore, source) / (day, field) → queries."""
+
+    def __init__(self):
+        self.views = Counter()
+        self.explores = Counter()
+        self.fields = Counter()
+
+    def add(self, day, fields, views, model, explore, source):
+        for view in views:
+            self.views[(day, view)] += 1
+        for field in fields:
+            self.fields[(day, field)] += 1
+        if model and explore:
+            self.explores[(day, model, explore, source.lower())] += 1
+
+    def update(self, other):
+        self.views.update(other.views)
+        self.explores.update(other.explores)
+        self.fields.update(other.fields)
+
+
+class DailyUsage(DayCounts):
+    """
+    Per-day counters for one chunk (or a whole export) of rows past the watermark.
+    Rows on the watermark's day at or before the watermark itself are kept apart in
+    `boundary`: they only count if the export turns out to hold that whole day.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.rows = 0
+        self.ingested = 0
+        self.skipped = 0
+        self.undated = 0
+        self.min_created = None
+        self.max_created = None
+        self.undated_views = Counter()
+        self.boundary = DayCounts()
+        self.boundary_rows = 0
+        self.failures = []
+        self.rejected = None  # why ingest() wrote nothing for this export
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.ingested += other.ingested
+        self.skipped += other.skipped
+        self.undated += other.undated
+        if other.min_created is not None and (self.min_created is None or other.min_created < self.min_created):
+            self.min_created = other.min_created
+        if other.max_created is not None and (self.max_created is None or other.max_created > self.max_created):
+            self.max_created = other.max_created
+        self.update(other)
+        self.undated_views.update(other.undated_views)
+        self.boundary.update(other.boundary)
+        self.boundary_rows += other.boundary_rows
+        self.failures.extend(other.failures)
+        return self
+
+
+def aggregate_daily_chunk(rows, watermark=None):
+    """[(fields, created, model, explore, source)] → DailyUsage for rows on or after `watermark`'s day."""
+    usage = DailyUsage()
+    usage.rows = len(rows)
+    parse_date = DateCache()
+    parsed = {}  # fields_raw → (fields, views), or the parse error
+    boundary_day = watermark[:10] if watermark is not None else None
+
+    for fields_raw, created, model, explore, source in rows:
+        if created:
+            try:
+                parse_date(created)
+            except ValueError as e:
+                usage.failures.append((created, str(e)))
+                continue
+            # The export's date range counts every dated row, skipped ones included
+            if usage.min_created is None or created < usage.min_created:
+                usage.min_created = created
+            if usage.max_created is None or created > usage.max_created:
+                usage.max_created = created
+            if boundary_day is not None and created[:10] < boundary_day:
+                usage.skipped += 1
+                continue
+        entry = parsed.get(fields_raw)
+        if entry is None:
+            try:
+                fields = tuple(dict.fromkeys(parse_fields_used(fields_raw)))
+                entry = (fields, field_views(fields))
+            except ValueError as e:
+                entry = e
+            parsed[fields_raw] = entry
+        if isinstance(entry, ValueError):
+            usage.failures.append((fields_raw, str(entry)))
+            continue
+        if not created:
+            usage.undated += 1
+            usage.undated_views.update(entry[1])
+            continue
+
+        day = created[:10]
+        usage.ingested += 1
+        target = usage
+        if day == boundary_day and created <= watermark:
+            usage.boundary_rows += 1
+            target = usage.boundary
+        target.add(day, *entry, model, explore, source)
+    return usage
+
+
+# === STORE ===
+class UsageStore:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self._init_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _init_schema(self):
+        cur = self.conn.cursor()
+        cur.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = cur.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is not None and row[0] == "1":
+            # v2 records each export's date range; older exports keep NULLs
+            cur.execute("ALTER TABLE exports ADD COLUMN min_created TEXT")
+            cur.execute("ALTER TABLE exports ADD COLUMN max_created TEXT")
+            cur.execute("UPDATE meta SET value = ? WHERE key = 'schema_version'", (str(SCHEMA_VERSION),))
+            row = (str(SCHEMA_VERSION),)
+        if row is not None and row[0] != str(SCHEMA_VERSION):
+            raise ValueError(
+                f"Usage store {self.db_path} has schema {row[0]}, expected {SCHEMA_VERSION}; "
+                f"move it aside and re-ingest the exports"
+            )
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS exports (
+                path        TEXT PRIMARY KEY,
+                size        INTEGER NOT NULL,
+                mtime_ns    INTEGER NOT NULL,
+                rows        INTEGER NOT NULL,
+                ingested    INTEGER NOT NULL,
+                ingested_at TEXT NOT NULL,
+                min_created TEXT,
+                max_created TEXT
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS view_day (
+                day TEXT NOT NULL, view TEXT NOT NULL, queries INTEGER NOT NULL,
+                PRIMARY KEY (day, view)
+            ) WITHOUT ROWID
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS explore_day (
+                day TEXT NOT NULL, model TEXT NOT NULL, explore TEXT NOT NULL, source TEXT NOT NULL,
+                queries INTEGER NOT NULL,
+                PRIMARY KEY (day, model, explore, source)
+            ) WITHOUT ROWID
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS field_day (
+                day TEXT NOT NULL, field TEXT NOT NULL, queries INTEGER NOT NULL,
+                PRIMARY KEY (day, field)
+            ) WITHOUT ROWID
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS view_undated (
+                export TEXT NOT NULL, view TEXT NOT NULL, queries INTEGER NOT NULL,
+                PRIMARY KEY (export, view)
+            ) WITHOUT ROWID
+        """)
+        cur.execute(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+        )
+        self.conn.commit()
+
+    # --- Watermark ---
+    @property
+    def watermark(self):
+        """Latest `Query Created Date` ingested so far (as written in the export), or None."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'watermark'").fetchone()
+        return row[0] if row else None
+
+    def window_start(self, lookback_days):
+        """First day ('YYYY-MM-DD') of a `lookback_days` window ending on the watermark's day."""
+        watermark = self.watermark
+        if lookback_days is None or watermark is None:
+            return None
+        last_day = datetime.strptime(watermark[:10], "%Y-%m-%d")
+        return (last_day - timedelta(days=lookback_days - 1)).strftime("%Y-%m-%d")
+
+    # --- Ingestion ---
+    def ingest(self, path, workers=1, chunk_rows=CHUNK_ROWS):
+        """
+        Add one history export. Returns a DailyUsage with the row counts and parse
+        failures (or, if the export was refused, `rejected`), or None if this exact file
+        (path, size, mtime) was ingested before.
+        """
+        key = os.path.abspath(path)
+        st = os.stat(path)
+        known = self.conn.execute("SELECT size, mtime_ns FROM exports WHERE path = ?", (key,)).fetchone()
+        if known == (st.st_size, st.st_mtime_ns):
+            return None
+
+        watermark = self.watermark
+        aggregate = partial(aggregate_daily_chunk, watermark=watermark)
+        usage = DailyUsage()
+        chunks = iter_activity_chunks(path, chunk_rows, columns=STORE_COLUMNS)
+        for partial_usage in imap_chunks(aggregate, chunks, workers):
+            usage.merge(partial_usage)
+
+        newest = self.conn.execute("SELECT MAX(max_created) FROM exports WHERE path != ?", (key,)).fetchone()[0]
+        if usage.max_created is not None and newest is not None and usage.max_created < newest:
+            usage.rejected = (
+                f"covers {usage.min_created} to {usage.max_created}, older than an export already "
+                f"ingested (up to {newest}); ingest exports oldest first"
+            )
+            return usage
+
+        replace_day = (
+            watermark is not None and usage.min_created is not None and _starts_by(usage.min_created, watermark[:10])
+        )
+        with self.conn:
+            if replace_day:
+                # This export holds the watermark's whole day: replace it, don't add
+                for table in ("view_day", "explore_day", "field_day"):
+                    self.conn.execute(f"DELETE FROM {table} WHERE day = ?", (watermark[:10],))
+                usage.update(usage.boundary)
+            else:
+                # Starts partway through the day: rows up to the watermark are already counted
+                usage.ingested -= usage.boundary_rows
+            self.conn.execute("DELETE FROM view_undated WHERE export = ?", (key,))
+            self.conn.executemany(
+                "INSERT INTO view_undated (export, view, queries) VALUES (?, ?, ?)",
+                ((key, view, n) for view, n in usage.undated_views.items())
+            )
+            self.conn.executemany(
+                "INSERT INTO view_day (day, view, queries) VALUES (?, ?, ?) "
+                "ON CONFLICT (day, view) DO UPDATE SET queries = queries + excluded.queries",
+                ((day, view, n) for (day, view), n in usage.views.items())
+            )
+            self.conn.executemany(
+                "INSERT INTO explore_day (day, model, explore, source, queries) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (day, model, explore, source) DO UPDATE SET queries = queries + excluded.queries",
+                ((day, model, explore, source, n) for (day, model, explore, source), n in usage.explores.items())
+            )
+            self.conn.executemany(
+                "INSERT INTO field_day (day, field, queries) VALUES (?, ?, ?) "
+                "ON CONFLICT (day, field) DO UPDATE SET queries = queries + excluded.queries",
+                ((day, field, n) for (day, field), n in usage.fields.items())
+            )
+            if usage.max_created is not None and (watermark is None or usage.max_created > watermark):
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('watermark', ?)", (usage.max_created,)
+                )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO exports "
+                "(path, size, mtime_ns, rows, ingested, ingested_at, min_created, max_created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, st.st_size, st.st_mtime_ns, usage.rows, usage.ingested,
+                 datetime.now().isoformat(timespec="seconds"), usage.min_created, usage.max_created)
+            )
+        return usage
+
+    def ingest_all(self, pattern, workers=1):
+        """Ingest every export matching `pattern`, oldest name first; returns {path: DailyUsage}."""
+        return {path: self.ingest(path, workers=workers) for path in sorted(glob.glob(pattern))}
+
+    # --- Queries ---
+    @staticmethod
+    def _window(since, until):
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("day >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("day <= ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def view_last_used(self, since=None, until=None, include_undated=True):
+        """
+        {view: datetime of its last query} for views queried in the window. Views seen
+        only in undated rows (which no window can exclude) map to None.
+        """
+        where, params = self._window(since, until)
+        last_used = {}
+        if include_undated:
+            last_used.update((view, None) for (view,) in self.conn.execute("SELECT DISTINCT view FROM view_undated"))
+        last_used.update(
+            (view, datetime.strptime(day, "%Y-%m-%d"))
+            for view, day in self.conn.execute(f"SELECT view, MAX(day) FROM view_day{where} GROUP BY view", params)
+        )
+        return last_used
+
+    def explore_usage(self, since=None, until=None):
+        """(model, explore, source, last day 'YYYY-MM-DD') for each explore/source queried in the window."""
+        where, params = self._window(since, until)
+        return self.conn.execute(
+            f"SELECT model, explore, source, MAX(day) FROM explore_day{where} "
+            f"GROUP BY model, explore, source ORDER BY model, explore, source",
+            params
+        ).fetchall()
+
+    def iter_view_days(self, since=None, until=None):
+        """Raw (day, view, queries) rows in the window, for per-day histograms."""
+        where, params = self._window(since, until)
+        return self.conn.execute(f"SELECT day, view, queries FROM view_day{where}", params)
+
+    def iter_explore_days(self, since=None, until=None):
+        """Raw (day, model, explore, source, queries) rows in the window, for per-day histograms."""
+        where, params = self._window(since, until)
+        return self.conn.execute(f"SELECT day, model, explore, source, queries FROM explore_day{where}", params)
+
+    def iter_field_days(self, since=None, until=None):
+        """Raw (day, field, queries) rows in the window, for per-field aggregators."""
+        where, params = self._window(since, until)
+        return self.conn.execute(f"SELECT day, field, queries FROM field_day{where}", params)
+
+    def field_usage(self, since=None, until=None):
+        """{"view.field": (queries, datetime of its last query)} for fields queried in the window."""
+        where, params = self._window(since, until)
+        return {
+            field: (queries, datetime.strptime(day, "%Y-%m-%d"))
+            for field, queries, day in self.conn.execute(
+                f"SELECT field, SUM(queries), MAX(day) FROM field_day{where} GROUP BY field", params
+            )
+        }
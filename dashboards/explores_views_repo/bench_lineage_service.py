@@ -0,0 +1,132 @@
+"""
+Description:
+    Load test for `lineage_service.py`: fires concurrent lookups and reports
+    throughput and p50 / p99 latency per endpoint.
+
+    - Without a URL, starts the service in-process on a free port (loading the same
+      pipeline outputs `lineage_service.py` would) and stops it afterwards.
+    - Request targets are sampled from the live service (`/relations` plus the
+      dashboards / views / explores those relations resolve to), with a fixed seed so
+      runs are comparable.
+
+Usage:
+    python bench_lineage_service.py                            # in-process service
+    python bench_lineage_service.py http://127.0.0.1:8765      # running service
+    python bench_lineage_service.py http://127.0.0.1:8765 5000 32   # requests, threads
+"""
+
+import sys
+import json
+import time
+import random
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from urllib.request import urlopen
+
+# === CONFIGURATION ===
+REQUESTS = 2000
+THREADS = 16
+SEED = 0
+
+
+def get_json(url):
+    with urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def sample_targets(base_url, n, rng):
+    """(endpoint, path) pairs mixing the lookup endpoints."""
+    relations = get_json(f"{base_url}/relations")
+    if not relations:
+        raise SystemExit("Lineage service has no relations indexed; run the pipeline first")
+
+    dependents = defaultdict(set)
+    for relation in rng.sample(relations, min(len(relations), 200)):
+        for dep in get_json(f"{base_url}/table/{quote(relation, safe='')}")["dependents"]:
+            dependents[dep["kind"]].add(dep["name"])
+
+    pools = {"table": relations}
+    for kind in ("dashboard", "view", "explore"):
+        if dependents[kind]:
+            pools[kind] = sorted(dependents[kind])
+    endpoints = sorted(pools)
+    return [
+        (endpoint, f"/{endpoint}/{quote(rng.choice(pools[endpoint]), safe='')}")
+        for endpoint in (rng.choice(endpoints) for _ in range(n))
+    ]
+
+
+def run_load(base_url, n_requests=REQUESTS, threads=THREADS, seed=SEED):
+    rng = random.Random(seed)
+    targets = sample_targets(base_url, n_requests, rng)
+    latencies = defaultdict(list)
+    errors = []
+    lock = threading.Lock()
+
+    def hit(target):
+        endpoint, path = target
+        start = time.perf_counter()
+        try:
+            with urlopen(base_url + path, timeout=10) as response:
+                response.read()
+        except OSError as e:
+            with lock:
+                errors.append(f"{path}: {e}")
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies[endpoint].append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(hit, targets))
+    wall = time.perf_counter() - start
+
+    print(f"\n📊 {n_requests} requests, {threads} threads, {wall:.2f}s ({n_requests / wall:.0f} req/s)")
+    print(f"{'endpoint':<12}{'count':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    everything = []
+    for endpoint in sorted(latencies):
+        values = sorted(latencies[endpoint])
+        everything.extend(values)
+        print(f"{endpoint:<12}{len(values):>8}{percentile(values, 50):>10.2f}"
+              f"{percentile(values, 99):>10.2f}{values[-1]:>10.2f}")
+    everything.sort()
+    print(f"{'all':<12}{len(everything):>8}{percentile(everything, 50):>10.2f}"
+          f"{percentile(everything, 99):>10.2f}{everything[-1] if everything else 0:>10.2f}")
+    if errors:
+        print(f"⚠️ {len(errors)} failed requests, e.g. {errors[0]}")
+    return not errors
+
+
+def main():
+    base_url = sys.argv[1].rstrip("/") if len(sys.argv) > 1 else None
+    n_requests = int(sys.argv[2]) if len(sys.argv) > 2 else REQUESTS
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else THREADS
+
+    server = None
+    if base_url is None:
+        from lineage_service import LineageService, make_server
+        server = make_server(LineageService(), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        print(f"🚀 In-process lineage service on {base_url}")
+    try:
+        ok = run_load(base_url, n_requests, threads)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
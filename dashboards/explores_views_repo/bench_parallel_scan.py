@@ -0,0 +1,58 @@
+"""
+Description:
+    Benchmarks `lookml_parser.scan_repo` with 1..N worker processes on a synthetic
+    `looker-master` tree (`lookml_synthetic.py`), and checks that every worker count
+    produces exactly the same rows as the serial run.
+
+Usage:
+    python bench_parallel_scan.py                 # 2,000 files, workers 1..cpu_count
+    python bench_parallel_scan.py 10000 8         # 10,000 files, workers 1..8
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+from lookml_parser import scan_repo, lookml_rows
+from lookml_synthetic import write_synthetic_repo
+
+# === CONFIGURATION ===
+DEFAULT_FILES = 2000
+
+
+def rows_for(files):
+    return [tuple(row.values()) for parsed in files for row in lookml_rows(parsed)]
+
+
+def main():
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_FILES
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "looker-master")
+        counts = write_synthetic_repo(root, n_files)
+        n_files = counts["files"]
+        print(f"🧪 Synthetic repo: {n_files} files ({counts['views']} views)")
+
+        baseline_rows = None
+        baseline_time = None
+        for workers in range(1, max_workers + 1):
+            start = time.perf_counter()
+            files = scan_repo(root, workers=workers)
+            elapsed = time.perf_counter() - start
+
+            rows = rows_for(files)
+            if baseline_rows is None:
+                baseline_rows, baseline_time = rows, elapsed
+            identical = "identical" if rows == baseline_rows else "❌ DIFFERENT"
+
+            print(
+                f"  workers={workers:<3} {elapsed:7.2f}s  "
+                f"{n_files / elapsed:9.0f} files/s  "
+                f"speedup x{baseline_time / elapsed:4.2f}  rows {identical}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Description:
+    Throughput benchmark for the LookML scanner on synthetic repos of 1k / 10k / 100k files.
+
+    For each size, a synthetic `looker-master` tree is generated once (`lookml_synthetic.py`,
+    kept under REPO_CACHE_DIR so reruns skip generation) and then measured in a fresh child
+    process per stage, so peak RSS belongs to that stage alone:
+        - parse:    `lookml_parser.scan_repo` (read + tokenize every file)
+        - pipeline: parse + extends/include resolution + row streaming + lineage graph,
+                    i.e. what script_01 does without the scan cache
+
+    Every run is appended to RESULTS_CSV and compared with the previous run of the same
+    (stage, files, workers). A files/sec drop beyond REGRESSION_THRESHOLD is flagged and
+    the script exits with status 1, so a parser change can be checked before it lands.
+
+Outputs:
+    - RESULTS_CSV: timestamp, parser_version, stage, files, workers, seconds,
+                   files_per_sec, peak_rss_mb
+
+Usage:
+    python bench_scanner.py                   # 1,000 / 10,000 / 100,000 files
+    python bench_scanner.py 1000 5000         # custom sizes
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import tempfile
+import subprocess
+from datetime import datetime
+
+try:
+    import resource  # not available on Windows
+except ImportError:
+    resource = None
+
+from lookml_parser import PARSER_VERSION, OUTPUT_FIELDS, scan_repo
+from lookml_synthetic import write_synthetic_repo
+
+# === CONFIGURATION ===
+DEFAULT_SIZES = (1000, 10000, 100000)
+STAGES = ("parse", "pipeline")
+WORKERS = 1                 # process-pool size passed to scan_repo
+SEED = 0
+REPO_CACHE_DIR = os.path.join(tempfile.gettempdir(), "lookml_bench_repos")
+RESULTS_CSV = "bench_scanner_results.csv"
+REGRESSION_THRESHOLD = 0.10  # flag a >10% files/sec drop vs. the previous run
+
+RESULT_FIELDS = [
+    "timestamp", "parser_version", "stage", "files", "workers",
+    "seconds", "files_per_sec", "peak_rss_mb",
+]
+
+
+# === CHILD PROCESS: run one stage and report ===
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_stage(stage, root, workers):
+    start = time.perf_counter()
+    files = scan_repo(root, workers=workers)
+    if stage == "pipeline":
+        from lookml_project import LookmlProject, project_rows
+        from row_sink import RowSink
+        from lineage_graph import LineageGraphBuilder, add_lookml_project
+
+        project = LookmlProject(files)
+        with tempfile.TemporaryDirectory() as tmp:
+            with RowSink(os.path.join(tmp, "rows.csv"), OUTPUT_FIELDS) as sink:
+                sink.add_all(project_rows(project))
+            builder = LineageGraphBuilder()
+            add_lookml_project(builder, project)
+            builder.build().save(os.path.join(tmp, "lineage.graph"))
+    elapsed = time.perf_counter() - start
+    return {"files": len(files), "seconds": elapsed, "peak_rss_mb": _peak_rss_mb()}
+
+
+def child_main(stage, root, workers):
+    print(json.dumps(_run_stage(stage, root, workers)))
+
+
+# === PARENT: generate repos, spawn stages, record results ===
+def ensure_repo(n_files):
+    root = os.path.join(REPO_CACHE_DIR, f"n{n_files}_seed{SEED}", "looker-master")
+    marker = os.path.join(os.path.dirname(root), "complete")
+    if not os.path.exists(marker):
+        start = time.perf_counter()
+        counts = write_synthetic_repo(root, n_files, seed=SEED)
+        with open(marker, "w") as f:
+            json.dump(counts, f)
+        print(f"🧪 Generated {counts['files']} files in {time.perf_counter() - start:.1f}s: {root}")
+    return root
+
+
+def measure(stage, root, workers):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", stage, root, str(workers)],
+        check=True, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def load_previous():
+    previous = {}
+    if os.path.exists(RESULTS_CSV):
+        with open(RESULTS_CSV, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                previous[(row["stage"], row["files"], row["workers"])] = row
+    return previous
+
+
+def append_results(rows):
+    new_file = not os.path.exists(RESULTS_CSV)
+    with open(RESULTS_CSV, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or list(DEFAULT_SIZES)
+    previous = load_previous()
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    results = []
+    regressions = []
+
+    for n_files in sizes:
+        root = ensure_repo(n_files)
+        for stage in STAGES:
+            m = measure(stage, root, WORKERS)
+            files_per_sec = m["files"] / m["seconds"] if m["seconds"] else 0.0
+            row = {
+                "timestamp": timestamp,
+                "parser_version": PARSER_VERSION,
+                "stage": stage,
+                "files": m["files"],
+                "workers": WORKERS,
+                "seconds": f"{m['seconds']:.3f}",
+                "files_per_sec": f"{files_per_sec:.0f}",
+                "peak_rss_mb": "" if m["peak_rss_mb"] is None else f"{m['peak_rss_mb']:.1f}",
+            }
+            results.append(row)
+
+            delta = ""
+            prev = previous.get((stage, str(m["files"]), str(WORKERS)))
+            if prev and float(prev["files_per_sec"]) > 0:
+                change = files_per_sec / float(prev["files_per_sec"]) - 1
+                delta = f"  {change:+.1%} vs {prev['timestamp']}"
+                if change < -REGRESSION_THRESHOLD:
+                    delta += "  ❌ REGRESSION"
+                    regressions.append((stage, m["files"]))
+
+            print(
+                f"  {stage:<9} files={m['files']:<7} {m['seconds']:8.2f}s  "
+                f"{files_per_sec:8.0f} files/s  peak RSS {row['peak_rss_mb'] or 'n/a':>7} MB{delta}"
+            )
+
+    append_results(results)
+    print(f"✅ Benchmark results appended to: {RESULTS_CSV}")
+    if regressions:
+        print(f"❌ Throughput regressions (> {REGRESSION_THRESHOLD:.0%}): {regressions}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child_main(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        main()
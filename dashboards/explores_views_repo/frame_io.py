@@ -0,0 +1,151 @@
+"""
+Description:
+    Interchange files between the explores_views_repo stages (script_01 → 02 → 03/04).
+
+    Formats:
+        - "csv":     plain CSV (default; also the export format for the Google Sheets hand-off)
+        - "parquet": typed Parquet (needs pyarrow)
+        - "arrow":   Arrow IPC / Feather v2 (needs pyarrow)
+
+    In the columnar formats, repeated-name columns (CATEGORICAL_COLUMNS: model / explore /
+    view names, lkml_file, dashboard titles, tables, ...) are stored as categoricals, and
+    every other dtype survives the hop instead of being re-inferred from text.
+
+    A stage writes with `write_stage_frame`: the CSV export first (if wanted), then the
+    columnar file next to it (same stem, `.parquet` / `.arrow`). A later stage reads with
+    `read_frame`, which takes whichever of `x.csv` / `x.parquet` / `x.arrow` was written
+    last, so readers keep working whatever format the upstream stage is configured with.
+
+Usage:
+    from frame_io import write_stage_frame, read_frame
+    write_stage_frame(df, "script_02-out.csv", fmt="parquet")   # script_02-out.csv + .parquet
+    df = read_frame("script_02-out.csv")                         # reads the .parquet
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pandas as pd
+
+FORMAT_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+# Low-cardinality name columns worth dictionary-encoding
+CATEGORICAL_COLUMNS = {
+    "view_or_model_type", "view_or_model_name", "model_name", "base_view_name",
+    "lkml_file", "sql_table_name", "query_model", "query_explore", "dashboard_title",
+    "redshift_table", "explore_name", "view_name",
+}
+
+
+@contextmanager
+def atomic_output(path):
+    """Yield a temp path next to `path`; it replaces `path` only if the block succeeds."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _require_pyarrow(fmt):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            f"The '{fmt}' interchange format needs pyarrow (pip install pyarrow); use 'csv' otherwise"
+        ) from None
+
+
+def with_format(path, fmt):
+    """'out.csv' + 'parquet' → 'out.parquet'."""
+    return os.path.splitext(path)[0] + FORMAT_EXTENSIONS[fmt]
+
+
+def format_of(path):
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, fmt_ext in FORMAT_EXTENSIONS.items():
+        if ext == fmt_ext:
+            return fmt
+    return "csv"
+
+
+def to_categoricals(df, columns=None):
+    """Copy of `df` with the known name columns (or `columns`) converted to category."""
+    columns = CATEGORICAL_COLUMNS if columns is None else set(columns)
+    df = df.copy()
+    for col in df.columns:
+        dtype = df[col].dtype
+        if col in columns and not isinstance(dtype, pd.CategoricalDtype) and (
+            pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)
+        ):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def write_frame(df, path, fmt=None, categorical=None, **csv_kwargs):
+    """Write `df` to exactly `path` (atomically) in `fmt` (default: from the extension)."""
+    fmt = fmt or format_of(path)
+    with atomic_output(path) as tmp_path:
+        if fmt == "csv":
+            df.to_csv(tmp_path, index=False, **csv_kwargs)
+        else:
+            _require_pyarrow(fmt)
+            typed = to_categoricals(df, categorical).reset_index(drop=True)
+            if fmt == "parquet":
+                typed.to_parquet(tmp_path, index=False)
+            else:
+                typed.to_feather(tmp_path)
+    return path
+
+
+def write_stage_frame(df, csv_path, fmt="csv", export_csv=True, categorical=None):
+    """
+    Write a stage output: `csv_path` itself for "csv", otherwise the CSV export (if
+    `export_csv`) followed by the columnar file with the same stem. Returns the paths.
+    """
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unsupported interchange format: {fmt}")
+    if fmt == "csv":
+        return [write_frame(df, csv_path, "csv")]
+    written = []
+    if export_csv:
+        written.append(write_frame(df, csv_path, "csv"))
+    # Columnar last, so it is the newest file and downstream `read_frame` picks it
+    written.append(write_frame(df, with_format(csv_path, fmt), fmt, categorical=categorical))
+    return written
+
+
+def resolve_frame_path(path):
+    """The most recently written of path's .csv / .parquet / .arrow siblings (or `path`)."""
+    existing = [
+        candidate for candidate in (with_format(path, fmt) for fmt in FORMAT_EXTENSIONS)
+        if os.path.exists(candidate)
+    ]
+    if not existing:
+        return path
+    return max(existing, key=os.path.getmtime)
+
+
+def read_frame(path, keep_categories=True, **csv_kwargs):
+    """
+    Read a stage output in whichever format is newest on disk. `csv_kwargs` only apply
+    to CSV; `keep_categories=False` turns categoricals back into plain object columns.
+    """
+    path = resolve_frame_path(path)
+    fmt = format_of(path)
+    if fmt == "csv":
+        return pd.read_csv(path, **csv_kwargs)
+
+    _require_pyarrow(fmt)
+    df = pd.read_parquet(path) if fmt == "parquet" else pd.read_feather(path)
+    if not keep_categories:
+        for col in df.select_dtypes("category").columns:
+            df[col] = df[col].astype(object)
+    return df
@@ -0,0 +1,96 @@
+"""
+Description:
+    Shared key normalization for the audit joins: one matching rule for every script,
+    applied once per distinct value, with merges on integer codes instead of strings.
+
+    Rule (what the scripts used to repeat as `.astype(str).str.strip().str.lower()`):
+        str(value) → strip leading/trailing whitespace → lower-case
+    (so NaN becomes "nan" and 123 becomes "123", exactly as before).
+
+    `KeyCodes` interns every normalized key seen during the run and hands out stable
+    integer codes. A column is factorized first, so the string work is done once per
+    distinct raw value, and a raw value seen in any earlier column is not normalized
+    again. Because all columns share one code table, codes from different frames (and
+    different column names) compare directly, which makes them cheap merge keys.
+
+Usage:
+    from join_keys import add_key_codes, normalize_columns
+
+    left_keys = add_key_codes(df_main, ["dashboard", "id"])      # adds dashboard_key, id_key
+    right_keys = add_key_codes(df_user, ["dashboard", "id"])
+    merged = df_main.merge(df_user, left_on=left_keys, right_on=right_keys, how="left")
+
+    normalize_columns(df, ["schema_name", "object_name"])       # normalized values in place
+"""
+
+import numpy as np
+import pandas as pd
+
+KEY_SUFFIX = "_key"
+
+
+def normalize_key(value):
+    """The matching rule for a single value."""
+    return str(value).strip().lower()
+
+
+class KeyCodes:
+    def __init__(self):
+        self.codes = {}        # normalized key → code
+        self.categories = []   # code → normalized key
+        self._raw = {}         # str(raw value) → code, so repeats skip normalization
+
+    def __len__(self):
+        return len(self.categories)
+
+    def _code(self, raw_text):
+        code = self._raw.get(raw_text)
+        if code is None:
+            key = raw_text.strip().lower()
+            code = self.codes.get(key)
+            if code is None:
+                code = len(self.categories)
+                self.codes[key] = code
+                self.categories.append(key)
+            self._raw[raw_text] = code
+        return code
+
+    def encode(self, series):
+        """int32 code per row; equal codes ⇔ equal normalized keys."""
+        row_codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        unique_codes = np.fromiter(
+            (self._code(str(value)) for value in uniques), dtype=np.int32, count=len(uniques)
+        )
+        return unique_codes[row_codes]
+
+    def normalize(self, series):
+        """Normalized string per row (for outputs that should show the cleaned key)."""
+        codes = self.encode(series)
+        categories = np.asarray(self.categories, dtype=object)
+        return pd.Series(categories[codes], index=series.index, name=series.name)
+
+    def categorical(self, series):
+        """Codes as a pandas Categorical over the keys interned so far."""
+        codes = self.encode(series)
+        return pd.Categorical.from_codes(codes, categories=pd.Index(self.categories))
+
+
+# One code table per run, shared by every script / module that imports this
+KEYS = KeyCodes()
+
+
+def add_key_codes(df, columns, suffix=KEY_SUFFIX, codes=KEYS):
+    """Add `<column><suffix>` int code columns to `df` (in place); returns their names."""
+    names = []
+    for column in columns:
+        name = f"{column}{suffix}"
+        df[name] = codes.encode(df[column])
+        names.append(name)
+    return names
+
+
+def normalize_columns(df, columns, codes=KEYS):
+    """Replace `columns` in `df` with their normalized keys (in place)."""
+    for column in columns:
+        df[column] = codes.normalize(df[column])
+    return df
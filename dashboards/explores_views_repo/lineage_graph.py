@@ -0,0 +1,353 @@
+"""
+Description:
+    Compact, persisted lineage graph: dashboards → explores → views → tables.
+
+    Nodes are (kind, name) pairs mapped to integer ids. Edges point from the consumer
+    to what it depends on (dashboard → explore → view → table) and are stored twice in
+    CSR form (offsets + targets + edge kinds as `array` buffers): once forward for
+    upstream queries and once reversed for downstream queries. Looking up a node's
+    neighbours is a dict lookup plus an array slice.
+
+    Node kinds:
+        - dashboard  (name = dashboard id, attrs: title)
+        - explore    (name = "model.explore", attrs: model_name, explore_name, lkml_file, base_view_name)
+        - view       (name = view name, attrs: lkml_file, sql_table_name, derived_table_sources;
+                      a Liquid sql_table_name links to every candidate table)
+        - table      (name = relation as written, e.g. analytics.orders)
+
+    Edge kinds:
+        uses_explore, base_view, join, extends, references, sql_table, derived_table, derived_view
+
+    The whole graph serializes to one binary file: a magic header, a JSON block with
+    node names/attributes, then the raw CSR arrays.
+
+Usage:
+    builder = LineageGraphBuilder()
+    add_lookml_project(builder, LookmlProject(parsed_files))
+    graph = builder.build()
+    graph.save("script_01-lookml_lineage.graph")
+
+    graph = LineageGraph.load("script_01-lookml_lineage.graph")
+    graph.upstream("explore", "ecommerce.orders", node_kind="view")
+    graph.downstream_closure("table", "analytics.orders", node_kind="dashboard")
+"""
+
+import sys
+import json
+import struct
+from array import array
+
+from sql_sources import extract_sql_sources
+from lookml_project import LookmlProject
+
+NODE_KINDS = ("dashboard", "explore", "view", "table")
+EDGE_KINDS = (
+    "uses_explore", "base_view", "join", "extends", "references",
+    "sql_table", "derived_table", "derived_view",
+)
+_EDGE_CODES = {kind: code for code, kind in enumerate(EDGE_KINDS)}
+# Edges through which an explore reads a view (`references` edges only link LookML text)
+EXPLORE_VIEW_EDGES = ("base_view", "join")
+
+_MAGIC = b"LKGRAPH1"
+_HEADER_LEN = struct.Struct("<Q")
+
+
+# === BUILDER ===
+class LineageGraphBuilder:
+    def __init__(self):
+        self._ids = {}
+        self._kinds = []
+        self._names = []
+        self._attrs = []
+        self._edges = set()
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Start from an existing graph, e.g. to add dashboards to the LookML graph."""
+        builder = cls()
+        for node_id in range(len(graph.names)):
+            builder.node(graph.kinds[node_id], graph.names[node_id], **graph.node_attrs[node_id])
+        for src in range(len(graph.names)):
+            for dst, kind_code in graph._neighbours(src, forward=True):
+                builder._edges.add((src, dst, kind_code))
+        return builder
+
+    def node(self, kind, name, **attrs):
+        """Return the id for (kind, name), creating it if needed; non-empty attrs are merged in."""
+        if kind not in NODE_KINDS:
+            raise ValueError(f"Unknown node kind: {kind}")
+        key = (kind, name)
+        node_id = self._ids.get(key)
+        if node_id is None:
+            node_id = len(self._names)
+            self._ids[key] = node_id
+            self._kinds.append(kind)
+            self._names.append(name)
+            self._attrs.append({})
+        current = self._attrs[node_id]
+        for attr, value in attrs.items():
+            if value is not None and value != "" and current.get(attr) in (None, ""):
+                current[attr] = value
+        return node_id
+
+    def edge(self, src_id, dst_id, kind):
+        if src_id != dst_id:
+            self._edges.add((src_id, dst_id, _EDGE_CODES[kind]))
+
+    def build(self):
+        n = len(self._names)
+        edges = sorted(self._edges)
+        forward = _csr(n, edges, reverse=False)
+        backward = _csr(n, edges, reverse=True)
+        return LineageGraph(self._kinds, self._names, self._attrs, forward, backward)
+
+
+def _csr(n, edges, reverse):
+    counts = [0] * (n + 1)
+    for src, dst, _ in edges:
+        counts[(dst if reverse else src) + 1] += 1
+    for i in range(n):
+        counts[i + 1] += counts[i]
+    offsets = array("I", counts)
+
+    targets = array("I", bytes(4 * len(edges)))
+    kinds = array("B", bytes(len(edges)))
+    cursor = list(counts[:n])
+    for src, dst, code in edges:
+        a, b = (dst, src) if reverse else (src, dst)
+        targets[cursor[a]] = b
+        kinds[cursor[a]] = code
+        cursor[a] += 1
+    return offsets, targets, kinds
+
+
+# === GRAPH ===
+class LineageGraph:
+    def __init__(self, kinds, names, node_attrs, forward, backward):
+        self.kinds = list(kinds)
+        self.names = list(names)
+        self.node_attrs = list(node_attrs)
+        self._forward = forward
+        self._backward = backward
+        self._ids = {(k, name): i for i, (k, name) in enumerate(zip(self.kinds, self.names))}
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def edge_count(self):
+        return len(self._forward[1])
+
+    def node_id(self, kind, name):
+        return self._ids.get((kind, name))
+
+    def has_node(self, kind, name):
+        return (kind, name) in self._ids
+
+    def nodes(self, kind=None):
+        """Names of all nodes (of `kind`, if given), in id order."""
+        return [name for k, name in zip(self.kinds, self.names) if kind is None or k == kind]
+
+    def attrs(self, kind, name):
+        node_id = self.node_id(kind, name)
+        return {} if node_id is None else self.node_attrs[node_id]
+
+    def _neighbours(self, node_id, forward):
+        offsets, targets, kinds = self._forward if forward else self._backward
+        start, end = offsets[node_id], offsets[node_id + 1]
+        return zip(targets[start:end], kinds[start:end])
+
+    def _query(self, kind, name, forward, node_kind, edge_kind):
+        node_id = self.node_id(kind, name)
+        if node_id is None:
+            return []
+        code = None if edge_kind is None else _EDGE_CODES[edge_kind]
+        return [
+            self.names[t] if node_kind else (self.kinds[t], self.names[t])
+            for t, c in self._neighbours(node_id, forward)
+            if (code is None or c == code) and (node_kind is None or self.kinds[t] == node_kind)
+        ]
+
+    def upstream(self, kind, name, node_kind=None, edge_kind=None):
+        """What (kind, name) depends on directly. Returns names if `node_kind` is given."""
+        return self._query(kind, name, True, node_kind, edge_kind)
+
+    def downstream(self, kind, name, node_kind=None, edge_kind=None):
+        """What depends directly on (kind, name). Returns names if `node_kind` is given."""
+        return self._query(kind, name, False, node_kind, edge_kind)
+
+    def _closure(self, kind, name, forward, node_kind):
+        start = self.node_id(kind, name)
+        if start is None:
+            return []
+        seen = bytearray(len(self.names))
+        seen[start] = 1
+        stack = [start]
+        found = []
+        while stack:
+            node_id = stack.pop()
+            for t, _ in self._neighbours(node_id, forward):
+                if not seen[t]:
+                    seen[t] = 1
+                    stack.append(t)
+                    if node_kind is None or self.kinds[t] == node_kind:
+                        found.append(t)
+        found.sort()
+        return [self.names[t] if node_kind else (self.kinds[t], self.names[t]) for t in found]
+
+    def upstream_closure(self, kind, name, node_kind=None):
+        """Everything (kind, name) depends on, transitively."""
+        return self._closure(kind, name, True, node_kind)
+
+    def downstream_closure(self, kind, name, node_kind=None):
+        """Everything that depends on (kind, name), transitively."""
+        return self._closure(kind, name, False, node_kind)
+
+    # === SERIALIZATION ===
+    def save(self, path):
+        header = {
+            "byteorder": sys.byteorder,
+            "kinds": self.kinds,
+            "names": self.names,
+            "attrs": self.node_attrs,
+            "edge_kinds": list(EDGE_KINDS),
+            "edges": self.edge_count,
+        }
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER_LEN.pack(len(header_bytes)))
+            f.write(header_bytes)
+            for arrays in (self._forward, self._backward):
+                for arr in arrays:
+                    arr.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"Not a lineage graph file: {path}")
+            (header_len,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+            if header["edge_kinds"] != list(EDGE_KINDS):
+                raise ValueError(f"Lineage graph {path} was written with different edge kinds; rebuild it")
+
+            n = len(header["names"])
+            m = header["edges"]
+            sections = []
+            for _ in range(2):
+                offsets, targets, kinds = array("I"), array("I"), array("B")
+                offsets.fromfile(f, n + 1)
+                targets.fromfile(f, m)
+                kinds.fromfile(f, m)
+                if header["byteorder"] != sys.byteorder:
+                    offsets.byteswap()
+                    targets.byteswap()
+                sections.append((offsets, targets, kinds))
+
+        return cls(header["kinds"], header["names"], header["attrs"], sections[0], sections[1])
+
+
+# === PRECOMPUTED TABLE CLOSURES ===
+def view_table_closure(graph):
+    """
+    {view: tables} for every view: its own sql_table / derived_table tables plus the
+    tables of every view its derived SQL reads (`derived_view`), transitively.
+    Each view's closure is computed once and reused by the views built on top of it.
+    """
+    closure = {}
+    for view in graph.nodes("view"):
+        if view in closure:
+            continue
+        tables = set()
+        seen = {view}
+        stack = [view]
+        while stack:
+            current = stack.pop()
+            known = closure.get(current)
+            if known is not None:
+                tables.update(known)
+                continue
+            tables.update(graph.upstream("view", current, node_kind="table"))
+            for parent in graph.upstream("view", current, node_kind="view", edge_kind="derived_view"):
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        closure[view] = frozenset(tables)
+    return closure
+
+
+def explore_table_closure(graph, view_closure=None):
+    """
+    {"model.explore": sorted tables} read by each explore: its base view, every joined
+    view and, through derived tables, every view those read from.
+    """
+    view_closure = view_table_closure(graph) if view_closure is None else view_closure
+    closure = {}
+    for key in graph.nodes("explore"):
+        tables = set()
+        for edge_kind in EXPLORE_VIEW_EDGES:
+            for view in graph.upstream("explore", key, node_kind="view", edge_kind=edge_kind):
+                tables.update(view_closure.get(view, ()))
+        closure[key] = tuple(sorted(tables))
+    return closure
+
+
+# === LOOKML → GRAPH ===
+def explore_key(model_name, explore_name):
+    return f"{model_name}.{explore_name}"
+
+
+def add_lookml_project(builder, project):
+    """
+    Add views, explores, joins and references from a lookml_project.LookmlProject,
+    with extends / refinements / includes already resolved. `references` edges run from
+    each view / explore to the views referenced inside its own block (and refinements).
+    """
+    for parsed in project.files:
+        for view in parsed.views:
+            if view.is_refinement:
+                continue
+            resolved = project.resolve_view_definition(view.name, view)
+            sources = extract_sql_sources(resolved.derived_sql) if resolved.derived_sql is not None else None
+            view_id = builder.node(
+                "view", view.name,
+                lkml_file=resolved.lkml_file,
+                sql_table_name=resolved.sql_table_name,
+                derived_table_sources=", ".join(sources.tables) if sources else None,
+            )
+
+            for table in resolved.sql_table_names:
+                builder.edge(view_id, builder.node("table", table), "sql_table")
+            if sources is not None:
+                for table in sources.tables:
+                    builder.edge(view_id, builder.node("table", table), "derived_table")
+                for parent_view in sources.views:
+                    builder.edge(view_id, builder.node("view", parent_view), "derived_view")
+            for parent in resolved.extends:
+                builder.edge(view_id, builder.node("view", parent), "extends")
+            for ref_view in resolved.references:
+                builder.edge(view_id, builder.node("view", ref_view), "references")
+
+        if parsed.model_name is not None:
+            for explore in project.resolved_explores(parsed):
+                base_view_name = explore.view_name or explore.from_view
+                explore_id = builder.node(
+                    "explore", explore_key(explore.model_name, explore.name),
+                    model_name=explore.model_name,
+                    explore_name=explore.name,
+                    lkml_file=explore.lkml_file,
+                    base_view_name=base_view_name,
+                )
+                builder.edge(explore_id, builder.node("view", base_view_name or explore.name), "base_view")
+                for join in explore.joins:
+                    builder.edge(explore_id, builder.node("view", join.view_name), "join")
+                for ref_view in explore.references:
+                    builder.edge(explore_id, builder.node("view", ref_view), "references")
+
+
+def build_lookml_graph(parsed_files):
+    builder = LineageGraphBuilder()
+    add_lookml_project(builder, LookmlProject(parsed_files))
+    return builder.build()
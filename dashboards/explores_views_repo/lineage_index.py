@@ -0,0 +1,188 @@
+"""
+Description:
+    Persisted inverted index: Redshift relation → dashboards / explores / views / dbt models,
+    and back (dependent → relations).
+
+    Built once from the pipeline outputs:
+        - script_02-dashboard_lineage.graph (dashboards → explores → views → tables); table
+          sets use the precomputed closures from `lineage_graph` (base view, joined views,
+          derived-view chains)
+        - script_03-redshift_tables_to_dashboards.csv (dbt model → `analytics.<model>`),
+          optional
+
+    Stored in SQLite as one row per (relation, dependent) with B-tree indexes on the
+    normalized relation, its reversed form (for suffix lookups such as `orders` →
+    `analytics.orders`) and the dependent, so a lookup is a single indexed query and the
+    index opens without loading everything into memory.
+
+Usage:
+    build_index("lineage_index.sqlite", LineageGraph.load(DASHBOARD_GRAPH), dbt_models_df)
+    with LineageIndex("lineage_index.sqlite") as index:
+        index.dependents("analytics.orders")               # [Dependent(...), ...]
+        index.dependents("orders", suffix=True)            # any schema
+        index.relations("dashboard", "42")                 # reverse direction
+"""
+
+import os
+import sqlite3
+from collections import namedtuple
+from datetime import datetime
+
+from lineage_graph import EXPLORE_VIEW_EDGES, view_table_closure, explore_table_closure
+from relation_matcher import normalize_relation
+
+DEPENDENT_KINDS = ("dashboard", "explore", "view", "dbt_model")
+
+Dependent = namedtuple("Dependent", ["relation", "kind", "name", "label"])
+
+
+def relation_keys(relation):
+    """('analytics.orders', 'orders.analytics') for a raw name, or None if blank."""
+    segments = normalize_relation(relation)
+    if not segments:
+        return None
+    return ".".join(segments), ".".join(reversed(segments))
+
+
+def iter_graph_dependencies(graph):
+    """Yield (relation, kind, name, label) for every view / explore / dashboard in `graph`."""
+    view_closure = view_table_closure(graph)
+    for view, tables in view_closure.items():
+        for table in tables:
+            yield table, "view", view, None
+
+    explore_closure = explore_table_closure(graph, view_closure)
+    for key, tables in explore_closure.items():
+        for table in tables:
+            yield table, "explore", key, None
+
+    for dashboard_id in graph.nodes("dashboard"):
+        title = graph.attrs("dashboard", dashboard_id).get("title")
+        tables = set()
+        for key in graph.upstream("dashboard", dashboard_id, node_kind="explore", edge_kind="uses_explore"):
+            tables.update(explore_closure.get(key, ()))
+        for table in tables:
+            yield table, "dashboard", dashboard_id, title
+
+
+def view_explores(graph):
+    """{view: sorted explores reading it as base view or join}, for every view in `graph`."""
+    return {
+        view: sorted({
+            key
+            for edge_kind in EXPLORE_VIEW_EDGES
+            for key in graph.downstream("view", view, node_kind="explore", edge_kind=edge_kind)
+        })
+        for view in graph.nodes("view")
+    }
+
+
+def explore_dashboards(graph):
+    """{"model.explore": sorted dashboard ids querying it}, for every explore in `graph`."""
+    return {
+        key: sorted(set(graph.downstream("explore", key, node_kind="dashboard", edge_kind="uses_explore")))
+        for key in graph.nodes("explore")
+    }
+
+
+def iter_dbt_dependencies(dbt_models):
+    """Yield (relation, "dbt_model", model file, model name) from script_03's output frame."""
+    for model_file, model_name, full_path in dbt_models[
+        ["dbt_model_file", "dbt_model_name", "potential_full_path"]
+    ].itertuples(index=False):
+        yield full_path, "dbt_model", model_file, model_name
+
+
+def build_index(index_path, graph, dbt_models=None):
+    """(Re)build the index at `index_path`; returns the number of rows written."""
+    tmp_path = index_path + ".building"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("""
+        CREATE TABLE deps (
+            relation     TEXT NOT NULL,
+            relation_rev TEXT NOT NULL,
+            kind         TEXT NOT NULL,
+            name         TEXT NOT NULL,
+            label        TEXT,
+            PRIMARY KEY (relation, kind, name)
+        ) WITHOUT ROWID
+    """)
+
+    sources = [iter_graph_dependencies(graph)]
+    if dbt_models is not None:
+        sources.append(iter_dbt_dependencies(dbt_models))
+
+    rows = {}
+    for source in sources:
+        for relation, kind, name, label in source:
+            keys = relation_keys(relation)
+            if keys is None or name is None:
+                continue
+            rows.setdefault((keys[0], kind, str(name)), (keys[1], label))
+
+    conn.executemany(
+        "INSERT INTO deps (relation, relation_rev, kind, name, label) VALUES (?, ?, ?, ?, ?)",
+        ((relation, rev, kind, name, label) for (relation, kind, name), (rev, label) in rows.items())
+    )
+    conn.execute("CREATE INDEX deps_rev ON deps (relation_rev)")
+    conn.execute("CREATE INDEX deps_dependent ON deps (kind, name)")
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES ('built_at', ?)",
+        (datetime.now().isoformat(timespec="seconds"),)
+    )
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, index_path)
+    return len(rows)
+
+
+class LineageIndex:
+    def __init__(self, index_path):
+        if not os.path.exists(index_path):
+            raise FileNotFoundError(f"Lineage index not found: {index_path} (build it first)")
+        self.conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    @property
+    def built_at(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'built_at'").fetchone()
+        return row[0] if row else None
+
+    def dependents(self, relation, suffix=False, kinds=None):
+        """Everything that reads `relation`; with `suffix`, any relation ending in it."""
+        keys = relation_keys(relation)
+        if keys is None:
+            return []
+        if suffix:
+            rows = self.conn.execute(
+                "SELECT relation, kind, name, label FROM deps "
+                "WHERE relation_rev = ? OR (relation_rev >= ? AND relation_rev < ?) "
+                "ORDER BY relation, kind, name",
+                (keys[1], keys[1] + ".", keys[1] + "/")  # "/" sorts right after "."
+            )
+        else:
+            rows = self.conn.execute(
+                "SELECT relation, kind, name, label FROM deps WHERE relation = ? ORDER BY kind, name",
+                (keys[0],)
+            )
+        return [Dependent(*row) for row in rows if kinds is None or row[1] in kinds]
+
+    def relations(self, kind, name):
+        """Reverse direction: the relations a dashboard / explore / view / dbt model reads."""
+        return [
+            relation for (relation,) in self.conn.execute(
+                "SELECT relation FROM deps WHERE kind = ? AND name = ? ORDER BY relation",
+                (kind, str(name))
+            )
+        ]
@@ -0,0 +1,109 @@
+"""
+Description:
+    "Who depends on this table?" query CLI over the persisted lineage index
+    (`lineage_index.py`), e.g. which dashboards break if `analytics.orders` is dropped.
+
+    - `build` creates INDEX_PATH once from the pipeline outputs (script_02's dashboard
+      lineage graph and, if present, script_03's dbt model mapping). Rerun it after the
+      pipeline has run again.
+    - Every other call only opens the index: one indexed SQLite query per relation, so
+      a file of hundreds of candidate tables is answered in one pass.
+
+Inputs (build only):
+    - script_02-dashboard_lineage.graph
+    - script_03-redshift_tables_to_dashboards.csv (optional)
+
+Output:
+    - Tab-separated rows on stdout: relation, kind, name, label
+      (with --reverse: kind, name, relation)
+    - With --csv: the same rows written to a CSV instead
+
+Usage:
+    python lineage_query.py build
+    python lineage_query.py analytics.orders analytics.customers
+    python lineage_query.py --file candidate_tables.txt --kind dashboard
+    python lineage_query.py --suffix orders
+    python lineage_query.py --reverse dashboard 42
+"""
+
+import os
+import sys
+import csv
+import argparse
+
+from frame_io import read_frame, resolve_frame_path
+from lineage_graph import LineageGraph
+from lineage_index import DEPENDENT_KINDS, LineageIndex, build_index
+
+# === CONFIGURATION ===
+INDEX_PATH = "lineage_index.sqlite"
+DASHBOARD_GRAPH = "script_02-dashboard_lineage.graph"
+DBT_MODELS_CSV = "script_03-redshift_tables_to_dashboards.csv"
+
+
+def build(index_path):
+    graph = LineageGraph.load(DASHBOARD_GRAPH)
+    dbt_models_path = resolve_frame_path(DBT_MODELS_CSV)
+    dbt_models = read_frame(dbt_models_path) if os.path.exists(dbt_models_path) else None
+    rows = build_index(index_path, graph, dbt_models)
+    print(f"✅ Lineage index saved to: {index_path} ({rows} relation → dependent rows)")
+
+
+def read_relations(args):
+    relations = list(args.relations)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            relations.extend(line.strip() for line in f)
+    # Keep input order, drop blanks, comments and repeats
+    return list(dict.fromkeys(r for r in relations if r and not r.startswith("#")))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the Redshift relation → dependents lineage index.")
+    parser.add_argument("relations", nargs="*", help="relations to look up, or `build` to (re)build the index")
+    parser.add_argument("--file", help="file with one relation per line")
+    parser.add_argument("--kind", action="append", choices=DEPENDENT_KINDS, help="only these dependent kinds")
+    parser.add_argument("--suffix", action="store_true", help="match any relation ending in the input")
+    parser.add_argument("--reverse", nargs=2, metavar=("KIND", "NAME"), help="relations read by a dependent")
+    parser.add_argument("--index", default=INDEX_PATH)
+    parser.add_argument("--csv", help="write results to this CSV instead of stdout")
+    args = parser.parse_intermixed_args(argv)
+
+    if args.relations == ["build"]:
+        build(args.index)
+        return 0
+
+    with LineageIndex(args.index) as index:
+        if args.reverse:
+            kind, name = args.reverse
+            header = ["kind", "name", "relation"]
+            rows = [(kind, name, relation) for relation in index.relations(kind, name)]
+        else:
+            relations = read_relations(args)
+            if not relations:
+                parser.error("give at least one relation, --file, --reverse or `build`")
+            header = ["relation", "kind", "name", "label"]
+            rows = []
+            missing = []
+            for relation in relations:
+                found = index.dependents(relation, suffix=args.suffix, kinds=args.kind)
+                rows.extend(found)
+                if not found:
+                    missing.append(relation)
+            if missing:
+                print(f"⚠️ No dependents for {len(missing)} relation(s): {', '.join(missing)}", file=sys.stderr)
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        print(f"✅ {len(rows)} rows saved to: {args.csv}")
+    else:
+        writer = csv.writer(sys.stdout, delimiter="\t", lineterminator="\n")
+        writer.writerows(("" if v is None else v for v in row) for row in rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
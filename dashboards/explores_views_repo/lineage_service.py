@@ -0,0 +1,295 @@
+"""
+Description:
+    Local HTTP/JSON lineage service for ad-hoc impact lookups (table → dashboards,
+    dashboard → tables, view → explores) without opening the pipeline CSVs.
+
+    - Loads script_02's dashboard lineage graph (and script_03's dbt model mapping, if
+      present) into memory once and indexes it: relation → dependents, dependent →
+      relations, last relation segment → relations (suffix lookups), view → explores.
+    - Serves requests from a thread per connection (`ThreadingHTTPServer`). Each request
+      reads the current snapshot once; snapshots are never mutated, so no locking.
+    - Hot-reloads: a background thread polls the inputs' mtimes and, once they stop
+      changing, builds a new snapshot and swaps it in. Requests in flight keep the old one.
+      If the inputs are still changing after RELOAD_SETTLE_ATTEMPTS checks (watch mode
+      rewriting them), the reload is left to the next poll.
+    - Binds to 127.0.0.1 by default and uses only the stdlib plus the pipeline modules.
+
+Endpoints (GET, JSON):
+    /health                          snapshot info (loaded_at, counts)
+    /relations                       every indexed relation
+    /table/<relation>[?suffix=1&kind=dashboard&kind=view]
+                                     what reads the relation (dashboards, explores, views, dbt models)
+    /dashboard/<id or title>         relations a dashboard reads
+    /view/<name>                     relations a view reads + explores using it (base view or join)
+    /explore/<model.explore>         relations an explore reads + dashboards using it
+    /dbt_model/<model file>          relation a dbt model maps to
+
+    Path arguments must be percent-encoded (e.g. a dashboard title "Sales / Ops" is
+    `/dashboard/Sales%20%2F%20Ops`), or passed as `?name=...` instead
+    (`/dashboard?name=Sales%20/%20Ops`); `name` wins over the path.
+
+Usage:
+    python lineage_service.py                 # http://127.0.0.1:8765
+    python lineage_service.py 9000            # custom port
+    curl http://127.0.0.1:8765/table/analytics.orders?kind=dashboard
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from collections import defaultdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, unquote, parse_qs
+
+from frame_io import read_frame, resolve_frame_path
+from lineage_graph import LineageGraph
+from lineage_index import (
+    DEPENDENT_KINDS, iter_graph_dependencies, iter_dbt_dependencies, relation_keys, view_explores, explore_dashboards
+)
+
+# === CONFIGURATION ===
+HOST = "127.0.0.1"
+PORT = 8765
+DASHBOARD_GRAPH = "script_02-dashboard_lineage.graph"
+DBT_MODELS_CSV = "script_03-redshift_tables_to_dashboards.csv"
+RELOAD_INTERVAL = 2.0  # seconds between mtime checks
+RELOAD_SETTLE = 0.5    # inputs must stay unchanged this long before reloading
+RELOAD_SETTLE_ATTEMPTS = 10  # settle checks per poll before giving up until the next poll
+
+
+# === IN-MEMORY SNAPSHOT ===
+class LineageSnapshot:
+    def __init__(self, graph, dbt_models=None):
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
+        self.by_relation = defaultdict(list)   # "analytics.orders" → [{kind, name, label}]
+        self.by_dependent = defaultdict(set)   # (kind, name) → {"analytics.orders"}
+        self.by_last_segment = defaultdict(set)  # "orders" → {"analytics.orders", "prod.analytics.orders"}
+
+        sources = [iter_graph_dependencies(graph)]
+        if dbt_models is not None:
+            sources.append(iter_dbt_dependencies(dbt_models))
+        seen = set()
+        for source in sources:
+            for relation, kind, name, label in source:
+                keys = relation_keys(relation)
+                if keys is None or name is None:
+                    continue
+                relation, name = keys[0], str(name)
+                if (relation, kind, name) in seen:
+                    continue
+                seen.add((relation, kind, name))
+                self.by_relation[relation].append({"kind": kind, "name": name, "label": label})
+                self.by_dependent[(kind, name)].add(relation)
+                self.by_last_segment[relation.rsplit(".", 1)[-1]].add(relation)
+        for dependents in self.by_relation.values():
+            dependents.sort(key=lambda d: (d["kind"], d["name"]))
+
+        self.dashboard_titles = defaultdict(list)
+        for dashboard_id in graph.nodes("dashboard"):
+            title = graph.attrs("dashboard", dashboard_id).get("title")
+            if title:
+                self.dashboard_titles[title.strip().lower()].append(dashboard_id)
+
+        self.view_explores = view_explores(graph)
+        self.explore_dashboards = explore_dashboards(graph)
+
+    @classmethod
+    def load(cls, graph_path, dbt_models_path=None):
+        graph = LineageGraph.load(graph_path)
+        dbt_models = None
+        if dbt_models_path is not None and os.path.exists(dbt_models_path):
+            dbt_models = read_frame(dbt_models_path)
+        return cls(graph, dbt_models)
+
+    def info(self):
+        return {
+            "loaded_at": self.loaded_at,
+            "relations": len(self.by_relation),
+            "dependents": {
+                kind: sum(1 for k, _ in self.by_dependent if k == kind) for kind in DEPENDENT_KINDS
+            },
+        }
+
+    def dependents(self, relation, suffix=False, kinds=None):
+        keys = relation_keys(relation)
+        if keys is None:
+            return []
+        relation = keys[0]
+        if suffix:
+            tail = "." + relation
+            matches = sorted(
+                r for r in self.by_last_segment.get(relation.rsplit(".", 1)[-1], ())
+                if r == relation or r.endswith(tail)
+            )
+        else:
+            matches = [relation] if relation in self.by_relation else []
+        return [
+            dict(dep, relation=r)
+            for r in matches
+            for dep in self.by_relation[r]
+            if not kinds or dep["kind"] in kinds
+        ]
+
+    def relations(self, kind, name):
+        return sorted(self.by_dependent.get((kind, name), ()))
+
+    def dashboard_ids(self, id_or_title):
+        if ("dashboard", id_or_title) in self.by_dependent:
+            return [id_or_title]
+        return self.dashboard_titles.get(id_or_title.strip().lower(), [])
+
+
+# === HOT RELOAD ===
+class LineageService:
+    def __init__(self, graph_path=DASHBOARD_GRAPH, dbt_models_path=DBT_MODELS_CSV):
+        self.graph_path = graph_path
+        self.dbt_models_path = dbt_models_path
+        self._stamp = self._input_stamp()
+        self.snapshot = LineageSnapshot.load(graph_path, self._dbt_path())
+        self._stop = threading.Event()
+
+    def _dbt_path(self):
+        return None if self.dbt_models_path is None else resolve_frame_path(self.dbt_models_path)
+
+    def _input_stamp(self):
+        stamp = []
+        for path in (self.graph_path, self._dbt_path()):
+            try:
+                st = os.stat(path) if path is not None else None
+            except FileNotFoundError:
+                st = None
+            stamp.append(None if st is None else (path, st.st_mtime_ns, st.st_size))
+        return tuple(stamp)
+
+    def reload_if_changed(self):
+        """Swap in a fresh snapshot if the inputs changed; returns True if it did."""
+        stamp = self._input_stamp()
+        if stamp == self._stamp:
+            return False
+        # Outputs are written atomically, but script_02 / script_03 may still be mid-run
+        for _ in range(RELOAD_SETTLE_ATTEMPTS):
+            time.sleep(RELOAD_SETTLE)
+            settled = self._input_stamp()
+            if settled == stamp:
+                break
+            stamp = settled
+        else:
+            return False  # still changing; self._stamp is untouched, so the next poll retries
+        try:
+            snapshot = LineageSnapshot.load(self.graph_path, self._dbt_path())
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Reload failed, keeping snapshot from {self.snapshot.loaded_at}: {e}", file=sys.stderr)
+            return False
+        self.snapshot = snapshot
+        self._stamp = stamp
+        print(f"🔄 Lineage reloaded at {snapshot.loaded_at} ({len(snapshot.by_relation)} relations)")
+        return True
+
+    def watch(self, interval=RELOAD_INTERVAL):
+        while not self._stop.wait(interval):
+            self.reload_if_changed()
+
+    def start_watching(self, interval=RELOAD_INTERVAL):
+        thread = threading.Thread(target=self.watch, args=(interval,), daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+
+# === HTTP ===
+class LineageRequestHandler(BaseHTTPRequestHandler):
+    server_version = "LineageService/1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [unquote(p) for p in url.path.strip("/").split("/", 1)]
+        query = parse_qs(url.query)
+        snapshot = self.server.service.snapshot  # one snapshot per request
+
+        route, arg = parts[0], parts[1] if len(parts) > 1 else None
+        if "name" in query:
+            arg = query["name"][0]  # names containing "/", "?" or "#" without path encoding
+        if route == "health":
+            return self._send(200, snapshot.info())
+        if route == "relations":
+            return self._send(200, sorted(snapshot.by_relation))
+        if arg is None:
+            return self._send(404, {"error": f"Unknown endpoint: {url.path}"})
+
+        if route == "table":
+            suffix = query.get("suffix", ["0"])[0].lower() in ("1", "true", "yes")
+            kinds = set(query.get("kind", ())) or None
+            return self._send(200, {"relation": arg, "dependents": snapshot.dependents(arg, suffix, kinds)})
+        if route == "dashboard":
+            ids = snapshot.dashboard_ids(arg)
+            if not ids:
+                return self._send(404, {"error": f"Unknown dashboard: {arg}"})
+            return self._send(200, [
+                {"dashboard_id": i, "relations": snapshot.relations("dashboard", i)} for i in ids
+            ])
+        if route == "view":
+            if arg not in snapshot.view_explores:
+                return self._send(404, {"error": f"Unknown view: {arg}"})
+            return self._send(200, {
+                "view": arg,
+                "explores": snapshot.view_explores[arg],
+                "relations": snapshot.relations("view", arg),
+            })
+        if route == "explore":
+            if arg not in snapshot.explore_dashboards:
+                return self._send(404, {"error": f"Unknown explore: {arg}"})
+            return self._send(200, {
+                "explore": arg,
+                "dashboards": snapshot.explore_dashboards[arg],
+                "relations": snapshot.relations("explore", arg),
+            })
+        if route == "dbt_model":
+            return self._send(200, {"dbt_model": arg, "relations": snapshot.relations("dbt_model", arg)})
+        return self._send(404, {"error": f"Unknown endpoint: {url.path}"})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # one line per request would dominate the console during load tests
+
+
+class LineageHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default of 5 drops connections under concurrent load
+
+
+def make_server(service, host=HOST, port=PORT):
+    server = LineageHTTPServer((host, port), LineageRequestHandler)
+    server.service = service
+    return server
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    service = LineageService()
+    service.start_watching()
+    server = make_server(service, port=port)
+    info = service.snapshot.info()
+    print(f"🚀 Lineage service on http://{HOST}:{server.server_port} ({info['relations']} relations)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
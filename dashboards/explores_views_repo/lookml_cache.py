@@ -0,0 +1,191 @@
+"""
+Description:
+    Incremental, on-disk index of LookML parse results (SQLite).
+
+    Each `.lkml` file is stored with its mtime, size and SHA-1 content hash next to
+    its parsed model (JSON of `lookml_parser.LookmlFile`). On refresh:
+        - mtime + size unchanged        → served from the index, file not opened
+        - mtime/size changed, same hash → served from the index, stat refreshed
+        - new or content changed        → re-parsed (optionally on a process pool)
+        - deleted from the tree         → dropped from the index
+
+    The index is rebuilt from scratch if `lookml_parser.PARSER_VERSION` changes, so a
+    parser upgrade never mixes old and new parse results.
+
+Usage:
+    from lookml_cache import ScanCache
+    with ScanCache("script_01-lookml_scan_cache.sqlite") as cache:
+        files = cache.refresh(LOOKML_ROOT)
+        print(cache.stats)
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+from dataclasses import asdict
+
+from lookml_parser import (
+    PARSER_VERSION, decode_lkml, iter_lkml_files, map_files, parse_text, lookml_file_from_dict
+)
+
+
+def _hash_and_parse(path, base_dir, known_hash):
+    """Read a file once; parse it only if its content hash differs from `known_hash`."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha1(raw).hexdigest()
+    if digest == known_hash:
+        return digest, None
+    text = decode_lkml(raw)
+    parsed = parse_text(text, path, os.path.relpath(path, base_dir))
+    return digest, asdict(parsed)
+
+
+def _hash_and_parse_job(job, base_dir):
+    path, known_hash = job
+    return _hash_and_parse(path, base_dir, known_hash)
+
+
+class ScanCache:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.stats = {}
+        self._init_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _init_schema(self):
+        cur = self.conn.cursor()
+        cur.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path      TEXT PRIMARY KEY,
+                lkml_file TEXT NOT NULL,
+                mtime_ns  INTEGER NOT NULL,
+                size      INTEGER NOT NULL,
+                sha1      TEXT NOT NULL,
+                parsed    TEXT NOT NULL
+            )
+        """)
+        row = cur.execute("SELECT value FROM meta WHERE key = 'parser_version'").fetchone()
+        if row is None or row[0] != str(PARSER_VERSION):
+            cur.execute("DELETE FROM files")
+            cur.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('parser_version', ?)",
+                (str(PARSER_VERSION),)
+            )
+        self.conn.commit()
+
+    def refresh(self, root, workers=1):
+        """Bring the index in line with `root` and return all parsed files in path order."""
+        return list(self.iter_refresh(root, workers=workers))
+
+    def iter_refresh(self, root, workers=1):
+        """
+        Bring the index in line with `root`, then yield parsed files one at a time
+        in path order (the index is fully updated before the first file is yielded).
+        """
+        base_dir = os.path.dirname(os.path.abspath(root))
+        cached = {
+            path: (mtime_ns, size, sha1)
+            for path, mtime_ns, size, sha1 in self.conn.execute(
+                "SELECT path, mtime_ns, size, sha1 FROM files"
+            )
+        }
+
+        paths = list(iter_lkml_files(root))
+        current_stats = {}
+        stale = []
+        for path in paths:
+            st = os.stat(path)
+            current_stats[path] = (st.st_mtime_ns, st.st_size)
+            entry = cached.get(path)
+            if entry is None or entry[:2] != current_stats[path]:
+                stale.append((path, entry[2] if entry else None))
+
+        # --- Re-hash (and re-parse if needed) only the files whose stat changed ---
+        reparsed, touched, _ = self._update(stale, current_stats, base_dir, workers)
+
+        # --- Drop files that no longer exist under this root ---
+        deleted = [p for p in cached if p not in current_stats and _is_under(p, root)]
+        self.forget(deleted)
+
+        self.stats = {
+            "files": len(paths),
+            "cached": len(paths) - reparsed,
+            "reparsed": reparsed,
+            "rehashed_unchanged": touched,
+            "deleted": len(deleted),
+        }
+        yield from self.iter_load(paths)
+
+    def update_files(self, root, paths, workers=1):
+        """
+        Re-hash / re-parse just `paths` (e.g. the files a watcher saw change) and return
+        {path: LookmlFile} for those whose content actually changed.
+        """
+        base_dir = os.path.dirname(os.path.abspath(root))
+        stale = []
+        current_stats = {}
+        for path in paths:
+            row = self.conn.execute("SELECT sha1 FROM files WHERE path = ?", (path,)).fetchone()
+            stale.append((path, row[0] if row else None))
+            st = os.stat(path)
+            current_stats[path] = (st.st_mtime_ns, st.st_size)
+        _, _, parsed_files = self._update(stale, current_stats, base_dir, workers, collect=True)
+        return parsed_files
+
+    def _update(self, stale, current_stats, base_dir, workers, collect=False):
+        """
+        Store hash/parse results for `stale` [(path, known_sha1)]. Returns (reparsed, touched,
+        {path: LookmlFile}); the dict is only filled with `collect`.
+        """
+        results = map_files(_hash_and_parse_job, stale, base_dir, workers=workers)
+        reparsed = 0
+        touched = 0
+        parsed_files = {}
+        with self.conn:
+            for (path, _), (digest, parsed) in zip(stale, results):
+                mtime_ns, size = current_stats[path]
+                if parsed is None:
+                    touched += 1
+                    self.conn.execute(
+                        "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                        (mtime_ns, size, path)
+                    )
+                else:
+                    reparsed += 1
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO files (path, lkml_file, mtime_ns, size, sha1, parsed) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (path, parsed["lkml_file"], mtime_ns, size, digest, json.dumps(parsed))
+                    )
+                    if collect:
+                        parsed_files[path] = lookml_file_from_dict(parsed)
+        return reparsed, touched, parsed_files
+
+    def forget(self, paths):
+        """Drop `paths` (deleted files) from the index."""
+        with self.conn:
+            self.conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in paths])
+
+    def iter_load(self, paths):
+        """Yield parsed files for `paths`, in the given order, without loading the whole index."""
+        for path in paths:
+            row = self.conn.execute("SELECT parsed FROM files WHERE path = ?", (path,)).fetchone()
+            if row is not None:
+                yield lookml_file_from_dict(json.loads(row[0]))
+
+
+def _is_under(path, root):
+    root = os.path.abspath(root)
+    return os.path.abspath(path).startswith(root + os.sep)
@@ -0,0 +1,185 @@
+"""
+Description:
+    Evaluation layer for LookML constants (`@{name}`) and Liquid in table names and SQL.
+
+    - Constants are loaded once from the `constant:` blocks of `manifest.lkml` and
+      substituted everywhere (constants may reference other constants).
+    - `{{ ... }}` outputs are replaced when a value is configured in `liquid_values`
+      (e.g. {"_user_attributes['schema']": "analytics"}); otherwise they stay unresolved.
+    - `{% if / elsif / else / unless / case / when %}` blocks in sql_table_name are
+      expanded into every candidate table (or only the first branch of each block
+      with expand_liquid=False). Candidates still containing an unresolved output
+      are dropped rather than reported as garbage table names.
+    - Derived-table SQL only gets constants and known outputs substituted here. The SQL
+      source extractor expands its Liquid branches with `expand_sql` (every branch,
+      unresolved `{{ }}` outputs kept as written) and merges the sources of all variants.
+
+    Substituted and expanded strings are cached per evaluator, since the same
+    constants and table expressions repeat across hundreds of files.
+
+Usage:
+    evaluator = LookmlEvaluator(constants={"schema": "analytics"})
+    evaluator.expand_table_name("@{schema}.orders")    # ("analytics.orders",)
+"""
+
+import re
+from itertools import product
+
+from lookml_parser import clean_sql_table_name
+
+_CONSTANT_RE = re.compile(r"@\{\s*([\w\-]+)\s*\}")
+_LIQUID_RE = re.compile(r"(\{%-?.*?-?%\}|\{\{-?.*?-?\}\})", re.DOTALL)
+_TAG_NAME_RE = re.compile(r"\{%-?\s*(\w+)")
+_OUTPUT_BODY_RE = re.compile(r"\{\{-?\s*(.*?)\s*-?\}\}", re.DOTALL)
+
+UNRESOLVED = "\x00unresolved\x00"
+MAX_CONSTANT_DEPTH = 10
+
+_BLOCK_OPEN = {"if": "endif", "unless": "endunless", "case": "endcase"}
+_BLOCK_CLOSE = set(_BLOCK_OPEN.values())
+_BRANCH_TAGS = {"elsif", "else", "when"}
+
+
+def _parse_liquid(text):
+    """Split text into a tree of literals and branch nodes: ("lit", s) / ("branch", [[nodes], ...], has_else)."""
+    root = []
+    stack = [(root, None)]  # (current node list, open branch node)
+    for piece in _LIQUID_RE.split(text):
+        if not piece:
+            continue
+        if piece.startswith("{{"):
+            stack[-1][0].append(("out", _OUTPUT_BODY_RE.match(piece).group(1)))
+            continue
+        if not piece.startswith("{%"):
+            stack[-1][0].append(("lit", piece))
+            continue
+
+        tag_match = _TAG_NAME_RE.match(piece)
+        tag = tag_match.group(1) if tag_match else ""
+        if tag in _BLOCK_OPEN:
+            first_branch = []
+            node = ["branch", [first_branch], False]
+            stack[-1][0].append(node)
+            stack.append((first_branch, node))
+        elif tag in _BRANCH_TAGS and stack[-1][1] is not None:
+            node = stack[-1][1]
+            branch = []
+            node[1].append(branch)
+            if tag == "else":
+                node[2] = True
+            stack[-1] = (branch, node)
+        elif tag in _BLOCK_CLOSE and stack[-1][1] is not None:
+            stack.pop()
+        # other tags (assign, condition / endcondition, ...) render nothing
+    return root
+
+
+class LookmlEvaluator:
+    def __init__(self, constants=None, liquid_values=None, expand_liquid=True, max_variants=64):
+        self.constants = dict(constants or {})
+        self.liquid_values = dict(liquid_values or {})
+        self.expand_liquid = expand_liquid
+        self.max_variants = max_variants
+        self._substituted = {}
+        self._expanded = {}
+        self._expanded_sql = {}
+
+    @classmethod
+    def from_files(cls, parsed_files, **kwargs):
+        """Collect `constant:` values from the parsed manifest(s)."""
+        constants = {}
+        for parsed in parsed_files:
+            for name, value in parsed.constants.items():
+                constants.setdefault(name, value)
+        return cls(constants, **kwargs)
+
+    def substitute_constants(self, text):
+        for _ in range(MAX_CONSTANT_DEPTH):
+            if "@{" not in text:
+                break
+            text = _CONSTANT_RE.sub(lambda m: self.constants.get(m.group(1), m.group(0)), text)
+        return text
+
+    def substitute(self, text):
+        """Constants and configured `{{ }}` outputs substituted; Liquid tags left in place."""
+        if not text:
+            return text
+        cached = self._substituted.get(text)
+        if cached is not None:
+            return cached
+
+        result = self.substitute_constants(text)
+        if "{{" in result and self.liquid_values:
+            def output(match):
+                body = _OUTPUT_BODY_RE.match(match.group(0)).group(1)
+                return self.liquid_values.get(body, match.group(0))
+            result = re.sub(r"\{\{-?.*?-?\}\}", output, result, flags=re.DOTALL)
+
+        self._substituted[text] = result
+        return result
+
+    def _render(self, nodes, keep_outputs=False):
+        variants = [""]
+        for node in nodes:
+            kind = node[0]
+            if kind == "lit":
+                options = [node[1]]
+            elif kind == "out":
+                unresolved = "{{ " + node[1] + " }}" if keep_outputs else UNRESOLVED
+                options = [self.liquid_values.get(node[1], unresolved)]
+            else:
+                branches = node[1] if self.expand_liquid else node[1][:1]
+                options = []
+                for branch in branches:
+                    options.extend(self._render(branch, keep_outputs))
+                if self.expand_liquid and not node[2]:
+                    options.append("")  # no else: the block can render nothing
+            variants = [a + b for a, b in product(variants, options)][: self.max_variants]
+        return variants
+
+    def expand(self, text):
+        """Every candidate rendering of `text` (constants substituted, Liquid branches expanded)."""
+        if not text:
+            return ()
+        cached = self._expanded.get(text)
+        if cached is not None:
+            return cached
+
+        substituted = self.substitute_constants(text)
+        if "{" in substituted:
+            rendered = self._render(_parse_liquid(substituted))
+        else:
+            rendered = [substituted]
+
+        seen = {}
+        for variant in rendered:
+            if UNRESOLVED not in variant and "@{" not in variant:
+                seen.setdefault(variant, None)
+        result = tuple(seen)
+        self._expanded[text] = result
+        return result
+
+    def expand_sql(self, sql):
+        """
+        Every candidate rendering of SQL with Liquid branches. Unlike `expand`, unresolved
+        `{{ }}` outputs are kept as written (the SQL extractor neutralises them) instead
+        of dropping the variant.
+        """
+        if not sql:
+            return ()
+        cached = self._expanded_sql.get(sql)
+        if cached is not None:
+            return cached
+        substituted = self.substitute_constants(sql)
+        result = tuple(dict.fromkeys(self._render(_parse_liquid(substituted), keep_outputs=True)))
+        self._expanded_sql[sql] = result
+        return result
+
+    def expand_table_name(self, sql_table_name):
+        """Candidate tables for a `sql_table_name` value, cleaned and de-duplicated."""
+        candidates = {}
+        for variant in self.expand(sql_table_name):
+            cleaned = clean_sql_table_name(variant)
+            if cleaned:
+                candidates.setdefault(cleaned, None)
+        return tuple(candidates)
@@ -0,0 +1,543 @@
+"""
+Description:
+    Single-pass, brace-aware parser for a Looker project (`looker-master`).
+
+    The tree is walked once and every `.lkml` file is read and parsed once.
+    Each file is tokenized left to right (comments, strings, `;;`-terminated
+    SQL/HTML values, lists and `{ }` blocks), so nested braces and commented-out
+    code no longer confuse the explore/join slicing the old regex scanner relied on.
+
+    The parse result is a structured model per file:
+        - LookmlFile: includes, views, explores, `${view.field}` references and
+                      `constant:` values (manifest.lkml)
+        - View:       name, sql_table_name, derived table SQL, extends, refinement flag,
+                      declared fields (dimensions, dimension groups, measures, filters, parameters),
+                      each dimension group's type and declared timeframes / intervals,
+                      `${view.field}` references made inside the view block
+        - Explore:    name, model, view_name / from, joins, `${view.field}` references made
+                      inside the explore block (sql_on, sql_always_where, ...)
+        - Join:       alias and resolved `from:` view
+
+    Output formats:
+        - CSV rows with the historical script_01 columns (see OUTPUT_FIELDS)
+        - JSON dump of the structured model, for downstream scripts that should not
+          re-scan LookML text
+
+Usage:
+    from lookml_parser import scan_repo, lookml_rows, write_csv
+    files = scan_repo(LOOKML_ROOT)              # serial
+    files = scan_repo(LOOKML_ROOT, workers=None)  # one process per CPU
+"""
+
+import os
+import re
+import csv
+import json
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from dataclasses import dataclass, field, asdict
+
+from sql_sources import extract_table_names_from_sql
+
+# Bump whenever the parsed model changes shape so on-disk caches are rebuilt
+PARSER_VERSION = 6
+
+# === OUTPUT SCHEMA ===
+OUTPUT_FIELDS = [
+    "view_or_model_type", "view_or_model_name", "model_name", "base_view_name",
+    "lkml_file", "sql_table_name", "derived_table_sources"
+]
+
+# === TOKEN PATTERNS ===
+_WS_RE = re.compile(r"\s*")
+_KEY_RE = re.compile(r"([A-Za-z_][\w]*)\s*:(?!:)")
+_BARE_RE = re.compile(r'[^\s{}\[\],"#]+')
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_FIELD_REF_RE = re.compile(r"\$\{\s*([\w\-]+)\.")
+_SQL_TABLE_QUOTES_RE = re.compile(r'["`]')
+
+# Blocks inside a view that declare a queryable field
+FIELD_KINDS = ("dimension", "dimension_group", "measure", "filter", "parameter")
+
+# Keys whose value runs until the `;;` terminator instead of a single token
+_SEMICOLON_KEYS = {"html", "expression", "expression_custom_filter"}
+
+
+def _is_semicolon_key(key):
+    return key.startswith("sql") or key in _SEMICOLON_KEYS
+
+
+# === STRUCTURED MODEL ===
+@dataclass
+class Block:
+    key: str
+    name: str = None
+    pairs: list = field(default_factory=list)
+    children: list = field(default_factory=list)
+    references: dict = field(default_factory=dict)  # `${view}` refs anywhere inside (top-level blocks)
+
+    def first(self, key):
+        for k, v in self.pairs:
+            if k == key:
+                return v
+        return None
+
+    def all(self, key):
+        return [v for k, v in self.pairs if k == key]
+
+    def blocks(self, key):
+        return [b for b in self.children if b.key == key]
+
+
+@dataclass
+class Join:
+    alias: str
+    from_view: str = None
+
+    @property
+    def view_name(self):
+        return self.from_view or self.alias
+
+
+@dataclass
+class View:
+    name: str
+    lkml_file: str
+    sql_table_name: str = None
+    derived_sql: str = None
+    extends: list = field(default_factory=list)
+    is_refinement: bool = False
+    fields: list = field(default_factory=list)  # (kind, name) for each FIELD_KINDS block
+    dimension_groups: dict = field(default_factory=dict)  # name → {"type", "timeframes", "intervals"}
+    references: list = field(default_factory=list)  # `${view}` refs inside this view block
+
+
+@dataclass
+class Explore:
+    name: str
+    model_name: str
+    lkml_file: str
+    view_name: str = None
+    from_view: str = None
+    joins: list = field(default_factory=list)
+    extends: list = field(default_factory=list)
+    is_refinement: bool = False
+    references: list = field(default_factory=list)  # `${view}` refs inside this explore block
+
+    @property
+    def base_view_name(self):
+        return self.view_name or self.from_view
+
+
+@dataclass
+class LookmlFile:
+    path: str
+    lkml_file: str
+    model_name: str = None
+    includes: list = field(default_factory=list)
+    views: list = field(default_factory=list)
+    explores: list = field(default_factory=list)
+    view_references: list = field(default_factory=list)
+    constants: dict = field(default_factory=dict)
+
+
+# === TOKENIZER / PARSER ===
+def _skip(text, pos):
+    """Skip whitespace and `#` comments, returning the next significant position."""
+    n = len(text)
+    while pos < n:
+        pos = _WS_RE.match(text, pos).end()
+        if pos < n and text[pos] == "#":
+            nl = text.find("\n", pos)
+            pos = n if nl == -1 else nl + 1
+        else:
+            break
+    return pos
+
+
+def _read_scalar(text, pos):
+    """Read a quoted string or bare word starting at `pos`."""
+    if text[pos] == '"':
+        m = _STRING_RE.match(text, pos)
+        if m:
+            return m.group(0)[1:-1], m.end()
+        return text[pos + 1:], len(text)
+    m = _BARE_RE.match(text, pos)
+    if m:
+        return m.group(0), m.end()
+    return None, pos + 1
+
+
+def _read_list(text, pos):
+    """Read a `[a, "b", c]` list starting at the opening bracket."""
+    items = []
+    pos += 1
+    n = len(text)
+    while True:
+        pos = _skip(text, pos)
+        if pos >= n:
+            return items, pos
+        ch = text[pos]
+        if ch == "]":
+            return items, pos + 1
+        if ch == ",":
+            pos += 1
+            continue
+        value, pos = _read_scalar(text, pos)
+        if value is not None:
+            items.append(value)
+
+
+def parse_lookml(text, refs=None):
+    """
+    Parse LookML text into a tree of Blocks in one left-to-right pass.
+
+    If `refs` is a dict, every `${view.field}` reference found in a value is
+    recorded in it (insertion-ordered, comments excluded). References are also
+    recorded on the top-level block they appear in (`Block.references`), so each
+    view / explore knows its own.
+    """
+    root = Block(key="root")
+    stack = [root]
+    pos = 0
+    n = len(text)
+
+    def note_refs(value):
+        if "${" not in value:
+            return
+        owner = stack[1].references if len(stack) > 1 else None
+        for ref in _FIELD_REF_RE.findall(value):
+            if refs is not None:
+                refs.setdefault(ref, None)
+            if owner is not None:
+                owner.setdefault(ref, None)
+
+    while True:
+        pos = _skip(text, pos)
+        if pos >= n:
+            break
+        ch = text[pos]
+
+        if ch == "}":
+            if len(stack) > 1:
+                stack.pop()
+            pos += 1
+            continue
+        if ch in ",;]":
+            pos += 1
+            continue
+
+        key_match = _KEY_RE.match(text, pos)
+        if not key_match:
+            # Unrecognised token: resynchronise on the next line
+            nl = text.find("\n", pos)
+            pos = n if nl == -1 else nl + 1
+            continue
+
+        key = key_match.group(1).lower()
+        current = stack[-1]
+        pos = _WS_RE.match(text, key_match.end()).end()
+        if pos >= n:
+            break
+
+        # --- `;;`-terminated values (sql, sql_on, sql_table_name, html, ...) ---
+        # (a value may itself start with Liquid, e.g. `sql_table_name: {% if ... %}`)
+        if _is_semicolon_key(key) and (text[pos] != "{" or text.startswith(("{%", "{{"), pos)):
+            end = text.find(";;", pos)
+            if end == -1:
+                end = n
+            value = text[pos:end].strip()
+            current.pairs.append((key, value))
+            note_refs(value)
+            pos = end + 2
+            continue
+
+        pos = _skip(text, pos)
+        if pos >= n:
+            break
+        ch = text[pos]
+
+        # --- Anonymous block: `derived_table: { ... }` ---
+        if ch == "{":
+            block = Block(key=key)
+            current.children.append(block)
+            stack.append(block)
+            pos += 1
+            continue
+
+        # --- List: `extends: [a, b]` ---
+        if ch == "[":
+            items, pos = _read_list(text, pos)
+            current.pairs.append((key, items))
+            for item in items:
+                note_refs(item)
+            continue
+
+        # --- Scalar, optionally naming a block: `view: orders { ... }` ---
+        value, pos = _read_scalar(text, pos)
+        if value is None:
+            continue
+        after = _skip(text, pos)
+        if after < n and text[after] == "{":
+            block = Block(key=key, name=value)
+            current.children.append(block)
+            stack.append(block)
+            pos = after + 1
+            continue
+
+        current.pairs.append((key, value))
+        note_refs(value)
+        if text.startswith(";;", after):
+            pos = after + 2
+
+    return root
+
+
+# === MODEL BUILDING ===
+def _split_refinement(name):
+    if name and name.startswith("+"):
+        return name[1:], True
+    return name, False
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return list(value)
+    return [value]
+
+
+def clean_sql_table_name(value):
+    if not value:
+        return None
+    cleaned = _SQL_TABLE_QUOTES_RE.sub("", value).strip()
+    return cleaned or None
+
+
+def _build_view(block, lkml_file):
+    name, is_refinement = _split_refinement(block.name)
+    derived_sql = None
+    for derived in block.blocks("derived_table"):
+        derived_sql = derived.first("sql")
+        if derived_sql is not None:
+            break
+    return View(
+        name=name,
+        lkml_file=lkml_file,
+        sql_table_name=block.first("sql_table_name"),
+        derived_sql=derived_sql,
+        extends=[v for e in block.all("extends") for v in _as_list(e)],
+        is_refinement=is_refinement,
+        fields=[(b.key, b.name) for b in block.children if b.key in FIELD_KINDS and b.name],
+        dimension_groups={
+            b.name: {
+                "type": b.first("type") or "time",
+                "timeframes": _as_list(b.first("timeframes")),
+                "intervals": _as_list(b.first("intervals")),
+            }
+            for b in block.blocks("dimension_group") if b.name
+        },
+        references=list(block.references),
+    )
+
+
+def _build_explore(block, model_name, lkml_file):
+    name, is_refinement = _split_refinement(block.name)
+    joins = [Join(alias=j.name, from_view=j.first("from")) for j in block.blocks("join")]
+    return Explore(
+        name=name,
+        model_name=model_name,
+        lkml_file=lkml_file,
+        view_name=block.first("view_name"),
+        from_view=block.first("from"),
+        joins=joins,
+        extends=[v for e in block.all("extends") for v in _as_list(e)],
+        is_refinement=is_refinement,
+        references=list(block.references),
+    )
+
+
+def model_name_for(path):
+    filename = os.path.basename(path)
+    if filename.endswith(".model.lkml"):
+        return filename.split(".")[0]
+    return None
+
+
+def parse_text(text, path, lkml_file):
+    refs = {}
+    root = parse_lookml(text, refs)
+    model_name = model_name_for(path)
+
+    parsed = LookmlFile(path=path, lkml_file=lkml_file, model_name=model_name)
+    parsed.includes = [v for inc in root.all("include") for v in _as_list(inc)]
+    parsed.views = [_build_view(b, lkml_file) for b in root.blocks("view")]
+    parsed.explores = [_build_explore(b, model_name, lkml_file) for b in root.blocks("explore")]
+    parsed.view_references = list(refs)
+    parsed.constants = {
+        b.name: b.first("value") for b in root.blocks("constant") if b.first("value") is not None
+    }
+    return parsed
+
+
+def decode_lkml(raw):
+    """File bytes → text, as every scan path reads it: UTF-8 (bad bytes dropped), `\n` newlines."""
+    return raw.decode("utf-8", errors="ignore").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def parse_file(path, base_dir):
+    """Read and parse one `.lkml` file; `lkml_file` is relative to `base_dir`."""
+    with open(path, "rb") as f:
+        text = decode_lkml(f.read())
+    return parse_text(text, path, os.path.relpath(path, base_dir))
+
+
+def iter_lkml_files(root):
+    """Yield every `.lkml` path under `root` in a stable, sorted order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith(".lkml"):
+                yield os.path.join(dirpath, filename)
+
+
+def resolve_workers(workers):
+    """`None`/0 means one worker per CPU; anything below 1 falls back to serial."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, int(workers))
+
+
+def imap_files(func, paths, *extra, workers=1):
+    """
+    Lazily apply `func(path, *extra)` to every path, over a process pool when `workers > 1`.
+
+    Results are yielded in the order of `paths` regardless of which worker
+    finished first. A pool that cannot be started falls back to serial.
+    """
+    paths = list(paths)
+    workers = min(resolve_workers(workers), max(1, len(paths)))
+
+    if workers > 1:
+        chunksize = max(1, len(paths) // (workers * 4))
+        try:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        except (OSError, NotImplementedError) as e:
+            print(f"⚠️  Process pool unavailable ({e}); falling back to serial parsing")
+        else:
+            with executor:
+                extra_args = [repeat(arg) for arg in extra]
+                yield from executor.map(func, paths, *extra_args, chunksize=chunksize)
+            return
+
+    for path in paths:
+        yield func(path, *extra)
+
+
+def map_files(func, paths, *extra, workers=1):
+    """List form of `imap_files`."""
+    return list(imap_files(func, paths, *extra, workers=workers))
+
+
+def iter_scan_repo(root, workers=1):
+    """Yield parsed files one at a time, in sorted path order."""
+    base_dir = os.path.dirname(os.path.abspath(root))
+    yield from imap_files(parse_file, iter_lkml_files(root), base_dir, workers=workers)
+
+
+def scan_repo(root, workers=1):
+    """
+    Walk `root` once and parse every `.lkml` file once.
+
+    With `workers > 1` files are spread over a process pool; output order is
+    the sorted path order either way, so rows are identical to a serial run.
+    """
+    return list(iter_scan_repo(root, workers=workers))
+
+
+# === ROW OUTPUT (historical script_01 schema) ===
+def lookml_row(item_type, name, model_name, base_view_name, lkml_file, sql_table=None, derived=None):
+    return {
+        "view_or_model_type": item_type,
+        "view_or_model_name": name,
+        "model_name": model_name,
+        "base_view_name": base_view_name,
+        "lkml_file": lkml_file,
+        "sql_table_name": sql_table,
+        "derived_table_sources": derived,
+    }
+
+
+def view_row(view):
+    derived = None
+    if view.derived_sql is not None:
+        derived = ", ".join(extract_table_names_from_sql(view.derived_sql))
+    return lookml_row("view", view.name, None, None, view.lkml_file, clean_sql_table_name(view.sql_table_name), derived)
+
+
+def lookml_rows(parsed):
+    """Yield script_01 rows for one parsed file, in document order."""
+    for view in parsed.views:
+        if not view.is_refinement:
+            yield view_row(view)
+
+    for ref_view in parsed.view_references:
+        yield lookml_row("view_reference", ref_view, None, None, parsed.lkml_file)
+
+    if parsed.model_name is None:
+        return
+
+    for explore in parsed.explores:
+        yield lookml_row("explore", explore.name, explore.model_name, explore.base_view_name, explore.lkml_file)
+        seen_aliases = set()
+        for join in explore.joins:
+            if join.alias in seen_aliases:
+                continue
+            seen_aliases.add(join.alias)
+            yield lookml_row("join_view", join.view_name, explore.model_name, explore.name, explore.lkml_file)
+
+
+def write_csv(rows, path):
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def lookml_file_from_dict(data):
+    """Rebuild a LookmlFile from its `asdict()` form (JSON dump or scan cache)."""
+    data = dict(data)
+    data["views"] = [View(**v) for v in data["views"]]
+    data["explores"] = [
+        Explore(**{**e, "joins": [Join(**j) for j in e["joins"]]}) for e in data["explores"]
+    ]
+    return LookmlFile(**data)
+
+
+def write_json(files, path):
+    payload = [asdict(parsed) for parsed in files]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    return len(payload)
+
+
+def tee_json(files, f):
+    """
+    Yield `files` unchanged while writing them to the open file `f` in `write_json`'s
+    layout, so the dump needs no second list of parsed files. The array is closed once
+    `files` is exhausted.
+    """
+    f.write("[")
+    count = 0
+    for parsed in files:
+        f.write(",\n" if count else "\n")
+        f.write(textwrap.indent(json.dumps(asdict(parsed), indent=2), "  "))
+        count += 1
+        yield parsed
+    f.write("\n]" if count else "]")
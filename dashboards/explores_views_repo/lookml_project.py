@@ -0,0 +1,303 @@
+"""
+Description:
+    Project-level resolution on top of `lookml_parser`: `include:`, `extends:` and
+    `+refinements`.
+
+    - include:     each model's scope is the set of files it includes, followed
+                   transitively through includes in included files. Globs follow LookML
+                   rules ("/" = project root, `*` within a folder, `**/` across folders,
+                   `.lkml` optional). Explores defined in included files (e.g.
+                   `*.explore.lkml`) are attributed to every model that includes them, and
+                   views are looked up in the model's scope first.
+    - extends:     a view/explore inherits sql_table_name / derived_table / view_name /
+                   from / joins from its parents (later parents win, own values win last).
+    - refinements: `view: +name` / `explore: +name` are layered on top of the base
+                   definition in file order.
+    - references:  a resolved view / explore carries the `${view}` references made in
+                   its own block and its refinements (not its parents', which belong to
+                   the parents).
+    - constants:   `@{constant}` values from manifest.lkml (and configured Liquid
+                   values) are substituted into sql_table_name / derived SQL via
+                   `lookml_constants.LookmlEvaluator`; Liquid conditionals in a
+                   sql_table_name resolve to every candidate table (`sql_table_names`).
+
+    Resolution is memoized per (definition, model scope), so a deep extends chain is
+    resolved once per run instead of once per reference. Cycles resolve to nothing.
+
+    Memory: an include, extends or refinement can point at any file in the tree, so
+    nothing can be resolved until the scan is finished. The project therefore keeps
+    one entry per file, but only what resolution and row output read: includes,
+    views without their field lists, explores, `${view}` references and constants.
+    Callers that need the full parse (field lists, the JSON dump) consume it while
+    the files stream in (see `lookml_parser.tee_json`).
+
+Usage:
+    project = LookmlProject(parsed_files, liquid_values={"_user_attributes['schema']": "analytics"})
+    for row in project_rows(project):
+        ...
+"""
+
+import re
+import posixpath
+from dataclasses import replace
+from collections import defaultdict, namedtuple
+
+from lookml_parser import Join, view_row, lookml_row
+from lookml_constants import LookmlEvaluator
+
+ResolvedView = namedtuple(
+    "ResolvedView",
+    ["name", "lkml_file", "sql_table_name", "derived_sql", "extends", "sql_table_names", "references"]
+)
+ResolvedExplore = namedtuple(
+    "ResolvedExplore", ["name", "model_name", "lkml_file", "view_name", "from_view", "joins", "references"]
+)
+
+_MISSING = object()
+
+
+def project_path(lkml_file):
+    """'looker-master/views/a.view.lkml' (any separator) → '/views/a.view.lkml'."""
+    normalized = lkml_file.replace("\\", "/")
+    parts = normalized.split("/", 1)
+    return "/" + (parts[1] if len(parts) > 1 else parts[0])
+
+
+def normalize_include(pattern, including_file):
+    """Resolve a LookML include glob against `including_file`; None for remote projects."""
+    if pattern.startswith("//"):
+        return None  # remote/imported project, not part of this tree
+    if not pattern.startswith("/"):
+        pattern = posixpath.join(posixpath.dirname(including_file), pattern)
+    pattern = posixpath.normpath(pattern)
+    if not pattern.endswith(".lkml") and not pattern.endswith("*"):
+        pattern += ".lkml"
+    return pattern
+
+
+def _index_entry(parsed):
+    """The part of a parsed file the project keeps: everything but the views' field declarations."""
+    return replace(parsed, views=[replace(view, fields=[], dimension_groups={}) for view in parsed.views])
+
+
+def include_regex(pattern):
+    """Compile a normalized include glob: `**/` spans folders, `*` stays within one."""
+    regex = re.escape(pattern)
+    regex = regex.replace(r"\*\*/", "(?:.*/)?").replace(r"\*\*", ".*").replace(r"\*", "[^/]*")
+    return re.compile(regex + r"\Z")
+
+
+class LookmlProject:
+    def __init__(self, parsed_files, liquid_values=None, expand_liquid=True):
+        self.files = [_index_entry(parsed) for parsed in parsed_files]
+        self.evaluator = LookmlEvaluator.from_files(
+            self.files, liquid_values=liquid_values, expand_liquid=expand_liquid
+        )
+        self._by_path = {project_path(p.lkml_file): p for p in self.files}
+
+        self._views = defaultdict(list)
+        self._view_refinements = defaultdict(list)
+        self._explores = defaultdict(list)
+        self._explore_refinements = defaultdict(list)
+        for parsed in self.files:
+            for view in parsed.views:
+                target = self._view_refinements if view.is_refinement else self._views
+                target[view.name].append(view)
+            for explore in parsed.explores:
+                target = self._explore_refinements if explore.is_refinement else self._explores
+                target[explore.name].append(explore)
+
+        self._include_matches = {}
+        self._scope_cache = {}
+        self._view_memo = {}
+        self._explore_memo = {}
+
+    # === INCLUDES ===
+    def _matching_paths(self, pattern):
+        """Project paths matching a normalized include glob (memoized per glob)."""
+        matches = self._include_matches.get(pattern)
+        if matches is None:
+            regex = include_regex(pattern)
+            matches = tuple(p for p in self._by_path if regex.match(p))
+            self._include_matches[pattern] = matches
+        return matches
+
+    def includes_of(self, path):
+        """Project paths included by the file at `path`, followed transitively (memoized)."""
+        cached = self._scope_cache.get(path)
+        if cached is not None:
+            return cached
+
+        scope = {path}
+        stack = [path]
+        while stack:
+            current = self._by_path.get(stack.pop())
+            if current is None:
+                continue
+            current_path = project_path(current.lkml_file)
+            for pattern in current.includes:
+                normalized = normalize_include(pattern, current_path)
+                if normalized is None:
+                    continue
+                for candidate in self._matching_paths(normalized):
+                    if candidate not in scope:
+                        scope.add(candidate)
+                        stack.append(candidate)
+        frozen = frozenset(scope)
+        self._scope_cache[path] = frozen
+        return frozen
+
+    def model_scope(self, model_file):
+        return self.includes_of(project_path(model_file.lkml_file))
+
+    @staticmethod
+    def _pick(candidates, scope):
+        if scope is not None:
+            for candidate in candidates:
+                if project_path(candidate.lkml_file) in scope:
+                    return candidate
+        return candidates[0] if candidates else None
+
+    @staticmethod
+    def _in_scope(items, scope):
+        if scope is None:
+            return items
+        return [i for i in items if project_path(i.lkml_file) in scope]
+
+    # === VIEWS ===
+    def resolve_view(self, name, scope=None):
+        definition = self._pick(self._views.get(name, []), scope)
+        return self.resolve_view_definition(name, definition, scope)
+
+    def resolve_view_definition(self, name, definition, scope=None):
+        key = (name, definition.lkml_file if definition else None, scope)
+        cached = self._view_memo.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        self._view_memo[key] = None  # cycle guard
+
+        layers = ([definition] if definition else []) + self._in_scope(self._view_refinements.get(name, []), scope)
+        if not layers:
+            return None
+
+        evaluator = self.evaluator
+        sql_table_names = ()
+        derived_sql = None
+        extends = []
+        references = {}
+        for layer in layers:
+            references.update(dict.fromkeys(layer.references))
+            for parent_name in layer.extends:
+                extends.append(parent_name)
+                parent = self.resolve_view(parent_name, scope)
+                if parent is None:
+                    continue
+                if parent.derived_sql is not None:
+                    sql_table_names, derived_sql = (), parent.derived_sql
+                elif parent.sql_table_names:
+                    sql_table_names, derived_sql = parent.sql_table_names, None
+            if layer.derived_sql is not None:
+                sql_table_names, derived_sql = (), evaluator.substitute(layer.derived_sql)
+            elif layer.sql_table_name:
+                sql_table_names, derived_sql = evaluator.expand_table_name(layer.sql_table_name), None
+
+        lkml_file = definition.lkml_file if definition else layers[0].lkml_file
+        resolved = ResolvedView(
+            name, lkml_file, ", ".join(sql_table_names) or None, derived_sql, tuple(extends), sql_table_names,
+            tuple(references)
+        )
+        self._view_memo[key] = resolved
+        return resolved
+
+    # === EXPLORES ===
+    def explores_for_model(self, model_file):
+        """Explores visible in a model: its own plus those in (non-model) included files."""
+        scope = self.model_scope(model_file)
+        seen = set()
+        for explore in model_file.explores:
+            if not explore.is_refinement and explore.name not in seen:
+                seen.add(explore.name)
+                yield explore
+        for path in sorted(scope):
+            included = self._by_path.get(path)
+            if included is None or included is model_file or included.model_name is not None:
+                continue
+            for explore in included.explores:
+                if not explore.is_refinement and explore.name not in seen:
+                    seen.add(explore.name)
+                    yield explore
+
+    def resolve_explore(self, model_file, definition):
+        scope = self.model_scope(model_file)
+        return self._resolve_explore(model_file.model_name, definition.name, definition, scope)
+
+    def _resolve_explore(self, model_name, name, definition, scope):
+        key = (model_name, name, definition.lkml_file if definition else None)
+        cached = self._explore_memo.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        self._explore_memo[key] = None  # cycle guard
+
+        layers = ([definition] if definition else []) + self._in_scope(self._explore_refinements.get(name, []), scope)
+        if not layers:
+            return None
+
+        view_name = None
+        from_view = None
+        joins = {}
+        references = {}
+        for layer in layers:
+            references.update(dict.fromkeys(layer.references))
+            for parent_name in layer.extends:
+                parent_def = self._pick(self._explores.get(parent_name, []), scope)
+                parent = self._resolve_explore(model_name, parent_name, parent_def, scope)
+                if parent is None:
+                    continue
+                view_name = parent.view_name or view_name
+                from_view = parent.from_view or from_view
+                for join in parent.joins:
+                    joins[join.alias] = join
+            view_name = layer.view_name or view_name
+            from_view = layer.from_view or from_view
+            for join in layer.joins:
+                previous = joins.get(join.alias)
+                if previous is not None and join.from_view is None:
+                    join = Join(alias=join.alias, from_view=previous.from_view)
+                joins[join.alias] = join
+
+        lkml_file = definition.lkml_file if definition else layers[0].lkml_file
+        resolved = ResolvedExplore(
+            name, model_name, lkml_file, view_name, from_view, tuple(joins.values()), tuple(references)
+        )
+        self._explore_memo[key] = resolved
+        return resolved
+
+    def resolved_explores(self, model_file):
+        for definition in self.explores_for_model(model_file):
+            resolved = self.resolve_explore(model_file, definition)
+            if resolved is not None:
+                yield resolved
+
+
+# === ROW OUTPUT (historical script_01 schema, with inheritance applied) ===
+def project_rows(project):
+    """Yield script_01 rows per file in path order, using resolved views and explores."""
+    for parsed in project.files:
+        for view in parsed.views:
+            if view.is_refinement:
+                continue
+            resolved = project.resolve_view_definition(view.name, view)
+            yield view_row(resolved)
+
+        for ref_view in parsed.view_references:
+            yield lookml_row("view_reference", ref_view, None, None, parsed.lkml_file)
+
+        if parsed.model_name is None:
+            continue
+
+        for explore in project.resolved_explores(parsed):
+            base_view_name = explore.view_name or explore.from_view
+            yield lookml_row("explore", explore.name, explore.model_name, base_view_name, explore.lkml_file)
+            for join in explore.joins:
+                yield lookml_row("join_view", join.view_name, explore.model_name, explore.name, explore.lkml_file)
+
@@ -0,0 +1,234 @@
+"""
+Description:
+    Writes a realistic synthetic `looker-master` tree for benchmarking the LookML scanner.
+
+    The project is split into "areas" (one model each, like a business domain):
+        - manifest.lkml                           schema constants
+        - models/area_K.model.lkml                includes its area's views/explores, a few explores
+        - explores/area_K/*.explore.lkml          explores with joins (some `from:` aliases),
+                                                  some `extends:` of another explore
+        - views/area_K/*.view.lkml                plain views (`sql_table_name`, sometimes via
+                                                  `@{constant}` or Liquid), derived tables
+                                                  reading tables and `${view.SQL_TABLE_NAME}`,
+                                                  `extends:` and `+refinements`
+    Views carry dimensions/measures with `${other_view.field}` references into the same
+    area, so include/extends resolution, SQL extraction and reference capture all get
+    exercised the way a real project exercises them.
+
+    Output is deterministic for a given (n_files, seed).
+
+Usage:
+    python lookml_synthetic.py OUT_DIR 10000          # writes OUT_DIR/looker-master
+    from lookml_synthetic import write_synthetic_repo
+    counts = write_synthetic_repo(root, n_files=1000)
+"""
+
+import os
+import sys
+import random
+
+# === CONFIGURATION ===
+VIEWS_PER_AREA = 200       # view files per area (= per model)
+EXPLORE_FILE_RATIO = 0.05  # explore files per view file
+FIELDS_PER_VIEW = 12       # dimensions + measures per view
+REFS_PER_VIEW = 2          # `${other_view.field}` references per view
+JOINS_PER_EXPLORE = 3
+DERIVED_RATIO = 0.2        # share of views that are derived tables
+EXTENDS_RATIO = 0.1        # share of views that extend another view
+REFINEMENT_RATIO = 0.05    # share of view files that also refine a view
+LIQUID_RATIO = 0.02        # share of sql_table_names wrapped in a Liquid conditional
+CONSTANT_RATIO = 0.2       # share of sql_table_names written with `@{schema}`
+
+SCHEMAS = ("analytics", "marts", "staging", "finance")
+
+
+def _layout(n_files):
+    """Split n_files into (areas, views per area list, explore files per area list)."""
+    # Per area: 1 model + V views + E explore files, E = V * ratio; plus one manifest
+    per_area = VIEWS_PER_AREA + 1 + max(1, int(VIEWS_PER_AREA * EXPLORE_FILE_RATIO))
+    budget = max(n_files - 1, 3)
+    areas = max(1, round(budget / per_area))
+
+    explores_per_area = []
+    views_per_area = []
+    remaining = budget
+    for a in range(areas):
+        share = remaining // (areas - a)
+        remaining -= share
+        explore_files = max(1, int((share - 1) * EXPLORE_FILE_RATIO / (1 + EXPLORE_FILE_RATIO)))
+        views = max(1, share - 1 - explore_files)
+        explores_per_area.append(explore_files)
+        views_per_area.append(views)
+    return areas, views_per_area, explores_per_area
+
+
+def _fields(rng, view, area_views):
+    lines = []
+    for j in range(FIELDS_PER_VIEW):
+        if j % 4 == 3:
+            lines.append(f"  measure: total_{j} {{\n    type: sum\n    sql: ${{TABLE}}.amount_{j} ;;\n  }}")
+        else:
+            lines.append(
+                f"  dimension: field_{j} {{\n    type: string\n    sql: ${{TABLE}}.field_{j} ;;\n  }}"
+            )
+    for r in range(REFS_PER_VIEW):
+        other = rng.choice(area_views)
+        if other != view:
+            lines.append(
+                f"  dimension: ref_{r} {{\n"
+                f"    # cross-view reference\n"
+                f"    sql: ${{{other}.field_0}} ;;\n"
+                f"  }}"
+            )
+    return "\n".join(lines)
+
+
+def _table_name(rng, area, i):
+    schema = rng.choice(SCHEMAS)
+    table = f"{schema}.area{area}_table_{i}"
+    roll = rng.random()
+    if roll < LIQUID_RATIO:
+        return (
+            f"{{% if _user_attributes['env'] == 'dev' %}} dev.area{area}_table_{i} "
+            f"{{% else %}} {table} {{% endif %}}"
+        )
+    if roll < LIQUID_RATIO + CONSTANT_RATIO:
+        return f"@{{{schema}_schema}}.area{area}_table_{i}"
+    return table
+
+
+def _view_source(rng, area, i, area_views):
+    name = area_views[i]
+    parts = [f"view: {name} {{"]
+    roll = rng.random()
+    if roll < DERIVED_RATIO and i > 0:
+        upstream = area_views[rng.randrange(i)]
+        parts.append(
+            "  derived_table: {\n"
+            "    sql:\n"
+            "      with base as (\n"
+            f"        select o.id, o.amount_0, extract(year from o.created_at) as yr\n"
+            f"        from {rng.choice(SCHEMAS)}.area{area}_events_{i} o\n"
+            f"        join ${{{upstream}.SQL_TABLE_NAME}} u on u.id = o.id\n"
+            "        where o.created_at > current_date - 30\n"
+            "      )\n"
+            "      select * from base ;;\n"
+            "  }"
+        )
+    elif roll < DERIVED_RATIO + EXTENDS_RATIO and i > 0:
+        parts.append(f"  extends: [{area_views[rng.randrange(i)]}]")
+    else:
+        parts.append(f"  sql_table_name: {_table_name(rng, area, i)} ;;")
+    parts.append(_fields(rng, name, area_views))
+    parts.append("}")
+
+    if rng.random() < REFINEMENT_RATIO and i > 0:
+        target = area_views[rng.randrange(i)]
+        parts.append(f"\nview: +{target} {{\n  dimension: refined_{i} {{ sql: ${{TABLE}}.refined ;; }}\n}}")
+    return "\n".join(parts) + "\n"
+
+
+def _explore_source(rng, area, k, area_views, previous_explores):
+    blocks = []
+    names = []
+    for e in range(3):
+        name = f"area{area}_explore_{k}_{e}"
+        base = rng.choice(area_views)
+        lines = [f"explore: {name} {{"]
+        if previous_explores and rng.random() < 0.1:
+            lines.append(f"  extends: [{rng.choice(previous_explores)}]")
+        lines.append(f"  view_name: {base}")
+        for j in range(JOINS_PER_EXPLORE):
+            joined = rng.choice(area_views)
+            if j == 0 and rng.random() < 0.3:
+                lines.append(
+                    f"  join: {joined}_alias {{\n"
+                    f"    from: {joined}\n"
+                    f"    sql_on: ${{{base}.field_0}} = ${{{joined}_alias.field_0}} ;;\n"
+                    f"    relationship: many_to_one\n"
+                    f"  }}"
+                )
+            else:
+                lines.append(
+                    f"  join: {joined} {{\n"
+                    f"    sql_on: ${{{base}.field_0}} = ${{{joined}.field_0}} ;;\n"
+                    f"    relationship: many_to_one\n"
+                    f"  }}"
+                )
+        lines.append("}")
+        blocks.append("\n".join(lines))
+        names.append(name)
+    return "\n\n".join(blocks) + "\n", names
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_synthetic_repo(root, n_files, seed=0):
+    """Write about `n_files` .lkml files under `root`; returns counts per file kind."""
+    rng = random.Random(seed)
+    areas, views_per_area, explores_per_area = _layout(n_files)
+    counts = {"manifest": 1, "models": 0, "views": 0, "explores": 0}
+
+    os.makedirs(os.path.join(root, "models"), exist_ok=True)
+    _write(
+        os.path.join(root, "manifest.lkml"),
+        'project_name: "synthetic"\n' + "".join(
+            f'constant: {schema}_schema {{ value: "{schema}" }}\n' for schema in SCHEMAS
+        ),
+    )
+
+    for area in range(areas):
+        view_dir = os.path.join(root, "views", f"area_{area}")
+        explore_dir = os.path.join(root, "explores", f"area_{area}")
+        os.makedirs(view_dir, exist_ok=True)
+        os.makedirs(explore_dir, exist_ok=True)
+
+        area_views = [f"area{area}_view_{i}" for i in range(views_per_area[area])]
+        for i, name in enumerate(area_views):
+            _write(os.path.join(view_dir, f"{name}.view.lkml"), _view_source(rng, area, i, area_views))
+        counts["views"] += len(area_views)
+
+        explore_names = []
+        for k in range(explores_per_area[area]):
+            text, names = _explore_source(rng, area, k, area_views, explore_names)
+            explore_names.extend(names)
+            _write(os.path.join(explore_dir, f"area{area}_explores_{k}.explore.lkml"), text)
+        counts["explores"] += explores_per_area[area]
+
+        model_explores = "\n".join(
+            f"explore: {name}_base {{\n  from: {name}\n  join: {rng.choice(area_views)} {{ "
+            f"sql_on: ${{{name}_base.field_0}} = 1 ;; }}\n}}"
+            for name in area_views[:3]
+        )
+        _write(
+            os.path.join(root, "models", f"area_{area}.model.lkml"),
+            'connection: "redshift"\n'
+            f'include: "/views/area_{area}/*.view"\n'
+            f'include: "/explores/area_{area}/*.explore.lkml"\n\n'
+            f"{model_explores}\n",
+        )
+        counts["models"] += 1
+
+    counts["files"] = sum(counts.values())
+    return counts
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python lookml_synthetic.py OUT_DIR N_FILES [SEED]")
+        sys.exit(1)
+    out_dir, n_files = sys.argv[1], int(sys.argv[2])
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    root = os.path.join(out_dir, "looker-master")
+    counts = write_synthetic_repo(root, n_files, seed=seed)
+    print(
+        f"✅ Synthetic repo written to: {root} ({counts['files']} files: {counts['views']} views, "
+        f"{counts['explores']} explore files, {counts['models']} models)"
+    )
+
+
+if __name__ == "__main__":
+    main()
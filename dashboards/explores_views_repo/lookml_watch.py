@@ -0,0 +1,112 @@
+"""
+Description:
+    Watch mode for the LookML scanner: keeps script_01's outputs fresh while
+    `looker-master` changes (git pulls, editor saves).
+
+    - Polls the tree every `interval` seconds using only stat data (mtime + size per
+      `.lkml` file). This is stdlib-only and behaves the same on Windows, macOS and
+      network drives, where inotify is not available.
+    - Once a change is seen, waits until the tree stops changing (`debounce`), so a
+      `git pull` touching hundreds of files triggers one rebuild instead of hundreds.
+    - Re-parses only new/changed files (through the ScanCache when given, which also
+      skips files whose content hash did not change) and drops deleted ones; every
+      other file stays parsed in memory.
+    - Outputs are meant to be written through `frame_io.atomic_output`, so readers
+      (script_02, dashboards, ...) never see a half-written CSV or graph.
+
+Usage:
+    watcher = LookmlWatcher(LOOKML_ROOT, cache=ScanCache(CACHE_DB))
+    write_outputs(watcher.start())
+    watcher.run(lambda files, changed, deleted: write_outputs(files))
+"""
+
+import os
+import time
+
+from lookml_parser import iter_lkml_files, map_files, parse_file, scan_repo
+
+# === CONFIGURATION ===
+POLL_INTERVAL = 0.5  # seconds between stat sweeps
+DEBOUNCE = 0.2       # seconds the tree must stay unchanged before re-parsing
+
+
+def take_snapshot(root):
+    """{path: (mtime_ns, size)} for every `.lkml` file, in scan order."""
+    snapshot = {}
+    for path in iter_lkml_files(root):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue  # deleted mid-sweep
+        snapshot[path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+class LookmlWatcher:
+    def __init__(self, root, cache=None, interval=POLL_INTERVAL, debounce=DEBOUNCE, workers=1):
+        self.root = root
+        self.base_dir = os.path.dirname(os.path.abspath(root))
+        self.cache = cache
+        self.interval = interval
+        self.debounce = debounce
+        self.workers = workers
+        self.snapshot = {}
+        self.parsed = {}
+
+    def start(self):
+        """Full initial scan; returns all parsed files in scan order."""
+        # Snapshot first: anything saved during the initial scan shows up on the next poll
+        self.snapshot = take_snapshot(self.root)
+        if self.cache is not None:
+            files = self.cache.iter_refresh(self.root, workers=self.workers)
+        else:
+            files = scan_repo(self.root, workers=self.workers)
+        self.parsed = {parsed.path: parsed for parsed in files}
+        return self.files()
+
+    def files(self):
+        return [self.parsed[path] for path in self.snapshot if path in self.parsed]
+
+    def _settled_snapshot(self, current):
+        while True:
+            time.sleep(self.debounce)
+            settled = take_snapshot(self.root)
+            if settled == current:
+                return settled
+            current = settled
+
+    def poll(self):
+        """
+        Apply pending changes. Returns (updated, deleted) paths, where `updated` only lists
+        files whose content changed, or None if nothing changed on disk.
+        """
+        current = take_snapshot(self.root)
+        if current == self.snapshot:
+            return None
+        current = self._settled_snapshot(current)
+
+        changed = [path for path, stat in current.items() if self.snapshot.get(path) != stat]
+        deleted = [path for path in self.snapshot if path not in current]
+        try:
+            if self.cache is not None:
+                updated = self.cache.update_files(self.root, changed, workers=self.workers)
+                self.cache.forget(deleted)
+            else:
+                parsed = map_files(parse_file, changed, self.base_dir, workers=self.workers)
+                updated = dict(zip(changed, parsed))
+        except FileNotFoundError:
+            return None  # a file vanished while re-parsing; the next poll sees the final state
+
+        self.parsed.update(updated)
+        for path in deleted:
+            self.parsed.pop(path, None)
+        self.snapshot = current
+        return list(updated), deleted
+
+    def run(self, on_change):
+        """Poll forever, calling on_change(files, updated, deleted) after each real change."""
+        while True:
+            result = self.poll()
+            if result is not None and (result[0] or result[1]):
+                on_change(self.files(), *result)
+            time.sleep(self.interval)
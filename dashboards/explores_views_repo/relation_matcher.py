@@ -0,0 +1,97 @@
+"""
+Description:
+    One index for comparing relation names (`db.schema.table`, `schema.table`, `table`)
+    without scanning a whole DataFrame per lookup.
+
+    Names are normalized once (trimmed, quotes/backticks/brackets removed, lowercased,
+    split on "."), then stored twice:
+        - a hash map from the full segment tuple → values, for exact matches
+        - a trie over the *reversed* segments (table → schema → db); every node keeps the
+          values of all relations passing through it, so "relations ending with
+          schema.table" is one walk of len(segments) steps
+
+    `match_all` resolves many names in a single pass, memoized per normalized name.
+
+Usage:
+    matcher = RelationMatcher.from_pairs(df["redshift_table"], df["dashboard_title"])
+    matcher.exact("analytics.orders")          # {"Sales"} for exactly analytics.orders
+    matcher.ending_with("analytics.orders")    # also prod.analytics.orders, "ANALYTICS"."ORDERS"
+"""
+
+import re
+
+_QUOTES_RE = re.compile(r'^[\s"`\[]+|[\s"`\]]+$')
+
+
+def normalize_relation(name):
+    """'  "Prod"."Analytics".Orders ' → ('prod', 'analytics', 'orders'); () for blanks/NaN."""
+    if not isinstance(name, str):
+        return ()
+    segments = tuple(_QUOTES_RE.sub("", part).lower() for part in name.strip().split("."))
+    return () if not any(segments) else segments
+
+
+class _TrieNode:
+    __slots__ = ("children", "values")
+
+    def __init__(self):
+        self.children = {}
+        self.values = set()
+
+
+class RelationMatcher:
+    def __init__(self):
+        self._exact = {}
+        self._root = _TrieNode()
+        self._memo = {}
+
+    @classmethod
+    def from_pairs(cls, relations, values):
+        """Index (relation, value) pairs, e.g. two DataFrame columns; blank values are skipped."""
+        matcher = cls()
+        for relation, value in zip(relations, values):
+            if value is None or value != value:  # None / NaN
+                continue
+            matcher.add(relation, value)
+        return matcher
+
+    def add(self, relation, value):
+        segments = normalize_relation(relation)
+        if not segments:
+            return
+        self._exact.setdefault(segments, set()).add(value)
+        node = self._root
+        for segment in reversed(segments):
+            node = node.children.setdefault(segment, _TrieNode())
+            node.values.add(value)
+        self._memo.clear()
+
+    def exact(self, relation):
+        return self._exact.get(normalize_relation(relation), set())
+
+    def ending_with(self, relation):
+        """Values of every indexed relation whose trailing segments equal `relation`'s."""
+        segments = normalize_relation(relation)
+        if not segments:
+            return set()
+        node = self._root
+        for segment in reversed(segments):
+            node = node.children.get(segment)
+            if node is None:
+                return set()
+        return node.values
+
+    def match(self, relation, suffix=True):
+        return self.ending_with(relation) if suffix else self.exact(relation)
+
+    def match_all(self, relations, suffix=True):
+        """{relation: set(values)} for each input, computed once per normalized name."""
+        results = {}
+        for relation in relations:
+            key = (normalize_relation(relation), suffix)
+            found = self._memo.get(key)
+            if found is None:
+                found = self.match(relation, suffix=suffix)
+                self._memo[key] = found
+            results[relation] = found
+        return results
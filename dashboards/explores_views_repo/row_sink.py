@@ -0,0 +1,106 @@
+"""
+Description:
+    Streaming, dedup-on-insert row writer.
+
+    Rows are written to disk as soon as they are added, in insertion order. Each row
+    is reduced to a 16-byte BLAKE2 digest of its values before it goes into the
+    "seen" set, so memory grows with the number of distinct rows (a few dozen bytes
+    each) instead of holding every row dict until the end of the run.
+
+    Memory is therefore smaller, not flat: the digest set still grows with repo size,
+    columnar formats buffer every distinct row until close, and script_01 can only
+    produce rows once `lookml_project` has indexed every file (includes / extends /
+    refinements may point anywhere in the tree).
+
+    Supported formats:
+        - "csv"     (default, same layout as csv.DictWriter)
+        - "jsonl"   (one JSON object per line)
+        - "parquet" / "arrow" (typed columnar files via `frame_io`; distinct rows are
+          buffered and written on close, optionally with a CSV export next to them)
+
+Usage:
+    with RowSink(OUTPUT_CSV, OUTPUT_FIELDS) as sink:
+        for row in rows:
+            sink.add(row)
+    print(sink.written, sink.duplicates)
+"""
+
+import csv
+import json
+import hashlib
+
+import pandas as pd
+
+from frame_io import COLUMNAR_FORMATS, write_frame
+
+_SEPARATOR = "\x1f"
+
+
+def row_key(row, fieldnames):
+    """Compact, order-sensitive digest of a row's values (None and "" are distinct)."""
+    parts = ["\x00" if row.get(f) is None else str(row.get(f)) for f in fieldnames]
+    return hashlib.blake2b(_SEPARATOR.join(parts).encode("utf-8"), digest_size=16).digest()
+
+
+class RowSink:
+    def __init__(self, path, fieldnames, fmt="csv", export_csv=None):
+        if fmt not in ("csv", "jsonl") + COLUMNAR_FORMATS:
+            raise ValueError(f"Unsupported output format: {fmt}")
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.fmt = fmt
+        self.export_csv = export_csv  # columnar formats only: also write this CSV
+        self._rows = []
+        self.written = 0
+        self.duplicates = 0
+        self._seen = set()
+        self._file = None
+        self._writer = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(flush=exc_type is None)
+
+    def open(self):
+        if self.fmt in COLUMNAR_FORMATS:
+            return
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        if self.fmt == "csv":
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+            self._writer.writeheader()
+
+    def close(self, flush=True):
+        if self.fmt in COLUMNAR_FORMATS and flush:
+            frame = pd.DataFrame(self._rows, columns=self.fieldnames)
+            if self.export_csv:
+                # Same line endings as the streaming csv.DictWriter output
+                write_frame(frame, self.export_csv, "csv", lineterminator="\r\n")
+            write_frame(frame, self.path, self.fmt)
+            self._rows = []
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def add(self, row):
+        """Write `row` unless an identical row was already written. Returns True if written."""
+        key = row_key(row, self.fieldnames)
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(key)
+
+        if self.fmt == "csv":
+            self._writer.writerow(row)
+        elif self.fmt in COLUMNAR_FORMATS:
+            self._rows.append(tuple(row.get(f) for f in self.fieldnames))
+        else:
+            self._file.write(json.dumps({f: row.get(f) for f in self.fieldnames}) + "\n")
+        self.written += 1
+        return True
+
+    def add_all(self, rows):
+        for row in rows:
+            self.add(row)
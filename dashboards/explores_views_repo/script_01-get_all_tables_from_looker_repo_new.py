@@ -22,148 +22,150 @@ Output Columns:
     - lkml_file                 (relative path to the file)
     - sql_table_name            (only for view rows)
     - derived_table_sources     (only for view rows)
+
+Parsing:
+    - Delegates to `lookml_parser.py`, which walks LOOKML_ROOT once, reads each file once
+      and tokenizes it (comments, strings, `;;` values and nested `{ }` blocks) instead of
+      slicing explore/join blocks apart with `str.find`.
+    - Optionally dumps the structured view/explore/join model as JSON (OUTPUT_JSON).
+    - WORKERS > 1 spreads files over a process pool (None = one per CPU, 1 = serial).
+      Output order is the sorted file order either way, so diffs between runs stay meaningful.
+    - With USE_CACHE, parse results are kept in a SQLite index (CACHE_DB, next to OUTPUT_CSV)
+      keyed by path + mtime/size/content hash; only new or changed files are re-parsed and
+      the CSV is regenerated from the index (`lookml_cache.py`).
+    - Parsed files stream from the scanner (or cache) into a slim project index: views keep
+      no field lists, and the full model is only written out (OUTPUT_JSON) as the files pass
+      by. Includes / extends / refinements can point at any file, so rows are produced once
+      the scan is done; they are then streamed to OUTPUT_CSV, duplicates are dropped at
+      insert time against a compact hashed key set (`row_sink.py`), and row order follows
+      the sorted file order. Memory still grows with repo size (the slim index and the
+      key set), just far more slowly than the old full row list.
+    - The same pass builds a persisted lineage graph (LINEAGE_GRAPH, `lineage_graph.py`) with
+      explore → view → table edges, which downstream scripts load instead of re-deriving
+      relationships from the CSV.
+    - `extends:`, `+refinements` and `include:` are resolved per model (`lookml_project.py`),
+      so views inherit sql_table_name / derived tables from their parents and explores in
+      included files are attributed to the models that include them.
+    - `@{constants}` from manifest.lkml are substituted into sql_table_name and derived SQL,
+      and Liquid `{% if %}` branches in sql_table_name are expanded into every candidate
+      table (joined with ", "). LIQUID_VALUES pins `{{ }}` outputs such as user attributes;
+      EXPAND_LIQUID = False keeps only the first branch (`lookml_constants.py`).
+    - OUTPUT_FORMAT = "parquet" / "arrow" writes typed, categorical columnar rows next to
+      OUTPUT_CSV (same stem) for the next stages; the CSV is then only an export
+      (EXPORT_CSV). Downstream scripts read either format (`frame_io.py`).
+    - Outputs are written to a temp file and swapped in atomically. With WATCH = True the
+      script keeps running: it polls LOOKML_ROOT every POLL_INTERVAL seconds, re-parses only
+      changed files and rewrites the outputs after each save or pull (`lookml_watch.py`).
 """
 
-import os
-import re
-import csv
+import time
+from contextlib import ExitStack
+
+from lookml_parser import OUTPUT_FIELDS, iter_scan_repo, tee_json
+from lookml_cache import ScanCache
+from lookml_project import LookmlProject, project_rows
+from row_sink import RowSink
+from lineage_graph import LineageGraphBuilder, add_lookml_project
+from lookml_watch import LookmlWatcher
+from frame_io import COLUMNAR_FORMATS, atomic_output, with_format
 
 # === CONFIGURATION ===
 LOOKML_ROOT = r"C:\jobs_repo\brainforge\urbanstems-tests\dashboards\explores_views_repo\looker-master"
 OUTPUT_CSV = "script_01-extracting_looker_tables_from_views_and_models.csv"
-
-# === REGEX PATTERNS ===
-view_pattern = re.compile(r'view:\s*["\']?([\w\-]+)["\']?', re.IGNORECASE)
-explore_pattern = re.compile(r'explore:\s*["\']?([\w\-]+)["\']?', re.IGNORECASE)
-join_pattern = re.compile(r'join:\s*["\']?([\w\-]+)["\']?', re.IGNORECASE)
-from_pattern = re.compile(r'from:\s*["\']?([\w\-]+)["\']?', re.IGNORECASE)
-view_name_override = re.compile(r'view_name:\s*["\']?([\w\-]+)["\']?', re.IGNORECASE)
-sql_table_pattern = re.compile(r'sql_table_name:\s*["\']?([\w\.\[\]"]+)["\']?', re.IGNORECASE)
-derived_sql_pattern = re.compile(r'derived_table\s*:\s*{[^}]*?sql\s*:\s*(.*?)\s*;;', re.DOTALL | re.IGNORECASE)
-field_ref_pattern = re.compile(r'\$\{\s*([\w\-]+)\.', re.IGNORECASE)
-
-def extract_table_names_from_sql(sql):
-    tables = set()
-    pattern = re.compile(r'(?:from|join)\s+((?:"[^"]+"|\w+)\.(?:"[^"]+"|\w+))', re.IGNORECASE)
-    for match in pattern.findall(sql):
-        if "." in match and not match.lower().endswith((".", "id")):
-            tables.add(match.strip())
-    return sorted(tables)
-
-# === Storage ===
-results = []
-seen_view_references = set()
-seen_join_aliases = set()
-
-# === Pass 1: View definitions and ${view.field} references ===
-for root, _, files in os.walk(LOOKML_ROOT):
-    for file in files:
-        if file.endswith(".lkml"):
-            path = os.path.join(root, file)
-            rel_path = os.path.relpath(path, os.path.dirname(LOOKML_ROOT))
-
-            with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-
-                # --- View definition ---
-                if view_match := view_pattern.search(content):
-                    view_name = view_match.group(1)
-                    sql_table = sql_table_pattern.search(content)
-                    derived_sql = derived_sql_pattern.search(content)
-
-                    results.append({
-                        "view_or_model_type": "view",
-                        "view_or_model_name": view_name,
-                        "model_name": None,
-                        "base_view_name": None,
-                        "lkml_file": rel_path,
-                        "sql_table_name": sql_table.group(1) if sql_table else None,
-                        "derived_table_sources": ", ".join(extract_table_names_from_sql(derived_sql.group(1))) if derived_sql else None
-                    })
-
-                # --- ${view.field} references ---
-                for ref_view in set(field_ref_pattern.findall(content)):
-                    key = (ref_view, rel_path)
-                    if key not in seen_view_references:
-                        seen_view_references.add(key)
-                        results.append({
-                            "view_or_model_type": "view_reference",
-                            "view_or_model_name": ref_view,
-                            "model_name": None,
-                            "base_view_name": None,
-                            "lkml_file": rel_path,
-                            "sql_table_name": None,
-                            "derived_table_sources": None
-                        })
-
-# === Pass 2: Explore + Join blocks ===
-for root, _, files in os.walk(LOOKML_ROOT):
-    for file in files:
-        if file.endswith(".model.lkml"):
-            path = os.path.join(root, file)
-            rel_path = os.path.relpath(path, os.path.dirname(LOOKML_ROOT))
-            model_name = file.split(".")[0]
-
-            with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-
-                for explore_match in explore_pattern.finditer(content):
-                    explore_name = explore_match.group(1)
-                    explore_start = explore_match.start()
-                    explore_end = content.find("explore:", explore_start + 1)
-                    explore_block = content[explore_start:explore_end] if explore_end != -1 else content[explore_start:]
-
-                    # Get base view from view_name: or fallback to from:
-                    base_view_match = view_name_override.search(explore_block)
-                    base_view_name = base_view_match.group(1) if base_view_match else None
-
-                    if not base_view_name:
-                        from_match = from_pattern.search(explore_block)
-                        base_view_name = from_match.group(1) if from_match else None
-
-                    results.append({
-                        "view_or_model_type": "explore",
-                        "view_or_model_name": explore_name,
-                        "model_name": model_name,
-                        "base_view_name": base_view_name,
-                        "lkml_file": rel_path,
-                        "sql_table_name": None,
-                        "derived_table_sources": None
-                    })
-
-                    for join_match in join_pattern.finditer(explore_block):
-                        join_alias = join_match.group(1)
-                        join_start = join_match.start()
-                        join_end = explore_block.find("join:", join_start + 1)
-                        join_block = explore_block[join_start:join_end] if join_end != -1 else explore_block[join_start:]
-
-                        from_match = from_pattern.search(join_block)
-                        from_view = from_match.group(1) if from_match else join_alias
-
-                        dedup_key = (join_alias, model_name, explore_name, rel_path)
-                        if dedup_key not in seen_join_aliases:
-                            seen_join_aliases.add(dedup_key)
-                            results.append({
-                                "view_or_model_type": "join_view",
-                                "view_or_model_name": from_view,
-                                "model_name": model_name,
-                                "base_view_name": explore_name,
-                                "lkml_file": rel_path,
-                                "sql_table_name": None,
-                                "derived_table_sources": None
-                            })
-
-# === Deduplicate rows based on all column values ===
-unique_results = [dict(t) for t in {tuple(sorted(d.items())) for d in results}]
-
-# === Write Output ===
-with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as f:
-    writer = csv.DictWriter(f, fieldnames=[
-        "view_or_model_type", "view_or_model_name", "model_name", "base_view_name",
-        "lkml_file", "sql_table_name", "derived_table_sources"
-    ])
-    writer.writeheader()
-    writer.writerows(unique_results)
-
-print(f"✅ LookML mapping saved to: {OUTPUT_CSV}")
-print(f"📄 Total unique rows (views, explores, joins, refs): {len(unique_results)}")
+OUTPUT_FORMAT = "csv"  # "csv", "jsonl", or "parquet" / "arrow" (typed, needs pyarrow)
+EXPORT_CSV = True      # with "parquet" / "arrow": also write OUTPUT_CSV for the Sheets hand-off
+OUTPUT_JSON = None  # e.g. "script_01-lookml_model.json" to also dump the parsed model
+WORKERS = 1         # process-pool size; None = one per CPU, 1 = serial
+USE_CACHE = True    # incremental rescans via CACHE_DB
+CACHE_DB = "script_01-lookml_scan_cache.sqlite"
+LINEAGE_GRAPH = "script_01-lookml_lineage.graph"
+LIQUID_VALUES = {}   # e.g. {"_user_attributes['schema']": "analytics"}
+EXPAND_LIQUID = True  # False = first branch of each {% if %} only
+WATCH = False         # keep running and rewrite outputs whenever a .lkml file changes
+POLL_INTERVAL = 0.5   # seconds between change checks in watch mode
+
+
+def rows_output_path():
+    if OUTPUT_FORMAT in COLUMNAR_FORMATS:
+        return with_format(OUTPUT_CSV, OUTPUT_FORMAT)
+    return OUTPUT_CSV
+
+
+def write_outputs(parsed_files):
+    with ExitStack() as stack:
+        # === Dump the full parsed model while the files stream past ===
+        if OUTPUT_JSON:
+            json_path = stack.enter_context(atomic_output(OUTPUT_JSON))
+            json_file = stack.enter_context(open(json_path, "w", encoding="utf-8"))
+            parsed_files = tee_json(parsed_files, json_file)
+
+        # === Resolve includes / extends / refinements across the whole project ===
+        project = LookmlProject(parsed_files, liquid_values=LIQUID_VALUES, expand_liquid=EXPAND_LIQUID)
+    if OUTPUT_JSON:
+        print(f"🧱 Parsed LookML model saved to: {OUTPUT_JSON}")
+
+    # === Stream rows, dropping duplicates (all column values) at insert time ===
+    rows_path = rows_output_path()
+    export_csv = OUTPUT_CSV if OUTPUT_FORMAT in COLUMNAR_FORMATS and EXPORT_CSV else None
+    with atomic_output(rows_path) as tmp_path:
+        with RowSink(tmp_path, OUTPUT_FIELDS, fmt=OUTPUT_FORMAT, export_csv=export_csv) as sink:
+            sink.add_all(project_rows(project))
+
+    # === Persist the lineage graph ===
+    graph_builder = LineageGraphBuilder()
+    add_lookml_project(graph_builder, project)
+    graph = graph_builder.build()
+    with atomic_output(LINEAGE_GRAPH) as tmp_path:
+        graph.save(tmp_path)
+    return sink, graph
+
+
+def watch():
+    cache = ScanCache(CACHE_DB) if USE_CACHE else None
+    watcher = LookmlWatcher(LOOKML_ROOT, cache=cache, interval=POLL_INTERVAL, workers=WORKERS)
+    sink, graph = write_outputs(watcher.start())
+    print(f"✅ LookML mapping saved to: {rows_output_path()} ({sink.written} rows)")
+    print(f"👀 Watching {LOOKML_ROOT} ({len(watcher.parsed)} files), Ctrl+C to stop")
+
+    def on_change(files, updated, deleted):
+        start = time.perf_counter()
+        sink, graph = write_outputs(files)
+        print(
+            f"🔄 {len(updated)} changed, {len(deleted)} deleted → outputs rewritten in "
+            f"{time.perf_counter() - start:.2f}s ({sink.written} rows, {graph.edge_count} edges)"
+        )
+
+    try:
+        watcher.run(on_change)
+    except KeyboardInterrupt:
+        print("🛑 Watch stopped")
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def main():
+    if WATCH:
+        watch()
+        return
+
+    # === Parse every .lkml file once ===
+    if USE_CACHE:
+        with ScanCache(CACHE_DB) as cache:
+            sink, graph = write_outputs(cache.iter_refresh(LOOKML_ROOT, workers=WORKERS))
+            stats = cache.stats
+        print(
+            f"🗃️ Scan cache: {stats['cached']} cached, {stats['reparsed']} re-parsed, "
+            f"{stats['deleted']} deleted ({stats['files']} files)"
+        )
+    else:
+        sink, graph = write_outputs(iter_scan_repo(LOOKML_ROOT, workers=WORKERS))
+
+    print(f"✅ LookML mapping saved to: {rows_output_path()}")
+    print(f"🕸️ Lineage graph saved to: {LINEAGE_GRAPH} ({len(graph)} nodes, {graph.edge_count} edges)")
+    print(f"📄 Total unique rows (views, explores, joins, refs): {sink.written}")
+    print(f"🧹 Duplicate rows dropped: {sink.duplicates}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,24 @@ Description:
       2. The output of script_01 with view/explore + table lineage
 
     Enhancements in this version:
-      - Filters out view-only rows from script_01 (uses only explores)
+      - Reads explore → view → table lineage from the graph persisted by script_01
+        (script_01-lookml_lineage.graph) instead of re-deriving it from the CSV
+      - Joins on (query_model, query_explore), so same-named explores in different
+        models no longer fan out
       - Adds the resolved base_view_name to the output for improved traceability
+      - redshift_tables covers everything an explore can query: the base view, every
+        joined view, and the views their derived tables read from (`${view.SQL_TABLE_NAME}`,
+        transitively). The explore → table closure is precomputed once per run
+        (`lineage_graph.explore_table_closure`), so each (query_model, query_explore)
+        is a single lookup
+      - Persists dashboards → explores on top of the LookML graph (DASHBOARD_GRAPH)
+      - Builds the long (one table per row) explore → table frame straight from the
+        graph and joins it onto the dashboard rows with vectorized merges; the wide
+        `redshift_tables` column is derived by grouping the long frame, so there is no
+        per-row Python `apply` and no string split/explode pass
+      - INTERCHANGE_FORMAT = "parquet" / "arrow" writes both outputs as typed columnar
+        files (categorical name columns) for script_03 / script_04, with the CSVs kept as
+        exports (EXPORT_CSV); see `frame_io.py`
 
     Outputs:
       - A full joined CSV mapping dashboards → explores → base views → Redshift tables
@@ -14,24 +30,31 @@ Description:
 
 Inputs:
     - raw/system__activity_dashboard_explores_models_2025-06-16T1959.csv
-    - script_01-extracting_looker_tables_from_views_and_models.csv
+    - script_01-lookml_lineage.graph
 
 Outputs:
     - script_02-dashboards_to_views_to_redshift.csv
     - script_02-dashboards_to_views_to_redshift_exploded.csv
+    - script_02-dashboard_lineage.graph
 """
 
 import pandas as pd
 
+from lineage_graph import LineageGraph, LineageGraphBuilder, explore_key, explore_table_closure
+from frame_io import write_stage_frame
+
 # === INPUT FILES ===
 DASHBOARD_CSV = r"raw/system__activity_dashboard_explores_models_2025-06-16T1959.csv"
-VIEWS_CSV = "script_01-extracting_looker_tables_from_views_and_models.csv"
+LINEAGE_GRAPH = "script_01-lookml_lineage.graph"
 OUTPUT_CSV = "script_02-dashboards_to_views_to_redshift.csv"
 OUTPUT_EXPLODED = "script_02-dashboards_to_views_to_redshift_exploded.csv"
+DASHBOARD_GRAPH = "script_02-dashboard_lineage.graph"
+INTERCHANGE_FORMAT = "csv"  # "csv", "parquet" or "arrow" (typed, needs pyarrow)
+EXPORT_CSV = True           # with "parquet" / "arrow": also write the CSVs for Google Sheets
 
 # === LOAD DATA ===
 dashboards = pd.read_csv(DASHBOARD_CSV)
-views = pd.read_csv(VIEWS_CSV)
+graph = LineageGraph.load(LINEAGE_GRAPH)
 
 # === CLEAN COLUMN NAMES ===
 dashboards.columns = (
@@ -42,31 +65,56 @@ dashboards.columns = (
     .str.replace(")", "")
     .str.replace("-", "_")
 )
-views.columns = views.columns.str.strip().str.lower()
 
-# === FILTER TO EXPLORE ROWS ONLY ===
-views = views[views["view_or_model_type"] == "explore"]
+# === EXPLORE → BASE + JOINED VIEWS → TABLES FROM THE LINEAGE GRAPH ===
+def explore_lineage(graph):
+    """
+    One row per explore, and one row per (explore, table) pair. Tables come from the
+    precomputed closure: base view, every joined view, and the views their derived
+    tables read from (transitively).
+    """
+    table_closure = explore_table_closure(graph)
+    explores = []
+    explore_tables = []
+    for key in graph.nodes("explore"):
+        attrs = graph.attrs("explore", key)
+        model_name, explore_name = attrs.get("model_name"), attrs.get("explore_name")
+        explores.append((model_name, explore_name, attrs.get("base_view_name"), attrs.get("lkml_file")))
+        explore_tables.extend((model_name, explore_name, table) for table in table_closure[key])
+    return explores, explore_tables
+
+explore_list, explore_table_list = explore_lineage(graph)
+views = pd.DataFrame(explore_list, columns=["model_name", "view_or_model_name", "base_view_name", "lkml_file"])
+
+# Long form: one (query_model, query_explore, redshift_table) per row, sorted per explore
+explore_tables = (
+    pd.DataFrame(explore_table_list, columns=["query_model", "query_explore", "redshift_table"])
+    .dropna(subset=["query_model", "query_explore"])
+    .sort_values(["query_model", "query_explore", "redshift_table"], ignore_index=True)
+)
+
+# Wide form derived by grouping the long one: "a, b, c" per explore
+explore_tables_wide = (
+    explore_tables.groupby(["query_model", "query_explore"], sort=False)["redshift_table"]
+    .agg(", ".join)
+    .rename("redshift_tables")
+    .reset_index()
+)
+views = views.merge(
+    explore_tables_wide,
+    how="left",
+    left_on=["model_name", "view_or_model_name"],
+    right_on=["query_model", "query_explore"]
+).drop(columns=["query_model", "query_explore"])
 
-# === JOIN ON QUERY_EXPLORE <-> view_or_model_name ===
+# === JOIN ON (QUERY_MODEL, QUERY_EXPLORE) <-> (model_name, view_or_model_name) ===
 merged = dashboards.merge(
     views,
     how="left",
-    left_on="query_explore",
-    right_on="view_or_model_name"
+    left_on=["query_model", "query_explore"],
+    right_on=["model_name", "view_or_model_name"]
 )
 
-# === BUILD redshift_tables COLUMN ===
-def combine_sources(row):
-    tables = set()
-    if pd.notnull(row.get("sql_table_name")) and row["sql_table_name"].strip():
-        tables.add(row["sql_table_name"].strip())
-    if pd.notnull(row.get("derived_table_sources")) and row["derived_table_sources"].strip():
-        derived_split = [t.strip() for t in row["derived_table_sources"].split(",")]
-        tables.update(filter(None, derived_split))
-    return ", ".join(sorted(tables)) if tables else None
-
-merged["redshift_tables"] = merged.apply(combine_sources, axis=1)
-
 # === SELECT FINAL COLUMNS ===
 final_cols = [
     "dashboard_id_user_defined_only",
@@ -81,24 +129,38 @@ final_cols = [
 
 merged_clean = merged[final_cols]
 
-# === EXPORT MAIN CSV ===
-merged_clean.to_csv(OUTPUT_CSV, index=False)
+# === ONE TABLE PER ROW: JOIN THE LONG FORM STRAIGHT ONTO THE DASHBOARD ROWS ===
+# (a left merge keeps dashboard row order; explores without tables keep one empty row)
+exploded = merged_clean.drop(columns=["redshift_tables"]).merge(
+    explore_tables, how="left", on=["query_model", "query_explore"]
+)
+
+# === EXPORT BOTH OUTPUTS ===
+write_stage_frame(merged_clean, OUTPUT_CSV, fmt=INTERCHANGE_FORMAT, export_csv=EXPORT_CSV)
+write_stage_frame(exploded, OUTPUT_EXPLODED, fmt=INTERCHANGE_FORMAT, export_csv=EXPORT_CSV)
 
-# === EXPLODE redshift_tables INTO MULTIPLE ROWS ===
-exploded = merged_clean.copy()
-exploded["redshift_tables"] = exploded["redshift_tables"].fillna("")
+# === PERSIST DASHBOARD → EXPLORE EDGES ON TOP OF THE LOOKML GRAPH ===
+def format_id(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
 
-exploded = exploded.assign(
-    redshift_table=exploded["redshift_tables"].str.split(r",\s*")
-).explode("redshift_table")
+builder = LineageGraphBuilder.from_graph(graph)
+usage = dashboards[[
+    "dashboard_id_user_defined_only", "dashboard_title", "query_model", "query_explore"
+]].dropna(subset=["dashboard_id_user_defined_only", "query_model", "query_explore"]).drop_duplicates()
 
-exploded = exploded.drop(columns=["redshift_tables"])
+for dashboard_id, title, model, explore in usage.itertuples(index=False):
+    dashboard_node = builder.node("dashboard", format_id(dashboard_id), title=title if pd.notnull(title) else None)
+    explore_node = builder.node("explore", explore_key(model, explore), model_name=model, explore_name=explore)
+    builder.edge(dashboard_node, explore_node, "uses_explore")
 
-# === EXPORT EXPLODED CSV ===
-exploded.to_csv(OUTPUT_EXPLODED, index=False)
+dashboard_graph = builder.build()
+dashboard_graph.save(DASHBOARD_GRAPH)
 
 # === SUMMARY ===
 print(f"\n✅ Final dashboard-to-Redshift mapping saved to: {OUTPUT_CSV}")
 print(f"🪄 Exploded version saved to: {OUTPUT_EXPLODED}")
 print(f"📊 Total dashboards mapped: {len(merged_clean)}")
 print(f"📈 Total exploded rows: {len(exploded)}")
+print(f"🕸️ Dashboard lineage graph saved to: {DASHBOARD_GRAPH} ({len(dashboard_graph)} nodes, {dashboard_graph.edge_count} edges)")
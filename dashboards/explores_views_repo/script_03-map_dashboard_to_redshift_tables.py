@@ -6,6 +6,11 @@ Description:
     Enhancements:
         - Adds a column `potential_full_path` = "analytics." + dbt_model_name
         - Matches dashboards using redshift_table values ending with this full path
+          (e.g. `prod.analytics.orders` or `"ANALYTICS"."orders"` match `analytics.orders`)
+        - All models are resolved in one pass against a single index of the exploded
+          redshift_table values (`relation_matcher.py`: hash map for exact matches,
+          reversed-segment trie for suffix matches) instead of one full-column scan per model
+        - Reads script_02's exploded output as CSV, Parquet or Arrow (`frame_io.py`)
 
 Inputs:
     - script_01-dbt_models_list.csv (e.g. `orders.sql`)
@@ -23,35 +28,37 @@ Output:
 
 import pandas as pd
 
+from relation_matcher import RelationMatcher
+from frame_io import read_frame, write_stage_frame
+
 # === INPUT FILES ===
 DBT_MODELS_CSV = r"raw\script_01-dbt_models_list.csv"
 EXPLODED_CSV = "script_02-dashboards_to_views_to_redshift_exploded.csv"
 OUTPUT_CSV = "script_03-redshift_tables_to_dashboards.csv"
+INTERCHANGE_FORMAT = "csv"  # "csv", "parquet" or "arrow" (typed, needs pyarrow)
+EXPORT_CSV = True           # with "parquet" / "arrow": also write OUTPUT_CSV
 
 # === LOAD DATA ===
 dbt_models = pd.read_csv(DBT_MODELS_CSV, header=None, names=["dbt_model_file"])
-dashboards = pd.read_csv(EXPLODED_CSV)
+dashboards = read_frame(EXPLODED_CSV)  # CSV, Parquet or Arrow, whichever script_02 wrote last
 
 # === PREPARE DBT MODEL COLUMNS ===
 dbt_models["dbt_model_name"] = dbt_models["dbt_model_file"].str.replace(".sql$", "", regex=True)
 dbt_models["potential_full_path"] = "analytics." + dbt_models["dbt_model_name"]
 
 # === MAP DBT MODELS TO DASHBOARDS USING potential_full_path ===
-dashboard_map = {}
-
-for _, row in dbt_models.iterrows():
-    full_path = row["potential_full_path"]
-    matched_dashboards = dashboards[
-        dashboards["redshift_table"].str.strip().eq(full_path)
-    ]["dashboard_title"].dropna().unique()
-
-    dashboard_map[full_path] = ", ".join(sorted(matched_dashboards)) if len(matched_dashboards) > 0 else None
+matcher = RelationMatcher.from_pairs(dashboards["redshift_table"], dashboards["dashboard_title"])
+matches = matcher.match_all(dbt_models["potential_full_path"].unique(), suffix=True)
+dashboard_map = {
+    full_path: ", ".join(sorted(titles)) if titles else None
+    for full_path, titles in matches.items()
+}
 
 dbt_models["associated_dashboards"] = dbt_models["potential_full_path"].map(dashboard_map)
 
 # === EXPORT FINAL RESULT ===
 output = dbt_models[["dbt_model_file", "dbt_model_name", "potential_full_path", "associated_dashboards"]]
-output.to_csv(OUTPUT_CSV, index=False)
+write_stage_frame(output, OUTPUT_CSV, fmt=INTERCHANGE_FORMAT, export_csv=EXPORT_CSV)
 
 # === SUMMARY ===
 linked_count = output["associated_dashboards"].notnull().sum()
@@ -17,32 +17,46 @@ Output:
         Columns:
             - dashboard_title
             - redshift_tables
+
+    script_02's output is read as CSV, Parquet or Arrow, whichever was written last (`frame_io.py`).
+    For ad-hoc "which dashboards use this table" questions use `lineage_query.py` instead
+    of rerunning this script.
 """
 
 import pandas as pd
 
+from frame_io import read_frame, write_stage_frame
+
 # === INPUT FILES ===
 DASHBOARD_LIST_CSV = r"raw\script_01-dashboard_list.csv"
 DASHBOARD_MAPPING_CSV = "script_02-dashboards_to_views_to_redshift.csv"
 OUTPUT_CSV = "script_04-dashboards_to_redshift_tables.csv"
+INTERCHANGE_FORMAT = "csv"  # "csv", "parquet" or "arrow" (typed, needs pyarrow)
+EXPORT_CSV = True           # with "parquet" / "arrow": also write OUTPUT_CSV
 
 # === LOAD DATA ===
 dashboard_list = pd.read_csv(DASHBOARD_LIST_CSV, header=None, names=["dashboard_title"])
-dashboard_mapping = pd.read_csv(DASHBOARD_MAPPING_CSV)
+dashboard_mapping = read_frame(DASHBOARD_MAPPING_CSV)  # CSV, Parquet or Arrow
 
 # === CLEAN COLUMN NAMES ===
 dashboard_mapping.columns = dashboard_mapping.columns.str.strip().str.lower()
 dashboard_list["dashboard_title"] = dashboard_list["dashboard_title"].str.strip()
 
 # === GROUP redshift_tables BY DASHBOARD TITLE ===
-table_lookup = dashboard_mapping.groupby("dashboard_title")["redshift_tables"] \
-    .apply(lambda x: ", ".join(sorted(set(filter(pd.notnull, x))))).to_dict()
+# Dedup + sort once over the whole frame, then one vectorized join per group (no per-group lambda)
+table_pairs = dashboard_mapping[["dashboard_title", "redshift_tables"]].dropna(subset=["redshift_tables"])
+table_pairs = table_pairs.astype({"dashboard_title": str, "redshift_tables": str}) \
+    .drop_duplicates().sort_values(["dashboard_title", "redshift_tables"])
+table_lookup = table_pairs.groupby("dashboard_title", sort=False)["redshift_tables"].agg(", ".join).to_dict()
+table_lookup.update(
+    {title: "" for title in dashboard_mapping["dashboard_title"].dropna().astype(str).unique() if title not in table_lookup}
+)
 
 # === MAP TO INPUT LIST ===
 dashboard_list["redshift_tables"] = dashboard_list["dashboard_title"].map(table_lookup)
 
 # === EXPORT ===
-dashboard_list.to_csv(OUTPUT_CSV, index=False)
+write_stage_frame(dashboard_list, OUTPUT_CSV, fmt=INTERCHANGE_FORMAT, export_csv=EXPORT_CSV)
 
 # === SUMMARY ===
 print(f"\n✅ Dashboard to Redshift table mapping saved to: {OUTPUT_CSV}")
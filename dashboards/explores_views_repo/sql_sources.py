@@ -0,0 +1,296 @@
+"""
+Description:
+    Extracts the relations a derived table's SQL reads from, using the sqlparse lexer.
+
+    Compared to the old `(?:from|join)\\s+schema.table` regex it:
+        - follows FROM / JOIN clauses (incl. `a, b` lists) at every subquery depth
+        - ignores `FROM` inside function calls such as `extract(year from x)`
+        - skips CTE names, honouring their scope (a WITH inside a subquery is only
+          visible inside that subquery)
+        - understands quoted and three-part names (`"db"."schema"."table"`)
+        - turns `${view.SQL_TABLE_NAME}` into a view dependency instead of a table
+        - reads every Liquid branch: SQL with `{% if / elsif / else / case / when %}` is
+          expanded into one variant per branch combination
+          (`lookml_constants.LookmlEvaluator.expand_sql`), each variant is extracted
+          and the sources are merged
+        - neutralises the rest of Liquid (`{{ }}`, other `{% %}` tags) and LookML
+          (`${...}`, `@{...}`) placeholders so they neither break tokenizing nor show
+          up as tables
+
+    Results are memoized by a hash of the normalized SQL, so the same SQL pasted
+    into many views is only tokenized once per run.
+
+    The samples below are checked by running the module: `python sql_sources.py`.
+
+Usage:
+    from sql_sources import extract_sql_sources
+    sources = extract_sql_sources(derived_sql)
+    sources.tables   # ("analytics.orders", ...)
+    sources.views    # ("order_facts", ...) from ${order_facts.SQL_TABLE_NAME}
+
+Samples:
+    "select * from analytics.orders o join ${customers.SQL_TABLE_NAME} c on o.id = c.id"
+        → tables ("analytics.orders",), views ("customers",)
+    "with a as (select 1 from raw.x), b as (select * from a) select * from b, analytics.c"
+        → tables ("analytics.c", "raw.x")            (a and b are CTEs, not tables)
+    "select '--' as x from s.t -- trailing comment"
+        → tables ("s.t",)                            (`--` inside a string is not a comment)
+    "select extract(year from created_at) from (select * from analytics.events) e"
+        → tables ("analytics.events",)
+    "select * from {% if x %} s.t1 {% elsif y %} s.t2 {% else %} s.t3 {% endif %}"
+        → tables ("s.t1", "s.t2", "s.t3")             (every Liquid branch)
+    "select * from {% case x %}{% when 'a' %} s.t1 {% when 'b' %} s.t2 {% endcase %} join s.d"
+        → tables ("s.d", "s.t1", "s.t2")
+"""
+
+import re
+import hashlib
+from collections import namedtuple
+
+from sqlparse import lexer
+from sqlparse import tokens as T
+
+SqlSources = namedtuple("SqlSources", ["tables", "views"])
+
+# === PLACEHOLDERS ===
+VIEW_PLACEHOLDER_PREFIX = "__lkml_view__"
+UNRESOLVED_PLACEHOLDER = "__lkml_unresolved__"
+
+_SQL_TABLE_NAME_REF_RE = re.compile(r"\$\{\s*([\w\-]+)\.SQL_TABLE_NAME\s*\}", re.IGNORECASE)
+_LOOKML_REF_RE = re.compile(r"\$\{[^}]*\}")
+_CONSTANT_RE = re.compile(r"@\{[^}]*\}")
+_LIQUID_OUTPUT_RE = re.compile(r"\{\{.*?\}\}", re.DOTALL)
+_LIQUID_TAG_RE = re.compile(r"\{%.*?%\}", re.DOTALL)
+# Comments, skipping over string literals / quoted identifiers (so `'--'` survives)
+_COMMENT_OR_QUOTED_RE = re.compile(
+    r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|--[^\n]*|/\*.*?\*/""", re.DOTALL
+)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Keywords that end a FROM list or cannot start a relation name
+_CLAUSE_KEYWORDS = {
+    "where", "on", "using", "group by", "order by", "having", "limit", "union",
+    "union all", "except", "intersect", "window", "qualify", "select", "lateral",
+    "natural", "set", "values", "returning", "offset", "fetch",
+}
+
+_cache = {}
+cache_stats = {"hits": 0, "misses": 0}
+_liquid_evaluator = None
+
+SAMPLES = [
+    ("select * from analytics.orders o join ${customers.SQL_TABLE_NAME} c on o.id = c.id",
+     ("analytics.orders",), ("customers",)),
+    ("with a as (select 1 from raw.x), b as (select * from a) select * from b, analytics.c",
+     ("analytics.c", "raw.x"), ()),
+    ("select '--' as x from s.t -- trailing comment", ("s.t",), ()),
+    ("select extract(year from created_at) from (select * from analytics.events) e",
+     ("analytics.events",), ()),
+    ("select * from {% if x %} s.t1 {% elsif y %} s.t2 {% else %} s.t3 {% endif %}",
+     ("s.t1", "s.t2", "s.t3"), ()),
+    ("select * from {% case x %}{% when 'a' %} s.t1 {% when 'b' %} s.t2 {% endcase %} join s.d",
+     ("s.d", "s.t1", "s.t2"), ()),
+    ("select * from s.t where {% condition f %} s.t.x {% endcondition %} and y in (select y from {{ _user_attributes['s'] }}.z)",
+     ("s.t",), ()),
+]
+
+
+def normalize_sql(sql):
+    """Replace LookML/Liquid placeholders, drop comments and collapse whitespace."""
+    sql = _LIQUID_TAG_RE.sub(" ", sql)
+    sql = _LIQUID_OUTPUT_RE.sub(UNRESOLVED_PLACEHOLDER, sql)
+    sql = _SQL_TABLE_NAME_REF_RE.sub(lambda m: VIEW_PLACEHOLDER_PREFIX + m.group(1), sql)
+    sql = _LOOKML_REF_RE.sub(UNRESOLVED_PLACEHOLDER, sql)
+    sql = _CONSTANT_RE.sub(UNRESOLVED_PLACEHOLDER, sql)
+    sql = _COMMENT_OR_QUOTED_RE.sub(lambda m: m.group(1) or " ", sql)
+    return _WHITESPACE_RE.sub(" ", sql).strip()
+
+
+def _significant_tokens(sql):
+    for ttype, value in lexer.tokenize(sql):
+        if ttype in T.Whitespace or ttype in T.Newline or ttype in T.Comment:
+            continue
+        yield ttype, value
+
+
+def _is_name(ttype, value):
+    if ttype in T.Name or ttype in T.Literal.String.Symbol:
+        return True
+    return ttype in T.Keyword and value.lower() not in _CLAUSE_KEYWORDS and ttype not in T.Keyword.DML
+
+
+def _unquote(part):
+    if len(part) >= 2 and part[0] == part[-1] and part[0] in '"`[':
+        return part[1:-1]
+    if part.startswith("[") and part.endswith("]"):
+        return part[1:-1]
+    return part
+
+
+def _extract(sql):
+    tokens = list(_significant_tokens(sql))
+    n = len(tokens)
+    tables = set()
+    views = set()
+
+    # One frame per paren depth: is it a query, which CTE names does it define,
+    # and does a comma at this depth continue a FROM list?
+    frames = [{"query": True, "ctes": set(), "from_list": False}]
+    expect_relation = False   # just saw FROM / JOIN / a comma inside a FROM list
+    cte_depths = []           # paren depths of open WITH clauses (waiting for `name AS (`)
+
+    def visible_cte(name):
+        return any(name in frame["ctes"] for frame in frames)
+
+    i = 0
+    while i < n:
+        ttype, value = tokens[i]
+        lower = value.lower()
+
+        if value == "(":
+            first = tokens[i + 1] if i + 1 < n else (None, "")
+            is_query = first[0] in T.Keyword.DML or first[0] in T.Keyword.CTE
+            frames.append({"query": is_query, "ctes": set(), "from_list": False})
+            expect_relation = False
+            i += 1
+            continue
+
+        if value == ")":
+            if len(frames) > 1:
+                frames.pop()
+            while cte_depths and cte_depths[-1] > len(frames):
+                cte_depths.pop()  # WITH inside a subquery that never reached its main query
+            expect_relation = False
+            i += 1
+            continue
+
+        frame = frames[-1]
+
+        # --- WITH name AS ( ... ), name2 AS ( ... ) main query ---
+        # Only tokens at the WITH's own depth count: the SELECT inside a CTE body does
+        # not end the clause, the main query's DML after the last `)` does.
+        if ttype in T.Keyword.CTE:
+            cte_depths.append(len(frames))
+            i += 1
+            continue
+        at_with_depth = bool(cte_depths) and cte_depths[-1] == len(frames)
+        if at_with_depth and _is_name(ttype, value) and lower != "recursive":
+            if i + 2 < n and tokens[i + 1][1].lower() == "as" and tokens[i + 2][1] == "(":
+                frame["ctes"].add(_unquote(value).lower())
+                i += 2
+                continue
+        if at_with_depth and ttype in T.Keyword.DML:
+            cte_depths.pop()
+
+        if not frame["query"]:
+            i += 1
+            continue
+
+        if ttype in T.Keyword and (lower == "from" or lower.endswith("join")):
+            expect_relation = True
+            frame["from_list"] = True
+            i += 1
+            continue
+
+        if value == ",":
+            expect_relation = frame["from_list"]
+            i += 1
+            continue
+
+        if ttype in T.Keyword and lower in _CLAUSE_KEYWORDS:
+            expect_relation = False
+            frame["from_list"] = False
+            i += 1
+            continue
+
+        if expect_relation and _is_name(ttype, value):
+            # Read a dotted name: part(.part)*
+            parts = [_unquote(value)]
+            j = i + 1
+            while j + 1 < n and tokens[j][1] == "." and _is_name(*tokens[j + 1]):
+                parts.append(_unquote(tokens[j + 1][1]))
+                j += 2
+            expect_relation = False
+            i = j
+
+            if i < n and tokens[i][1] == "(":
+                continue  # table function, e.g. generate_series(...)
+            if any(UNRESOLVED_PLACEHOLDER in p for p in parts):
+                continue
+            if len(parts) == 1 and parts[0].startswith(VIEW_PLACEHOLDER_PREFIX):
+                views.add(parts[0][len(VIEW_PLACEHOLDER_PREFIX):])
+                continue
+            if len(parts) == 1 and visible_cte(parts[0].lower()):
+                continue
+            tables.add(".".join(parts))
+            continue
+
+        i += 1
+
+    return SqlSources(tuple(sorted(tables)), tuple(sorted(views)))
+
+
+def _liquid_variants(sql):
+    """One rendering of `sql` per Liquid branch combination."""
+    global _liquid_evaluator
+    if _liquid_evaluator is None:
+        # Imported here: lookml_constants imports lookml_parser, which imports this module
+        from lookml_constants import LookmlEvaluator
+        _liquid_evaluator = LookmlEvaluator()
+    return _liquid_evaluator.expand_sql(sql) or (sql,)
+
+
+def extract_sql_sources(sql):
+    """Return SqlSources(tables, views) for `sql`, merged over its Liquid branches."""
+    if not sql:
+        return SqlSources((), ())
+    if "{%" not in sql:
+        return _extract_cached(sql)
+    tables, views = set(), set()
+    for variant in _liquid_variants(sql):
+        sources = _extract_cached(variant)
+        tables.update(sources.tables)
+        views.update(sources.views)
+    return SqlSources(tuple(sorted(tables)), tuple(sorted(views)))
+
+
+def _extract_cached(sql):
+    """`_extract` over the normalized SQL, memoized by its hash."""
+    normalized = normalize_sql(sql)
+    key = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+    cached = _cache.get(key)
+    if cached is not None:
+        cache_stats["hits"] += 1
+        return cached
+    cache_stats["misses"] += 1
+    result = _extract(normalized)
+    _cache[key] = result
+    return result
+
+
+def extract_table_names_from_sql(sql):
+    """Sorted physical tables read by `sql` (drop-in for the old regex helper)."""
+    return list(extract_sql_sources(sql).tables)
+
+
+def clear_cache():
+    _cache.clear()
+    cache_stats["hits"] = cache_stats["misses"] = 0
+
+
+def check_samples():
+    """Run SAMPLES through the extractor; returns the (sql, expected, got) mismatches."""
+    failures = []
+    for sql, tables, views in SAMPLES:
+        got = extract_sql_sources(sql)
+        if got != SqlSources(tables, views):
+            failures.append((sql, SqlSources(tables, views), got))
+    return failures
+
+
+if __name__ == "__main__":
+    failures = check_samples()
+    for sql, expected, got in failures:
+        print(f"❌ {sql}\n   expected {expected}\n   got      {got}")
+    print(f"{'✅' if not failures else '❌'} {len(SAMPLES) - len(failures)}/{len(SAMPLES)} samples")
+    raise SystemExit(1 if failures else 0)
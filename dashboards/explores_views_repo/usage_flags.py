@@ -0,0 +1,106 @@
+"""
+Description:
+    One vectorized usage-flag engine for the audit scripts (explores, views, dashboards,
+    Redshift objects).
+
+    `flag_usage` takes the defined objects (explores, Redshift tables, ...) and any number
+    of named usage sources (dashboards, looks, scheduled plans, alerts, ...), each a frame
+    with the same key columns and optionally a date column. Keys are turned into
+    categorical codes over one shared category set per column, combined into a single
+    integer per row and looked up once, so every source is flagged in the same pass:
+        - used_in_<source>       bool per defined row
+        - last_used_in_<source>  latest date per defined row (sources with a date column)
+        - `any_column`           used in at least one source
+        - `unused_column`        used in none (e.g. safe_to_deprecate_explore)
+
+    `rollup_flags` is the matching "all children are flagged" aggregation (e.g. a
+    dashboard is safe to deprecate when all its explores are), as one groupby `all`.
+
+Usage:
+    flags = flag_usage(
+        explores_df, ["model_name", "explore_name"],
+        {"dashboard": dash_usage, "look": look_usage},
+        any_column="is_used_in_either", unused_column="safe_to_deprecate_explore",
+    )
+    per_dashboard = rollup_flags(dash_df, ["dashboard_id"], ["safe_to_deprecate_view"])
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from join_keys import KEYS
+
+UsageSource = namedtuple("UsageSource", ["frame", "date_column"])
+
+
+def _combined_codes(frames, keys, normalize):
+    """One int64 code per row for each frame, consistent across frames."""
+    per_frame = [[] for _ in frames]
+    dims = []
+    for key in keys:
+        if normalize:
+            # Run-wide interned codes already agree across frames (`join_keys.KEYS`)
+            for codes, f in zip(per_frame, frames):
+                codes.append(KEYS.encode(f[key]).astype(np.int64))
+            dims.append(max(len(KEYS), 1))
+            continue
+        categories = pd.Index(pd.concat([f[key] for f in frames], ignore_index=True).dropna().unique())
+        dims.append(len(categories) + 1)  # +1: missing values get their own code
+        for codes, f in zip(per_frame, frames):
+            codes.append(pd.Categorical(f[key], categories=categories).codes.astype(np.int64) + 1)
+    return [np.ravel_multi_index(codes, dims) if len(codes[0]) else np.empty(0, dtype=np.int64)
+            for codes in per_frame]
+
+
+def flag_usage(defined, keys, sources, any_column="is_used", unused_column=None, normalize=False):
+    """
+    Copy of `defined` with per-source usage flags (see module docstring). `sources` maps
+    a name to a frame with `keys` columns or to a UsageSource(frame, date_column). With
+    `normalize`, keys are compared under the shared `join_keys` rule.
+    """
+    keys = list(keys)
+    names = list(sources)
+    specs = [s if isinstance(s, UsageSource) else UsageSource(s, None) for s in sources.values()]
+
+    codes = _combined_codes([defined] + [s.frame for s in specs], keys, normalize)
+    defined_codes, source_codes = codes[0], codes[1:]
+
+    # Defined rows may repeat a key; flag every row that shares it
+    unique_codes, row_slot = np.unique(defined_codes, return_inverse=True)
+    lookup = pd.Index(unique_codes)
+
+    result = defined.copy()
+    any_used = np.zeros(len(unique_codes), dtype=bool)
+    for name, spec, src_codes in zip(names, specs, source_codes):
+        slots = lookup.get_indexer(src_codes)
+        hit = slots >= 0
+        used = np.zeros(len(unique_codes), dtype=bool)
+        used[slots[hit]] = True
+        any_used |= used
+        result[f"used_in_{name}"] = used[row_slot]
+
+        if spec.date_column is not None:
+            dates = pd.to_datetime(spec.frame[spec.date_column], errors="coerce").to_numpy("datetime64[ns]")
+            valid = hit & ~np.isnat(dates)
+            # NaT is int64 min, so never-used keys stay NaT under np.maximum
+            last = np.full(len(unique_codes), np.datetime64("NaT", "ns").view(np.int64), dtype=np.int64)
+            np.maximum.at(last, slots[valid], dates[valid].view(np.int64))
+            result[f"last_used_in_{name}"] = last.view("datetime64[ns]")[row_slot]
+
+    result[any_column] = any_used[row_slot]
+    if unused_column is not None:
+        result[unused_column] = ~result[any_column]
+    return result
+
+
+def rollup_flags(df, group_keys, flag_columns, fill=False):
+    """Per group: True when every row's flag is True (missing flags count as `fill`)."""
+    flags = df[flag_columns].astype("boolean").fillna(fill).astype(bool)
+    return (
+        pd.concat([df[group_keys], flags], axis=1)
+        .groupby(group_keys, observed=True)[flag_columns]
+        .all()
+        .reset_index()
+    )
@@ -0,0 +1,294 @@
+"""
+Description:
+    Shared dashboard-mover for the deprecation scripts (script_02 / script_03): moves the
+    dashboards listed in a CSV into the "Deprecated - Dashboards" folder and appends one
+    row per dashboard to deprecation_log.csv (same schema as before).
+
+    Concurrency (workers > 1):
+        - Dashboards are processed on a bounded thread pool; each one still makes its
+          own fetch → folder name → update calls in order
+        - Every API call first takes a token from a shared token bucket, so the whole run
+          stays under `requests_per_second` (with short bursts up to `burst`)
+        - 429 and 5xx responses, and transport errors (timeouts, dropped connections), are
+          retried with exponential backoff and jitter, honouring `Retry-After`
+        - Each call has an HTTP timeout, and each dashboard a deadline: once it is
+          exceeded no more retries are made and the row is logged as failed
+        - Log rows are appended, and status lines printed, in CSV order as soon as they
+          are ready; workers only collect their lines, so output never interleaves
+    workers = 1 runs the same code serially.
+
+    With a `LookerMetadataCache` (looker_metadata_cache.py), the deprecated folder, each
+    dashboard's current folder and the folder names come from the prefetched cache, so
+    the only per-dashboard call left is `update_dashboard`. Pass the same `ApiCaller` to
+    the cache and to `deprecate_dashboards` so the prefetch shares the moves' budget.
+
+Usage:
+    sdk = init40()
+    deprecate_dashboards(sdk, csv_path, log_path, workers=8, requests_per_second=10)
+
+    caller = ApiCaller(sdk, TokenBucket(10, burst=10))
+    cache = LookerMetadataCache(sdk, cache_path, caller=caller).load(dashboards=True)
+    deprecate_dashboards(sdk, csv_path, log_path, workers=8, caller=caller, metadata_cache=cache)
+"""
+
+import os
+import csv
+import time
+import random
+import threading
+from datetime import datetime
+from functools import partial
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+from looker_sdk.error import SDKError
+from looker_sdk.sdk.api40.models import CreateFolder, WriteDashboard
+
+TARGET_FOLDER_NAME = "Deprecated - Dashboards"
+LOG_FIELDS = ["dashboard_name", "dashboard_id", "original_folder", "status", "timestamp"]
+
+WORKERS = 8
+REQUESTS_PER_SECOND = 10.0
+BURST = 10
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5       # seconds; doubled per retry
+BACKOFF_MAX = 30.0
+REQUEST_TIMEOUT = 30     # seconds per HTTP call
+DASHBOARD_TIMEOUT = 120  # seconds per dashboard, retries included
+
+
+class DashboardTimeout(Exception):
+    pass
+
+
+# === RATE LIMITING ===
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `burst` saved up."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = max(float(burst), 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, deadline=None):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise DashboardTimeout("rate limit wait would pass the dashboard deadline")
+            time.sleep(wait)
+
+
+# === RETRYING API CALLS ===
+class ApiCaller:
+    """
+    Runs SDK calls through the token bucket with retry/backoff. SDKError does not carry
+    the HTTP status, so a response hook on the SDK's requests session records the status
+    and Retry-After of the last response per thread.
+    """
+
+    def __init__(self, sdk, limiter, max_retries=MAX_RETRIES, request_timeout=REQUEST_TIMEOUT,
+                 backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.request_timeout = request_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.last = threading.local()
+        session = getattr(sdk.transport, "session", None)
+        if session is not None:
+            session.hooks["response"].append(self._record_response)
+
+    def _record_response(self, response, *args, **kwargs):
+        self.last.status = response.status_code
+        self.last.retry_after = response.headers.get("Retry-After")
+
+    def _retryable(self):
+        status = getattr(self.last, "status", None)
+        # No response at all means the transport failed (timeout, connection reset)
+        return status is None or status == 429 or status >= 500
+
+    def _delay(self, attempt):
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+        retry_after = getattr(self.last, "retry_after", None)
+        if retry_after and str(retry_after).isdigit():
+            delay = max(delay, float(retry_after))
+        return delay
+
+    def call(self, method, *args, deadline=None, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(deadline)
+            self.last.status = None
+            self.last.retry_after = None
+            timeout = self.request_timeout
+            if deadline is not None:
+                timeout = max(1, min(timeout, int(deadline - time.monotonic())))
+            try:
+                return method(*args, transport_options={"timeout": timeout}, **kwargs)
+            except SDKError:
+                if attempt == self.max_retries or not self._retryable():
+                    raise
+                delay = self._delay(attempt)
+                if deadline is not None and time.monotonic() + delay > deadline:
+                    raise
+                time.sleep(delay)
+
+
+# === DEPRECATED FOLDER ===
+def get_or_create_deprecated_folder(sdk, caller, target_folder_name=TARGET_FOLDER_NAME, metadata_cache=None):
+    """
+    Id of the target folder, created if missing. Every call goes through `caller`; a
+    metadata-cache miss is confirmed with a live `search_folders` before creating, since
+    the folder may have been created after the prefetch.
+    """
+    try:
+        if metadata_cache is not None:
+            folder_id = metadata_cache.folder_id_by_name(target_folder_name)
+            if folder_id is None:
+                folder_id = metadata_cache.search_folder_id(target_folder_name)
+            if folder_id is not None:
+                print(f"✅ Using existing '{target_folder_name}' folder: {folder_id}")
+                return folder_id
+            folders = []
+        else:
+            folders = caller.call(sdk.all_folders, fields="id,name")
+        for folder in folders:
+            if folder.name == target_folder_name:
+                print(f"✅ Using existing '{target_folder_name}' folder: {folder.id}")
+                return folder.id
+        new_folder = caller.call(sdk.create_folder, CreateFolder(name=target_folder_name, parent_id="1"))
+        print(f"🆕 Created new '{target_folder_name}' folder: {new_folder.id}")
+        if metadata_cache is not None:
+            metadata_cache.add_folder(new_folder.id, target_folder_name)
+        return new_folder.id
+    except Exception as e:
+        print(f"❌ Error while getting/creating folder: {e}")
+        exit(1)
+
+
+# === ONE DASHBOARD ===
+def move_dashboard(sdk, caller, row, deprecated_folder_id, target_folder_name=TARGET_FOLDER_NAME,
+                   dry_run=False, dashboard_timeout=DASHBOARD_TIMEOUT, metadata_cache=None):
+    """
+    Fetch, look up the folder name and move one dashboard; returns (log row, status lines)
+    and never raises. Runs on worker threads, so it prints nothing itself: the caller
+    prints the lines in CSV order.
+    """
+    dashboard_id = row["dashboard_id"]
+    dashboard_name = row["dashboard_name"]
+    timestamp = datetime.utcnow().isoformat()
+    deadline = time.monotonic() + dashboard_timeout if dashboard_timeout else None
+    folder_name = "Unknown"
+    status = ""
+    lines = []
+
+    def fetch(method, *args):
+        return caller.call(method, *args, deadline=deadline)
+
+    # Fetch dashboard (from the metadata cache when there is one)
+    try:
+        if metadata_cache is not None:
+            dashboard = SimpleNamespace(**metadata_cache.dashboard(dashboard_id, fetch))
+        else:
+            dashboard = fetch(sdk.dashboard, dashboard_id)
+    except Exception as e:
+        status = f"Fetch failed: {e}"
+        lines.append(f"❌ Cannot fetch dashboard {dashboard_name} (ID: {dashboard_id}): {e}")
+        folder_name = "Unavailable"
+    else:
+        current_folder_id = dashboard.folder_id
+
+        # Get folder name
+        if current_folder_id:
+            try:
+                if metadata_cache is not None:
+                    folder_name = metadata_cache.folder_name(current_folder_id, fetch)
+                else:
+                    folder_name = fetch(sdk.folder, current_folder_id).name
+            except Exception:
+                folder_name = "Unavailable"
+
+        lines.append(f"📋 {dashboard_name} (ID: {dashboard_id}) — in folder: {folder_name}")
+
+        # Determine action
+        if str(current_folder_id) == str(deprecated_folder_id):
+            status = "Already in target folder"
+            lines.append(f"⏭️ Skipped — already in '{target_folder_name}'\n")
+        elif dry_run:
+            status = f"DRY RUN — would move to '{target_folder_name}' (ID: {deprecated_folder_id})"
+            lines.append(f"🔎 {status}\n")
+        else:
+            try:
+                updated = fetch(
+                    sdk.update_dashboard,
+                    dashboard_id,
+                    WriteDashboard(folder_id=deprecated_folder_id)
+                )
+                if metadata_cache is not None:
+                    metadata_cache.record_move(dashboard_id, deprecated_folder_id)
+                status = "Moved to Deprecated"
+                lines.append(f"✅ {status}: {updated.title} (ID: {dashboard_id})\n")
+            except Exception as e:
+                status = f"Move failed: {e}"
+                lines.append(f"❌ {status} for {dashboard_name} (ID: {dashboard_id})\n")
+
+    return {
+        "dashboard_name": dashboard_name,
+        "dashboard_id": dashboard_id,
+        "original_folder": folder_name,
+        "status": status,
+        "timestamp": timestamp
+    }, lines
+
+
+# === WHOLE CSV ===
+def deprecate_dashboards(sdk, csv_path, log_path, target_folder_name=TARGET_FOLDER_NAME, dry_run=False,
+                         workers=WORKERS, requests_per_second=REQUESTS_PER_SECOND, burst=BURST,
+                         max_retries=MAX_RETRIES, request_timeout=REQUEST_TIMEOUT,
+                         dashboard_timeout=DASHBOARD_TIMEOUT, metadata_cache=None, caller=None):
+    """
+    Move every dashboard in `csv_path`; appends one `log_path` row each. Returns the log rows.
+    `caller` (an ApiCaller) replaces the one built from the rate / retry settings.
+    """
+    if caller is None:
+        caller = ApiCaller(sdk, TokenBucket(requests_per_second, burst), max_retries, request_timeout)
+    deprecated_folder_id = get_or_create_deprecated_folder(sdk, caller, target_folder_name, metadata_cache)
+
+    # Initialize log file (write header if new)
+    if not os.path.exists(log_path):
+        with open(log_path, mode="w", newline="", encoding="utf-8") as log_file:
+            writer = csv.DictWriter(log_file, fieldnames=LOG_FIELDS)
+            writer.writeheader()
+
+    with open(csv_path, mode="r", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    process = partial(
+        move_dashboard, sdk, caller,
+        deprecated_folder_id=deprecated_folder_id, target_folder_name=target_folder_name,
+        dry_run=dry_run, dashboard_timeout=dashboard_timeout, metadata_cache=metadata_cache
+    )
+
+    log_rows = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool, \
+            open(log_path, mode="a", newline="", encoding="utf-8") as log_file:
+        writer = csv.DictWriter(log_file, fieldnames=LOG_FIELDS)
+        # Print and write each dashboard as soon as it (and every row before it) is done
+        for log_row, lines in pool.map(process, rows):
+            for line in lines:
+                print(line)
+            writer.writerow(log_row)
+            log_file.flush()
+            log_rows.append(log_row)
+
+    if metadata_cache is not None:
+        metadata_cache.save()  # keeps the moves, so a rerun within the TTL skips them
+    return log_rows
@@ -0,0 +1,189 @@
+"""
+Description:
+    Prefetched folder / dashboard metadata for the deprecation scripts, so a dashboard
+    move costs one API call (`update_dashboard`) instead of three.
+
+    - Folders (id, name) and, optionally, dashboards (id, title, folder_id) are bulk
+      loaded with a few paginated `search_folders` / `search_dashboards` calls, sorted
+      by id (offset paging is only stable over a fixed order) and de-duplicated by id
+    - Kept in memory and in a JSON file on disk; the file is reused until it is older
+      than `ttl_seconds` or was written for another Looker instance
+    - Lookups are served locally. An id the cache has never seen (a dashboard created
+      after the prefetch, say) falls back to one API call and is remembered
+    - Every API call (prefetch pages and fallbacks) goes through a
+      `dashboard_mover.ApiCaller`, i.e. the token bucket and retry/backoff. Pass the
+      mover's caller so both draw from one budget; without one, a caller with the
+      mover's default limits is created
+    - `record_move` updates a dashboard's folder after a move, so a rerun within the
+      TTL sees it as already deprecated
+
+Usage:
+    caller = ApiCaller(sdk, TokenBucket(10, burst=10))
+    cache = LookerMetadataCache(sdk, r"raw\\looker_metadata_cache.json", ttl_seconds=3600, caller=caller)
+    cache.load(dashboards=True)
+    cache.folder_name("123")            # "Shared"
+    cache.dashboard("456")              # {"title": ..., "folder_id": ...}
+    cache.folder_id_by_name("Deprecated - Dashboards")
+"""
+
+import os
+import json
+import time
+import threading
+
+from dashboard_mover import ApiCaller, TokenBucket, REQUESTS_PER_SECOND, BURST
+
+PAGE_SIZE = 1000
+TTL_SECONDS = 3600
+CACHE_VERSION = 1
+
+
+class LookerMetadataCache:
+    def __init__(self, sdk, cache_path=None, ttl_seconds=TTL_SECONDS, page_size=PAGE_SIZE, caller=None):
+        self.sdk = sdk
+        self.caller = caller if caller is not None else ApiCaller(sdk, TokenBucket(REQUESTS_PER_SECOND, BURST))
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.page_size = page_size
+        self.folders = {}       # folder id → name
+        self.dashboards = {}    # dashboard id → {"title", "folder_id"}
+        self.fetched_at = None
+        self.has_dashboards = False
+        self.api_calls = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        settings = getattr(getattr(self.sdk, "auth", None), "settings", None)
+        return getattr(settings, "base_url", None)
+
+    # --- Loading ---
+    def load(self, dashboards=False):
+        """Use the on-disk cache while fresh, otherwise prefetch from the API (and save)."""
+        if self._read_disk(dashboards):
+            print(f"🗃️ Using cached Looker metadata ({len(self.folders)} folders, "
+                  f"{len(self.dashboards)} dashboards) from {self.cache_path}")
+            return self
+        self.refresh(dashboards)
+        print(f"🗃️ Prefetched Looker metadata: {len(self.folders)} folders, "
+              f"{len(self.dashboards)} dashboards in {self.api_calls} API calls")
+        return self
+
+    def refresh(self, dashboards=False):
+        folders = {}
+        for folder in self._paginate(self.sdk.search_folders, fields="id,name"):
+            folders[str(folder.id)] = folder.name
+        loaded = {}
+        if dashboards:
+            for dashboard in self._paginate(self.sdk.search_dashboards, fields="id,title,folder_id"):
+                loaded[str(dashboard.id)] = {"title": dashboard.title, "folder_id": _str_id(dashboard.folder_id)}
+        with self.lock:
+            self.folders = folders
+            self.dashboards = loaded
+            self.has_dashboards = dashboards
+            self.fetched_at = time.time()
+        self.save()
+
+    def _paginate(self, method, **kwargs):
+        """Every result of a search method, paged by offset over a stable `id` order, once per id."""
+        offset = 0
+        seen = set()
+        while True:
+            self.api_calls += 1
+            page = self.caller.call(method, limit=self.page_size, offset=offset, sorts="id", **kwargs)
+            for item in page:
+                if item.id not in seen:
+                    seen.add(item.id)
+                    yield item
+            if len(page) < self.page_size:
+                return
+            offset += self.page_size
+
+    def search_folder_id(self, name):
+        """Live lookup (through the caller) of a folder by exact name; remembered if found."""
+        self.api_calls += 1
+        folders = self.caller.call(self.sdk.search_folders, name=name, fields="id,name")
+        for folder in folders:
+            if folder.name == name:
+                self.add_folder(folder.id, folder.name)
+                return _str_id(folder.id)
+        return None
+
+    # --- Disk ---
+    def _read_disk(self, need_dashboards):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if (data.get("version") != CACHE_VERSION
+                or data.get("base_url") != self.base_url
+                or time.time() - data.get("fetched_at", 0) > self.ttl_seconds
+                or (need_dashboards and not data.get("has_dashboards"))):
+            return False
+        self.folders = data["folders"]
+        self.dashboards = data["dashboards"]
+        self.has_dashboards = data["has_dashboards"]
+        self.fetched_at = data["fetched_at"]
+        return True
+
+    def save(self):
+        if not self.cache_path:
+            return
+        with self.lock:
+            data = {
+                "version": CACHE_VERSION,
+                "base_url": self.base_url,
+                "fetched_at": self.fetched_at,
+                "has_dashboards": self.has_dashboards,
+                "folders": dict(self.folders),
+                "dashboards": dict(self.dashboards),
+            }
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, mode="w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.cache_path)
+
+    # --- Lookups ---
+    def folder_id_by_name(self, name):
+        return next((folder_id for folder_id, folder_name in self.folders.items() if folder_name == name), None)
+
+    def folder_name(self, folder_id, fetch=None):
+        """Cached folder name; unknown ids go through `fetch(sdk.folder, id)` (default: the rate-limited caller) once."""
+        folder_id = _str_id(folder_id)
+        name = self.folders.get(folder_id)
+        if name is None and folder_id is not None:
+            folder = (fetch or self.caller.call)(self.sdk.folder, folder_id)
+            name = folder.name
+            with self.lock:
+                self.api_calls += 1
+                self.folders[folder_id] = name
+        return name
+
+    def dashboard(self, dashboard_id, fetch=None):
+        """Cached {"title", "folder_id"}; without a dashboard prefetch (or for unseen ids) fetched once."""
+        dashboard_id = _str_id(dashboard_id)
+        cached = self.dashboards.get(dashboard_id)
+        if cached is None:
+            dashboard = (fetch or self.caller.call)(self.sdk.dashboard, dashboard_id)
+            cached = {"title": dashboard.title, "folder_id": _str_id(dashboard.folder_id)}
+            with self.lock:
+                self.api_calls += 1
+                self.dashboards[dashboard_id] = cached
+        return cached
+
+    def add_folder(self, folder_id, name):
+        with self.lock:
+            self.folders[_str_id(folder_id)] = name
+
+    def record_move(self, dashboard_id, folder_id):
+        with self.lock:
+            entry = self.dashboards.get(_str_id(dashboard_id))
+            if entry is not None:
+                entry["folder_id"] = _str_id(folder_id)
+
+
+def _str_id(value):
+    return None if value is None else str(value)
@@ -14,44 +14,43 @@ Comparison:
 - 'was_merged' = 1 if match found, else 0.
 """
 
+import os
+import sys
+
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "explores_views_repo"))
+from join_keys import add_key_codes
+
 # File paths
 main_csv = r"raw\dashboards_audit_google_sheet_2025_06_19.csv"
 user_csv = r"raw\dashboards_audit_google_sheet_2025_06_19_user_updated_by.csv"
 output_csv = "script_01_bring_updated_by_in_dashboard_audit.csv"
 
-# Clean function: lowercase and trim
-def clean_str(value):
-    return str(value).strip().lower()
-
 # Load data
 df_main = pd.read_csv(main_csv)
 df_user = pd.read_csv(user_csv)
 
-# Normalize 'dashboard' and 'id'
-df_main['dashboard_clean'] = df_main['dashboard'].apply(clean_str)
-df_main['id_clean'] = df_main['id'].apply(clean_str)
-
-df_user['dashboard_clean'] = df_user['dashboard'].apply(clean_str)
-df_user['id_clean'] = df_user['id'].apply(clean_str)
+# Normalized 'dashboard' and 'id' as shared integer key codes (join_keys.py)
+key_cols = add_key_codes(df_main, ['dashboard', 'id'])
+add_key_codes(df_user, ['dashboard', 'id'])
 
 # Select relevant columns from user CSV
-df_user_cleaned = df_user[['dashboard_clean', 'id_clean', 'updated_by_name']].drop_duplicates()
+df_user_cleaned = df_user[key_cols + ['updated_by_name']].drop_duplicates()
 
-# Merge on both cleaned fields
+# Merge on both normalized keys
 merged_df = df_main.merge(
     df_user_cleaned,
-    on=['dashboard_clean', 'id_clean'],
+    on=key_cols,
     how='left',
     indicator=True
 )
 
 # Add merge flag
-merged_df['was_merged'] = merged_df['_merge'].apply(lambda x: 1 if x == 'both' else 0)
+merged_df['was_merged'] = (merged_df['_merge'] == 'both').astype(int)
 
 # Drop helper columns
-merged_df.drop(columns=['dashboard_clean', 'id_clean', '_merge'], inplace=True)
+merged_df.drop(columns=key_cols + ['_merge'], inplace=True)
 
 # Save result
 merged_df.to_csv(output_csv, index=False)
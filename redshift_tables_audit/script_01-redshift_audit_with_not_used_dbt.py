@@ -21,8 +21,15 @@ Output:
 - Output file: script_01-redshift_audit_with_not_used_dbt.csv
 """
 
+import os
+import sys
+
+import numpy as np
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dashboards", "explores_views_repo"))
+from usage_flags import flag_usage
+
 # File paths
 main_path = r"raw\bf_us_google_sheet_redshift_audit.csv"
 deleted_path = r"raw\bf_us_google_sheet_redshift_not_used_by_dbt_audit.csv"
@@ -32,15 +39,11 @@ output_path = "script_01-redshift_audit_with_not_used_dbt.csv"
 main_df = pd.read_csv(main_path, keep_default_na=False).fillna('')
 deleted_df = pd.read_csv(deleted_path, keep_default_na=False).fillna('')
 
-# Use only Schema Name and Object Name for comparison
-main_df['_key'] = main_df[['Schema Name', 'Object Name']].apply(tuple, axis=1)
-deleted_keys = set(deleted_df[['Schema Name', 'Object Name']].apply(tuple, axis=1))
+# Flag membership in the "not used by DBT" list on (Schema Name, Object Name), in one vectorized pass
+flags = flag_usage(main_df, ['Schema Name', 'Object Name'], {'not_used_by_dbt': deleted_df}, any_column='_listed')
 
 # Assign flag: N if found in deleted list (not used), Y otherwise
-main_df['Is Used by DBT'] = main_df['_key'].apply(lambda x: 'N' if x in deleted_keys else 'Y')
-
-# Drop helper column
-main_df.drop(columns=['_key'], inplace=True)
+main_df['Is Used by DBT'] = np.where(flags['_listed'], 'N', 'Y')
 
 # Save output
 main_df.to_csv(output_path, index=False)
@@ -17,8 +17,14 @@ Comparison:
 - Final output contains all columns from new CSV + merged columns + match flag.
 """
 
+import os
+import sys
+
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dashboards", "explores_views_repo"))
+from join_keys import normalize_columns
+
 # File paths
 old_csv = r"raw\redshift_objects_audit_google_sheet_2025_06_26.csv"
 new_csv = r"raw\dbeaver_2025_06_26_redshift_objects_usage_audit_180.csv"
@@ -31,10 +37,9 @@ compare_cols = ['schema_name', 'object_name']
 df_old = pd.read_csv(old_csv)
 df_new = pd.read_csv(new_csv)
 
-# Normalize comparison fields
-for col in compare_cols:
-    df_old[col] = df_old[col].astype(str).str.strip().str.lower()
-    df_new[col] = df_new[col].astype(str).str.strip().str.lower()
+# Normalize comparison fields (shared rule, once per distinct value; see join_keys.py)
+normalize_columns(df_old, compare_cols)
+normalize_columns(df_new, compare_cols)
 
 # Select only the needed columns from old CSV
 columns_to_merge = compare_cols + ['ingestion_tool', 'is_used_by_dbt']
@@ -48,7 +53,7 @@ merged_df = df_new.merge(
     indicator=True
 )
 
-merged_df['match'] = merged_df['_merge'].apply(lambda x: 'Y' if x == 'both' else 'N')
+merged_df['match'] = (merged_df['_merge'] == 'both').map({True: 'Y', False: 'N'})
 merged_df.drop(columns=['_merge'], inplace=True)
 
 # Reorder columns for final output
@@ -16,42 +16,45 @@ Comparison:
 - Final output is the original audit CSV with '_merge' and 'accuracy_flag' columns.
 """
 
+import os
+import sys
+
 import pandas as pd
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dashboards", "explores_views_repo"))
+from join_keys import add_key_codes, normalize_columns
+
 # File paths
 audit_issues_csv = r"raw\dbt_audit_not_accurate_dbt_models.csv"
 main_audit_csv = r"raw\redshift_table_audit_2025_06_26.csv"
 output_csv = 'script_04-merge_redshift_tables_with_dbt_accuracy.csv'
 
-# Function to clean path: lowercased and trimmed (preserves internal whitespace)
-def clean_path(path):
-    return str(path).strip().lower()
-
 # Load CSVs
 df_issues = pd.read_csv(audit_issues_csv)
 df_main = pd.read_csv(main_audit_csv)
 
-# Normalize path columns
-df_issues['potential_redshift_path'] = df_issues['potential_redshift_path'].apply(clean_path)
-df_main['redshift_path'] = df_main['redshift_path'].apply(clean_path)
+# Normalize path columns: lowercased and trimmed (preserves internal whitespace); see join_keys.py
+normalize_columns(df_main, ['redshift_path'])
+[main_key] = add_key_codes(df_main, ['redshift_path'])
+[issue_key] = add_key_codes(df_issues, ['potential_redshift_path'])
 
 # Minimal set for merge
-df_issues_flags = df_issues[['potential_redshift_path']].drop_duplicates()
+df_issues_flags = df_issues[[issue_key]].drop_duplicates()
 
-# Merge on redshift path
+# Merge on the redshift path's key code
 merged_df = df_main.merge(
     df_issues_flags,
     how='left',
-    left_on='redshift_path',
-    right_on='potential_redshift_path',
+    left_on=main_key,
+    right_on=issue_key,
     indicator=True
 )
 
 # Assign accuracy_flag: 'N' for match (inaccurate), 'Y' for not matched (accurate)
-merged_df['accuracy_flag'] = merged_df['_merge'].apply(lambda x: 'N' if x == 'both' else 'Y')
+merged_df['accuracy_flag'] = (merged_df['_merge'] == 'both').map({True: 'N', False: 'Y'})
 
-# Drop helper column
-merged_df.drop(columns=['potential_redshift_path'], inplace=True)
+# Drop helper columns
+merged_df.drop(columns=[main_key, issue_key], inplace=True)
 
 # Save output
 merged_df.to_csv(output_csv, index=False)